@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'department'], name='user_role_dept_idx'),
+        ),
+    ]
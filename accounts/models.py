@@ -21,6 +21,13 @@ class User(AbstractUser):
     phone       = models.CharField(max_length=15, blank=True)
     employee_id = models.CharField(max_length=20, blank=True, null=True, unique=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Manager/admin lookups: role='manager' ordered by department,
+            # and role + department filters on the leave queues
+            models.Index(fields=['role', 'department'], name='user_role_dept_idx'),
+        ]
+
     def __str__(self):
         name = self.get_full_name() or self.username
         return f"{name} [{self.get_role_display()}] — {self.department}"
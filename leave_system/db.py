@@ -0,0 +1,38 @@
+"""
+SQLite connection tuning for the production database profile.
+
+settings.LEAVEMS_SQLITE_PRAGMAS is applied to every new SQLite connection
+by apply_sqlite_pragmas, which LeavesConfig.ready() connects to
+connection_created — importing this module (settings.py does, for the
+constant) has no side effects. The production profile uses PRODUCTION_PRAGMAS:
+
+    journal_mode=WAL      readers no longer block the writer (and vice versa)
+    synchronous=NORMAL    fsync at checkpoints only — safe with WAL
+    busy_timeout=20000    writers queue for up to 20s instead of failing
+                          with "database is locked"
+    cache_size / mmap     64 MB page cache, 256 MB memory-mapped reads
+    temp_store=MEMORY     sort/temp tables in RAM
+
+Other backends are left alone.
+"""
+
+from django.conf import settings
+
+
+PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous':  'NORMAL',
+    'busy_timeout': 20000,
+    'cache_size':   -64000,         # negative = KiB
+    'mmap_size':    256 * 1024 * 1024,
+    'temp_store':   'MEMORY',
+}
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    pragmas = getattr(settings, 'LEAVEMS_SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,159 @@
+"""
+Opt-in per-request instrumentation (enable with LEAVEMS_METRICS=1).
+
+For every request, keyed by URL name (employee_dashboard, manager_pending …):
+    query count · DB time · template render time · wall time
+
+  • sent back as a `Server-Timing` header (visible in browser dev tools)
+  • kept in a rolling window per URL name → p50/p95/p99 at /ops/metrics/
+    (staff only, JSON)
+  • a warning is logged when a view runs more than
+    LEAVEMS_QUERY_WARN_THRESHOLD queries (likely N+1)
+
+Stats are per process; each worker reports its own window.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.template.backends.django import Template as DjangoTemplate
+
+from leaves.permissions import staff_required
+
+
+logger   = logging.getLogger(__name__)
+_current = ContextVar('leavems_request_metrics', default=None)
+
+WINDOW_SIZE = 500       # requests kept per URL name
+
+
+class _RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries       = 0
+        self.db_time       = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+class RollingStats:
+    """Thread-safe rolling window of (wall, db, template, queries) per URL name."""
+
+    def __init__(self, size=WINDOW_SIZE):
+        self.size    = size
+        self.samples = {}
+        self.lock    = threading.Lock()
+
+    def record(self, name, wall, db, template, queries):
+        with self.lock:
+            self.samples.setdefault(name, deque(maxlen=self.size)).append((wall, db, template, queries))
+
+    def summary(self):
+        with self.lock:
+            snapshot = {name: list(rows) for name, rows in self.samples.items()}
+        return {name: _summarise(rows) for name, rows in sorted(snapshot.items())}
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _summarise(rows):
+    result = {'count': len(rows)}
+    for i, metric in enumerate(('wall_ms', 'db_ms', 'template_ms', 'queries')):
+        values = sorted(row[i] for row in rows)
+        scale  = 1 if metric == 'queries' else 1000
+        result[metric] = {f'p{p}': round(percentile(values, p) * scale, 2) for p in (50, 95, 99)}
+    return result
+
+
+STATS = RollingStats()
+
+
+def _install_template_timer():
+    """Wraps the Django template backend's render() once, to time top-level renders."""
+    if getattr(DjangoTemplate.render, '_leavems_timed', False):
+        return
+    original = DjangoTemplate.render
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+    render._leavems_timed = True
+    DjangoTemplate.render = render
+
+
+class RequestMetricsMiddleware:
+    """Add FIRST in MIDDLEWARE so session/auth queries are counted too."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold    = getattr(settings, 'LEAVEMS_QUERY_WARN_THRESHOLD', 20)
+        _install_template_timer()
+
+    def __call__(self, request):
+        metrics = _RequestMetrics()
+        token   = _current.set(metrics)
+        start   = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        wall = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        name  = match.url_name if match and match.url_name else None
+        if name:
+            STATS.record(name, wall, metrics.db_time, metrics.template_time, metrics.queries)
+            if metrics.queries > self.threshold:
+                logger.warning("%s ran %d queries (threshold %d) — possible N+1: %s",
+                               name, metrics.queries, self.threshold, request.path)
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f};desc="templates"',
+            f'total;dur={wall * 1000:.1f}',
+        ))
+        return response
+
+
+@staff_required
+def metrics_summary(request):
+    """Rolling p50/p95/p99 per URL name for this process."""
+    return JsonResponse({
+        'enabled': getattr(settings, 'LEAVEMS_METRICS', False),
+        'window':  STATS.size,
+        'views':   STATS.summary(),
+    })
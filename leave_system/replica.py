@@ -0,0 +1,80 @@
+"""
+Read-replica routing (enabled when DATABASES has a 'replica' alias).
+
+    ReplicaRoutingMiddleware   marks GETs to READ_ONLY_VIEWS as replica-safe
+    ReplicaRouter              sends those requests' leave reads to
+                               'replica'; everything else → 'default'
+
+Read-your-writes: any successful non-GET request sets a short-lived cookie
+(LEAVEMS_REPLICA_STICKY_SECONDS) and, while it is present, that browser's
+reads stay on the primary — long enough for replication to catch up.
+Reads inside a transaction, and session/auth/user tables, always use the
+primary: a lagging replica must not log out a user created or edited
+moments ago, or serve a role change late to the permission checks.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_ALIAS   = 'replica'
+STICKY_COOKIE   = 'leavems_primary'
+REPLICA_APPS    = {'leaves'}
+READ_ONLY_VIEWS = {
+    'employee_dashboard', 'manager_dashboard', 'admin_dashboard',
+    'employee_my_leaves', 'manager_my_leaves',
+    'manager_team_leaves', 'admin_all_leaves',
+    'leave_detail',
+    'api_leaves', 'api_leave', 'api_balances',      # GETs only — see process_view
+}
+
+_use_replica = ContextVar('leavems_use_replica', default=False)
+
+
+def reading_from_replica():
+    """True while the current request's reads may be served by the replica."""
+    return _use_replica.get()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (_use_replica.get()
+                and model._meta.app_label in REPLICA_APPS
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases — objects read from either may be related
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+
+
+class ReplicaRoutingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response   = get_response
+        self.sticky_seconds = getattr(settings, 'LEAVEMS_REPLICA_STICKY_SECONDS', 10)
+
+    def __call__(self, request):
+        token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 500:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (request.method in ('GET', 'HEAD')
+                and match and match.url_name in READ_ONLY_VIEWS
+                and STICKY_COOKIE not in request.COOKIES):
+            _use_replica.set(True)
+        return None
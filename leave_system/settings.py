@@ -20,6 +20,15 @@ INSTALLED_APPS = [
     'leaves',
 ]
 
+# Warm start (set on Vercel, where every cold start is a visitor's wait, or
+# with LEAVEMS_WARM_START=1): production template mode by default, so the
+# instance compiles every template while it boots; crispy_forms is left out
+# — no template loads it, and precompile() would stop the boot if one did;
+# wsgi.py fills the URL resolver before the first request.
+LEAVEMS_WARM_START = bool(os.environ.get('VERCEL') or os.environ.get('LEAVEMS_WARM_START'))
+if LEAVEMS_WARM_START:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ('crispy_forms', 'crispy_bootstrap4')]
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -30,6 +39,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request query/latency instrumentation (leave_system/instrumentation.py).
+# Opt-in: LEAVEMS_METRICS=1 python manage.py runserver
+LEAVEMS_METRICS              = os.environ.get('LEAVEMS_METRICS') == '1'
+LEAVEMS_QUERY_WARN_THRESHOLD = int(os.environ.get('LEAVEMS_QUERY_WARN_THRESHOLD', 20))
+if LEAVEMS_METRICS:
+    MIDDLEWARE.insert(0, 'leave_system.instrumentation.RequestMetricsMiddleware')
+
+# Release identifier, part of every ETag (leaves/conditional.py) — set it per
+# deploy so browsers do not keep showing pages rendered by old templates.
+LEAVEMS_RELEASE = os.environ.get('LEAVEMS_RELEASE', '')
+
 ROOT_URLCONF = 'leave_system.urls'
 
 TEMPLATES = [
@@ -43,20 +63,111 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'leaves.events.live_queue',
             ],
         },
     },
 ]
 
+# Template mode: LEAVEMS_TEMPLATE_MODE=production uses explicit cached loaders
+# without template debug info, and compiles every template at startup —
+# failing fast on a broken one (leave_system/templating.py).
+LEAVEMS_TEMPLATE_MODE = os.environ.get('LEAVEMS_TEMPLATE_MODE', 'production' if LEAVEMS_WARM_START else 'dev')
+if LEAVEMS_TEMPLATE_MODE == 'production':
+    TEMPLATES[0]['APP_DIRS']           = False     # app dirs come from the loader below
+    TEMPLATES[0]['OPTIONS']['debug']   = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'leave_system.wsgi.application'
+ASGI_APPLICATION = 'leave_system.asgi.application'
+
+# Bulk review posts one leave_ids field per leave — up to BulkReviewForm.MAX_ITEMS
+# (1000) plus the decision, comment and CSRF token; Django's default cap is 1000.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 1100
+
+# Queue change feed (leaves/events.py). The in-process broker only reaches
+# clients on the same process — swap in a shared broker for several workers.
+LEAVEMS_EVENT_BROKER = 'leaves.events.InProcessBroker'
+# Each open queue page holds a stream for up to STREAM_SECONDS: fine under
+# ASGI (asgi.py), but under WSGI it pins a worker thread, so the feed is
+# only served there when LEAVEMS_LIVE_QUEUE=1 opts a threaded server in.
+LEAVEMS_LIVE_QUEUE = os.environ.get('LEAVEMS_LIVE_QUEUE') == '1'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # LEAVEMS_SQLITE_PATH points elsewhere (bench_concurrent_writes' scratch files)
+        'NAME': os.environ.get('LEAVEMS_SQLITE_PATH') or BASE_DIR / 'db.sqlite3',
+        # Tests on a file, not in-memory: the concurrency tests run writer
+        # threads, which need WAL + busy waits (a shared-cache in-memory
+        # database fails them with "table is locked" instead)
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# PostgreSQL instead of SQLite: LEAVEMS_DB=postgres + POSTGRES_* variables.
+# Django 4.2 has no built-in pool — put PgBouncer (transaction pooling) in
+# front and set LEAVEMS_PGBOUNCER=1 (server-side cursors don't survive it).
+if os.environ.get('LEAVEMS_DB') == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE':   'django.db.backends.postgresql',
+            'NAME':     os.environ.get('POSTGRES_DB', 'leavems'),
+            'USER':     os.environ.get('POSTGRES_USER', 'leavems'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST':     os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT':     os.environ.get('POSTGRES_PORT', '5432'),
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('LEAVEMS_PGBOUNCER') == '1',
+        }
+    }
+
+# Database profile: LEAVEMS_DB_PROFILE=production keeps connections open
+# between requests (checked before reuse) and tunes SQLite for concurrent
+# writers — WAL, busy_timeout, … (leave_system/db.py; the pragmas are applied
+# by a connection_created receiver connected in LeavesConfig.ready).
+from leave_system.db import PRODUCTION_PRAGMAS
+LEAVEMS_DB_PROFILE     = os.environ.get('LEAVEMS_DB_PROFILE', 'dev')
+LEAVEMS_SQLITE_PRAGMAS = {}
+if LEAVEMS_DB_PROFILE == 'production':
+    DATABASES['default']['CONN_MAX_AGE']       = int(os.environ.get('LEAVEMS_CONN_MAX_AGE', 600))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    LEAVEMS_SQLITE_PRAGMAS                     = PRODUCTION_PRAGMAS
+
+# Read replica (leave_system/replica.py): dashboards and listings read from
+# it, writes and everything else use 'default'. SQLite: LEAVEMS_REPLICA_DB=
+# <path>; PostgreSQL: POSTGRES_REPLICA_HOST=<host>.
+LEAVEMS_REPLICA_STICKY_SECONDS = int(os.environ.get('LEAVEMS_REPLICA_STICKY_SECONDS', 10))
+_replica = os.environ.get('LEAVEMS_REPLICA_DB') or os.environ.get('POSTGRES_REPLICA_HOST')
+if _replica:
+    DATABASES['replica'] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DATABASES['default']['ENGINE'].endswith('sqlite3'):
+        DATABASES['replica']['NAME'] = _replica
+    else:
+        DATABASES['replica']['HOST'] = _replica
+    DATABASE_ROUTERS = ['leave_system.replica.ReplicaRouter']
+    MIDDLEWARE.append('leave_system.replica.ReplicaRoutingMiddleware')
+
+# Leave-balance cache (leaves/balances.py) and dashboard fragments with their
+# generation counters (leaves/fragments.py). locmem is per-process — set
+# LEAVEMS_REDIS_URL (pip install redis) when running several workers; the
+# warm_balances command refuses to run without a shared cache.
+CACHES = {
+    'default': {
+        'BACKEND':  'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'leavems',
+    }
+}
+if os.environ.get('LEAVEMS_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND':  'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['LEAVEMS_REDIS_URL'],
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -1,8 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from .instrumentation import metrics_summary
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('ops/metrics/', metrics_summary, name='metrics_summary'),
+    path('api/v1/', include('leaves.api_urls')),
     path('', include('leaves.urls')),
     path('accounts/', include('accounts.urls')),
 ]
@@ -1,4 +1,24 @@
+"""
+WSGI entry point — runserver, gunicorn, and the Vercel function (vercel.json).
+
+With settings.LEAVEMS_WARM_START (Vercel, or LEAVEMS_WARM_START=1) the URL
+resolver's reverse tables are filled here, at import, along with the
+template precompile the warm-start settings switch on — work the first
+request would otherwise pay for.
+
+    VERCEL=1 python manage.py startup_profile     → cold start as deployed
+"""
+
 import os
+
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'leave_system.settings')
+
 application = get_wsgi_application()
+
+if settings.LEAVEMS_WARM_START:
+    resolver = get_resolver()
+    resolver.reverse_dict, resolver.namespace_dict, resolver.app_dict   # first {% url %} pays otherwise
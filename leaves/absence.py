@@ -0,0 +1,93 @@
+"""
+Team absence calendar (DepartmentAbsence), maintained incrementally.
+
+    record_absences(leaves)            → call when leaves are approved
+    record_absences(leaves, delta=-1)  → call if approved leaves are withdrawn
+    rebuild_absences([dept, …])        → recount from approved leaves (holiday changes)
+    absence_calendar(dept, start, n)   → n days of counts in ONE indexed read
+
+Only employee leaves are counted (the manager's team), and only on working
+days (weekends and public holidays are skipped, as in total_days).
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import DepartmentAbsence, LeaveApplication
+from .workdays import holiday_calendar
+
+
+def _working_dates(start, end, holidays):
+    day = start
+    while day <= end:
+        if day.weekday() < 5 and day.toordinal() not in holidays:
+            yield day
+        day += timedelta(days=1)
+
+
+def absence_counts(leaves):
+    """Counter {(department, day): n} for an iterable of employee leaves."""
+    holidays = set(holiday_calendar().ordinals)
+    counts   = Counter()
+    for leave in leaves:
+        if leave.applicant_role != 'employee':
+            continue
+        for day in _working_dates(leave.start_date, leave.end_date, holidays):
+            counts[(leave.applicant_department, day)] += 1
+    return counts
+
+
+def record_absences(leaves, delta=1):
+    """
+    Adds (or with delta=-1 removes) the leaves' days to the calendar.
+    One INSERT … ON CONFLICT DO NOTHING for missing rows, then one
+    `absent = absent + n` UPDATE per (department, n) group.
+    """
+    counts = absence_counts(leaves)
+    if not counts:
+        return
+    DepartmentAbsence.objects.bulk_create(
+        [DepartmentAbsence(department=dept, day=day) for dept, day in counts],
+        ignore_conflicts=True,
+    )
+    groups = {}
+    for (dept, day), n in counts.items():
+        groups.setdefault((dept, n * delta), []).append(day)
+    for (dept, change), days in groups.items():
+        DepartmentAbsence.objects.filter(department=dept, day__in=days).update(absent=F('absent') + change)
+
+
+def rebuild_absences(departments=None):
+    """
+    Recounts the calendar from approved employee leaves — every department,
+    or only `departments`. Returns the number of department-day rows written.
+    """
+    leaves = LeaveApplication.objects.filter(status='approved', applicant_role='employee').only(
+        'applicant_role', 'applicant_department', 'start_date', 'end_date')
+    rows   = DepartmentAbsence.objects.all()
+    if departments is not None:
+        leaves = leaves.filter(applicant_department__in=departments)
+        rows   = rows.filter(department__in=departments)
+
+    counts = absence_counts(leaves.iterator(chunk_size=5000))
+    with transaction.atomic():
+        rows.delete()
+        DepartmentAbsence.objects.bulk_create(
+            [DepartmentAbsence(department=dept, day=day, absent=n) for (dept, day), n in counts.items()],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def absence_calendar(department, start, days=90):
+    """[(date, absent), …] for `days` consecutive days from `start`."""
+    end    = start + timedelta(days=days - 1)
+    stored = dict(
+        DepartmentAbsence.objects
+        .filter(department=department, day__range=(start, end))
+        .values_list('day', 'absent')
+    )
+    return [(start + timedelta(days=i), stored.get(start + timedelta(days=i), 0)) for i in range(days)]
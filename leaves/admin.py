@@ -1,22 +1,38 @@
 from django.contrib import admin
-from .models import LeaveBalance, LeaveApplication
+from .models import LeaveBalance, LeaveApplication, EmailOutbox, PublicHoliday
 
 
 @admin.register(LeaveBalance)
 class LeaveBalanceAdmin(admin.ModelAdmin):
-    list_display   = ['id', 'user', 'year', 'casual_leave', 'sick_leave', 'earned_leave']
-    list_filter    = ['year', 'user__role']
-    search_fields  = ['user__username', 'user__employee_id']
+    list_display    = ['id', 'user', 'year', 'casual_leave', 'sick_leave', 'earned_leave', 'carried_forward']
+    list_filter     = ['year', 'user__role']
+    search_fields   = ['user__username', 'user__employee_id']
+    readonly_fields = ['carried_forward']       # bookkeeping of rollover_balances
 
 
 @admin.register(LeaveApplication)
 class LeaveApplicationAdmin(admin.ModelAdmin):
     list_display    = ['leave_id', 'applicant', 'applicant_role_display', 'leave_type', 'start_date', 'end_date', 'total_days', 'status', 'reviewed_by', 'applied_date']
-    list_filter     = ['status', 'leave_type', 'applicant__role', 'applicant__department']
-    search_fields   = ['applicant__username', 'applicant__employee_id', 'applicant__department']
-    readonly_fields = ['leave_id', 'applied_date', 'review_date', 'total_days']
+    list_filter     = ['status', 'leave_type', 'applicant_role', 'applicant_department']
+    search_fields   = ['applicant__username', 'applicant__employee_id', 'applicant_department']
+    readonly_fields = ['leave_id', 'applicant_role', 'applicant_department', 'applied_date', 'review_date', 'total_days']
     date_hierarchy  = 'applied_date'
 
     def applicant_role_display(self, obj):
         return obj.applicant.get_role_display()
     applicant_role_display.short_description = 'Applicant Role'
+
+
+@admin.register(PublicHoliday)
+class PublicHolidayAdmin(admin.ModelAdmin):
+    list_display   = ['date', 'name']
+    search_fields  = ['name']
+    date_hierarchy = 'date'
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display    = ['id', 'recipient', 'subject', 'status', 'attempts', 'created_at', 'next_attempt', 'sent_at']
+    list_filter     = ['status']
+    search_fields   = ['recipient', 'subject']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
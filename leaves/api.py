@@ -0,0 +1,296 @@
+"""
+Versioned JSON API for HR integrations — mounted at /api/v1/.
+
+    GET    leaves/                  list (own / team / manager leaves, by role)
+    POST   leaves/                  apply — one object, or a list (batch)
+    GET    leaves/<id>/             one leave
+    DELETE leaves/<id>/             cancel own pending leave
+    POST   leaves/review/           approve/reject many: {"decision", "comment", "leave_ids"}
+    GET    balances/                own balance; ?scope=team for reviewers
+
+Same rules as the HTML views: the role guards of role_required, the scopes
+of the listing views, LeaveAccess for single leaves, LeaveApplicationForm
+plus the balance check for applying, _apply_bulk_review for reviewing.
+Authentication is the normal session (log in at /accounts/login/); writes
+need the CSRF token like any form POST (X-CSRFToken header).
+
+Lists take ?status=, ?fields=leave_id,status (sparse fieldset), ?limit=
+(max 100) and ?cursor= (keyset pagination, pagination.py). Rows are
+serialized straight from .values() — no model instances are built.
+"""
+
+import json
+from datetime import datetime
+from functools import wraps
+from types import SimpleNamespace
+
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from .balances import BALANCE_FIELDS, get_balance
+from .events import publish_leave_event
+from .forms import BulkReviewForm, LeaveApplicationForm
+from .models import LeaveApplication, LeaveBalance
+from .pagination import PER_PAGE, paginate_keyset
+from .permissions import LeaveAccess
+from .views import _apply_bulk_review, _cancel_pending
+
+
+MAX_LIMIT = 100
+MAX_BATCH = 100      # applications per POST
+MAX_YEARS = 10       # ?year= within this many years of the current one
+
+# Output name → ORM lookup. Joined names are annotations, so one query.
+LEAVE_FIELDS = {
+    'leave_id':             'leave_id',
+    'applicant_id':         'applicant_id',
+    'applicant_username':   F('applicant__username'),
+    'applicant_role':       'applicant_role',
+    'applicant_department': 'applicant_department',
+    'leave_type':           'leave_type',
+    'start_date':           'start_date',
+    'end_date':             'end_date',
+    'total_days':           'total_days',
+    'reason':               'reason',
+    'status':               'status',
+    'applied_date':         'applied_date',
+    'reviewed_by_id':       'reviewed_by_id',
+    'reviewed_by_username': F('reviewed_by__username'),
+    'review_comment':       'review_comment',
+    'review_date':          'review_date',
+}
+# Always fetched: the keyset cursor and LeaveAccess need them
+INTERNAL_FIELDS = ('leave_id', 'applied_date', 'applicant_id', 'applicant_role',
+                   'applicant_department', 'status')
+
+
+def api_role_required(*allowed_roles):
+    """role_required for the API: 401/403 JSON instead of redirects."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return _error("Authentication required.", 401)
+            if request.user.role not in allowed_roles:
+                return _error("You do not have permission to access this endpoint.", 403)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ── leaves ───────────────────────────────────────────────────
+@api_role_required('employee', 'manager', 'admin')
+@require_http_methods(['GET', 'POST'])
+def leaves(request):
+    if request.method == 'POST':
+        return _apply(request)
+
+    scope = _scope(request.user, request.GET.get('scope', ''))
+    if scope is None:
+        return _error("Unknown scope.", 400)
+    fields, error = _fields(request)
+    if error:
+        return error
+    try:
+        limit = min(max(int(request.GET.get('limit', PER_PAGE)), 1), MAX_LIMIT)
+    except ValueError:
+        return _error("limit must be an integer.", 400)
+
+    if request.GET.get('status'):
+        scope = scope.filter(status=request.GET['status'])
+    page = paginate_keyset(_values(scope, fields), request.GET.get('cursor'), per_page=limit)
+    return JsonResponse({
+        'results':  _project(page, fields),
+        'next':     page.next_cursor,
+        'previous': page.prev_cursor,
+    })
+
+
+@api_role_required('employee', 'manager', 'admin')
+@require_http_methods(['GET', 'DELETE'])
+def leave(request, leave_id):
+    if request.method == 'DELETE':
+        return _cancel(request, leave_id)
+
+    fields, error = _fields(request)
+    if error:
+        return error
+    row = _values(LeaveApplication.objects.filter(leave_id=leave_id), fields).first()
+    if row is None:
+        return _error(f"LEAVE-{leave_id} does not exist.", 404)
+    denied = LeaveAccess(request.user, SimpleNamespace(**row)).view_denied
+    if denied:
+        return _error(denied[1], 403)
+    return JsonResponse(_project([row], fields)[0])
+
+
+@api_role_required('manager', 'admin')
+@require_POST
+def review(request):
+    """One decision for many leaves — the bulk review of the pending queues."""
+    data, error = _json_body(request)
+    if error:
+        return error
+    if not isinstance(data, dict):
+        return _error("Send a JSON object: {\"decision\", \"comment\", \"leave_ids\"}.", 400)
+    ids = data.get('leave_ids')
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return JsonResponse({'errors': {'leave_ids': ["Must be a list of integers."]}}, status=400)
+    form = BulkReviewForm(data)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    results = _apply_bulk_review(
+        _scope(request.user, 'team'), form.cleaned_data['leave_ids'], request.user,
+        form.cleaned_data['decision'], form.cleaned_data['comment'],
+    )
+    return JsonResponse({
+        'decision': form.cleaned_data['decision'],
+        'results':  [{'leave_id': lid, 'result': r} for lid, r in results.items()],
+    })
+
+
+# ── balances ─────────────────────────────────────────────────
+@api_role_required('employee', 'manager', 'admin')
+@require_GET
+def balances(request):
+    """
+    Own balance, or ?scope=team — everyone the caller reviews, one query.
+    Read-only: a year without a balance row is a 404, not a new row.
+    """
+    current = datetime.now().year
+    try:
+        year = int(request.GET.get('year', 0)) or current
+    except ValueError:
+        return _error("year must be an integer.", 400)
+    if abs(year - current) > MAX_YEARS:
+        return _error(f"year must be between {current - MAX_YEARS} and {current + MAX_YEARS}.", 400)
+
+    if request.GET.get('scope') == 'team':
+        if request.user.role == 'employee':
+            return _error("Only managers and admins can list team balances.", 403)
+        rows = LeaveBalance.objects.filter(year=year)
+        if request.user.role == 'manager':
+            rows = rows.filter(user__role='employee', user__department=request.user.department)
+        else:
+            rows = rows.filter(user__role='manager')
+        rows = rows.order_by('user__username').values(*BALANCE_FIELDS[1:], username=F('user__username'))
+        return JsonResponse({'results': list(rows)})
+
+    if request.user.role == 'admin':
+        return _error("Admins have no leave balance; use ?scope=team.", 403)
+    lb = LeaveBalance.objects.filter(user=request.user, year=year).first()
+    if lb is None:
+        return _error(f"No leave balance for {year}.", 404)
+    return JsonResponse({f: getattr(lb, f) for f in BALANCE_FIELDS[1:]})
+
+
+# ═══════════════════════════════════════════════════════════
+# HELPERS
+# ═══════════════════════════════════════════════════════════
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b'null'), None
+    except (ValueError, UnicodeDecodeError):
+        return None, _error("Request body must be JSON.", 400)
+
+
+def _scope(user, name):
+    """Leaves `user` may list — the querysets of the HTML listing views."""
+    if user.role == 'employee' and name in ('', 'mine'):
+        return LeaveApplication.objects.filter(applicant=user)
+    if user.role == 'manager' and name == 'mine':
+        return LeaveApplication.objects.filter(applicant=user)
+    if user.role == 'manager' and name in ('', 'team'):
+        return LeaveApplication.objects.filter(applicant_role='employee', applicant_department=user.department)
+    if user.role == 'admin' and name in ('', 'team'):
+        return LeaveApplication.objects.filter(applicant_role='manager')
+    return None
+
+
+def _fields(request):
+    """?fields=a,b → list of LEAVE_FIELDS names (all by default), or an error response."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(LEAVE_FIELDS), None
+    fields  = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in LEAVE_FIELDS]
+    if unknown or not fields:
+        return None, _error(f"Unknown field(s): {', '.join(unknown)}. "
+                            f"Available: {', '.join(LEAVE_FIELDS)}.", 400)
+    return fields, None
+
+
+def _values(queryset, fields):
+    names  = dict.fromkeys([*INTERNAL_FIELDS, *fields])
+    plain  = [LEAVE_FIELDS[n] for n in names if isinstance(LEAVE_FIELDS[n], str)]
+    joined = {n: LEAVE_FIELDS[n] for n in names if not isinstance(LEAVE_FIELDS[n], str)}
+    return queryset.values(*plain, **joined)
+
+
+def _project(rows, fields):
+    return [{f: row[f] for f in fields} for row in rows]
+
+
+def _apply(request):
+    """One application (201) or a list of them (200, one result per item)."""
+    if request.user.role == 'admin':
+        return _error("Admins cannot apply for leave.", 403)
+    data, error = _json_body(request)
+    if error:
+        return error
+
+    batch = isinstance(data, list)
+    items = data if batch else [data]
+    if not items or len(items) > MAX_BATCH or not all(isinstance(i, dict) for i in items):
+        return _error(f"Send one application object or a list of 1–{MAX_BATCH}.", 400)
+
+    lb      = get_balance(request.user)
+    results = []            # leave_id, or {'errors': …}, per item
+    for item in items:
+        form = LeaveApplicationForm(item, applicant=request.user)
+        if not form.is_valid():
+            results.append({'errors': form.errors})
+            continue
+        leave            = form.save(commit=False)
+        leave.applicant  = request.user
+        leave.total_days = leave.calculate_working_days()
+        available        = lb.get_balance(leave.leave_type)
+        if leave.total_days > available:
+            results.append({'errors': {'__all__': [
+                f"Insufficient {leave.get_leave_type_display()}. "
+                f"Available: {available} day(s), Requested: {leave.total_days} day(s)."]}})
+            continue
+        leave.save()
+        publish_leave_event('created', leave)
+        results.append(leave.leave_id)
+
+    fields  = list(LEAVE_FIELDS)
+    created = [r for r in results if isinstance(r, int)]
+    rows    = {row['leave_id']: row for row in _project(
+        _values(LeaveApplication.objects.filter(leave_id__in=created), fields), fields)}
+    results = [{'leave': rows[r]} if isinstance(r, int) else r for r in results]
+
+    if not batch:
+        result = results[0]
+        return JsonResponse(result.get('leave', result), status=201 if 'leave' in result else 400)
+    return JsonResponse({'created': len(created), 'results': results})
+
+
+def _cancel(request, leave_id):
+    """Own pending leave only (employee_cancel / manager_cancel)."""
+    if request.user.role == 'admin':
+        return _error("Admins have no leave applications to cancel.", 403)
+    leave = (LeaveApplication.objects.select_related('applicant')
+             .filter(leave_id=leave_id, applicant=request.user).first())
+    if leave is None:
+        return _error(f"LEAVE-{leave_id} does not exist or is not yours.", 404)
+    if leave.status != 'pending' or not _cancel_pending(leave):     # reviewed, maybe since the read
+        return _error("Only pending applications can be cancelled.", 409)
+    return HttpResponse(status=204)
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import api
+
+# Mounted at /api/v1/ (leave_system/urls.py)
+urlpatterns = [
+    path('leaves/',                api.leaves,   name='api_leaves'),
+    path('leaves/review/',         api.review,   name='api_review'),
+    path('leaves/<int:leave_id>/', api.leave,    name='api_leave'),
+    path('balances/',              api.balances, name='api_balances'),
+]
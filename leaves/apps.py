@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from leave_system.db import apply_sqlite_pragmas
 
 class LeavesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'leaves'
+
+    def ready(self):
+        from . import balances, fragments  # noqa: F401 — connect the cache invalidation receivers
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='leavems_sqlite_pragmas')
+
+        if getattr(settings, 'LEAVEMS_TEMPLATE_MODE', 'dev') == 'production':
+            from leave_system.templating import precompile
+            precompile()
@@ -0,0 +1,102 @@
+"""
+Per-user leave-balance cache (Django cache framework, locmem by default).
+
+Keyed by (user, year). Reads come from the cache; the approve paths in
+views.py write the fresh row back through store_balance(), so a warm
+cache never touches the database on read-only pages. Any other save() or
+delete() of a LeaveBalance (admin edits included) drops the key when its
+transaction commits.
+"""
+
+from datetime import datetime
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import LeaveBalance
+
+
+BALANCE_TIMEOUT = 60 * 60       # seconds; bounds staleness across processes
+BALANCE_FIELDS  = ('id', 'user_id', 'year', 'casual_leave', 'sick_leave', 'earned_leave', 'carried_forward')
+
+
+def balance_cache_key(user_id, year):
+    return f'leavems:balance:{user_id}:{year}'
+
+
+def _to_cache(lb):
+    return {f: getattr(lb, f) for f in BALANCE_FIELDS}
+
+
+def _from_cache(values):
+    lb = LeaveBalance(**values)
+    lb._state.adding = False
+    lb._state.db     = 'default'
+    return lb
+
+
+def review_year(review_date):
+    """Balance year an approval is charged to: the local (TIME_ZONE) year of its review."""
+    return timezone.localtime(review_date).year
+
+
+def get_balance(user, year=None):
+    """Cached replacement for LeaveBalance.objects.get_or_create(user=…, year=…)."""
+    year   = year or datetime.now().year
+    key    = balance_cache_key(user.pk, year)
+    values = cache.get(key)
+    if values is not None:
+        return _from_cache(values)
+    lb, _ = LeaveBalance.objects.get_or_create(user=user, year=year)
+    cache.set(key, _to_cache(lb), BALANCE_TIMEOUT)
+    return lb
+
+
+def store_balance(lb):
+    """Write-through: call after every change to a LeaveBalance row."""
+    cache.set(balance_cache_key(lb.user_id, lb.year), _to_cache(lb), BALANCE_TIMEOUT)
+
+
+def cache_is_shared():
+    """False for per-process backends, where keys set by one process are never seen by another."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def warm_balances(user_ids, year=None):
+    """
+    Preload the cache for many users: one SELECT, one bulk INSERT for
+    any missing rows, one cache.set_many(). Returns the number cached.
+    """
+    year     = year or datetime.now().year
+    user_ids = list(user_ids)
+    existing = {lb.user_id: lb for lb in LeaveBalance.objects.filter(user_id__in=user_ids, year=year)}
+    missing  = [LeaveBalance(user_id=uid, year=year) for uid in user_ids if uid not in existing]
+    if missing:
+        LeaveBalance.objects.bulk_create(missing, ignore_conflicts=True)
+        for lb in LeaveBalance.objects.filter(user_id__in=[m.user_id for m in missing], year=year):
+            existing[lb.user_id] = lb
+    cache.set_many(
+        {balance_cache_key(uid, year): _to_cache(lb) for uid, lb in existing.items()},
+        BALANCE_TIMEOUT,
+    )
+    return len(existing)
+
+
+def forget_balances(user_years):
+    """Drops cached rows after writes that send no signals (queryset updates)."""
+    cache.delete_many([balance_cache_key(uid, year) for uid, year in user_years])
+
+
+# ── invalidation on ORM writes ───────────────────────────────
+# The conditional UPDATEs of the approve paths send no signals; their
+# callers store_balance() / warm_balances() the fresh rows themselves.
+
+@receiver([post_save, post_delete], sender=LeaveBalance)
+def _balance_changed(sender, instance, **kwargs):
+    key = balance_cache_key(instance.user_id, instance.year)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,110 @@
+"""
+Conditional GET (ETag / Last-Modified → 304) for read-only leave pages.
+
+    @conditional_page(my_leaves_validator)
+    def employee_my_leaves(request): …
+
+A validator returns (parts, last_modified) — or None to skip — WITHOUT
+rendering: one aggregate over the user's scope
+(count, max leave_id, max applied_date, max review_date), so every create,
+cancel and review changes it, plus the scope's fragment generation from
+fragments.py for edits that move none of those (admin edits of a leave,
+recompute_total_days). The ETag also covers the user, the query
+string (status filter / cursor), the CSRF secret (the page embeds a token),
+the global user generation from fragments.py (renames, role and department
+moves) and LEAVEMS_RELEASE (set per deploy so new templates are not masked
+by old ETags).
+
+Skipped for non-GETs and while flash messages are waiting to be shown.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .balances import get_balance
+from .events import leave_channel
+from .fragments import version
+from .models import LeaveApplication
+from .permissions import leave_access
+
+
+def conditional_page(validator):
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or len(getattr(request, '_messages', ())):
+                return view_func(request, *args, **kwargs)
+            validated = validator(request, *args, **kwargs)
+            if validated is None:
+                return view_func(request, *args, **kwargs)
+
+            parts, last_modified = validated
+            etag = _etag(request, parts)
+            last_modified = last_modified and int(last_modified.timestamp())
+            # ETag only: a cancelled (deleted) leave does not move Last-Modified,
+            # so If-Modified-Since alone could serve a stale page
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                # Recomputed: rendering may have just issued the CSRF secret
+                response['ETag'] = _etag(request, parts)
+                if last_modified:
+                    response['Last-Modified'] = http_date(last_modified)
+                response['Cache-Control'] = 'private, no-cache'     # always revalidate
+            return response
+        return wrapper
+    return decorator
+
+
+def _etag(request, parts):
+    raw = '|'.join(str(p) for p in (
+        getattr(settings, 'LEAVEMS_RELEASE', ''),
+        version(),
+        request.user.pk,
+        request.META.get('CSRF_COOKIE', ''),
+        request.GET.urlencode(),
+        *parts,
+    ))
+    return '"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def _scope_validator(queryset):
+    agg = queryset.aggregate(
+        n=Count('pk'), last_id=Max('leave_id'),
+        applied=Max('applied_date'), reviewed=Max('review_date'),
+    )
+    stamps = [d for d in (agg['applied'], agg['reviewed']) if d]
+    return [agg['n'], agg['last_id'], agg['applied'], agg['reviewed']], max(stamps) if stamps else None
+
+
+# ── validators ───────────────────────────────────────────────
+def detail_validator(request, leave_id):
+    access = leave_access(request, leave_id)     # memoized — the view reuses this leave
+    if access.view_denied:
+        return None
+    leave = access.leave
+    parts = [leave.leave_id, leave.status, leave.total_days, leave.reviewed_by_id,
+             leave.review_date, leave.review_comment, leave.start_date, leave.end_date,
+             leave.leave_type, leave.reason]
+    return parts, max(d for d in (leave.applied_date, leave.review_date) if d)
+
+
+def my_leaves_validator(request):
+    user = request.user
+    parts, last_modified = _scope_validator(LeaveApplication.objects.filter(applicant=user))
+    lb = get_balance(user)                        # cached; the page shows the balances
+    return parts + [lb.casual_leave, lb.sick_leave, lb.earned_leave,
+                    version(leave_channel(user.role, user.department))], last_modified
+
+
+def manager_leaves_validator(request):
+    parts, last_modified = _scope_validator(LeaveApplication.objects.filter(applicant_role='manager'))
+    return parts + [version('managers')], last_modified
@@ -0,0 +1,202 @@
+"""
+Leave change feed (pending-queue push updates).
+
+    publish_leave_event('created' | 'cancelled' | 'reviewed', leave)
+        → call inside the view's transaction; the event goes out on commit
+    event_stream(channel, after, asynchronous)
+        → Server-Sent Events body for /events/ (sync for WSGI, async for ASGI)
+    live_queue_enabled(request)
+        → whether /events/ is served: always under ASGI, under WSGI only
+          with LEAVEMS_LIVE_QUEUE (a stream pins a worker thread there)
+
+Channels follow the review queues:
+    dept:<department>   employee leaves → that department's manager
+    managers            manager leaves  → admins
+
+Every event gets a sequence number; a client reconnecting with Last-Event-ID
+(or ?after=) receives what it missed, as long as it is still in the broker's
+buffer — otherwise it gets a `reset` event and should reload the page.
+
+The default InProcessBroker only reaches clients served by the same process.
+Point LEAVEMS_EVENT_BROKER at another class with the same publish/since/wait/
+wait_async methods (Redis, a test recorder …) to swap it.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+BUFFER_SIZE    = 1000        # events kept for reconnecting clients
+KEEPALIVE      = 15          # seconds between SSE comments on an idle stream
+STREAM_SECONDS = 300         # a stream ends after this; EventSource reconnects with Last-Event-ID
+RETRY_MS       = 3000
+
+
+class InProcessBroker:
+    """Thread-safe ring buffer of (seq, channel, payload) with blocking and async waits."""
+
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self._events  = deque(maxlen=buffer_size)
+        self._seq     = 0
+        self._cond    = threading.Condition()
+        self._waiters = set()        # (loop, future) of async subscribers
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, channel, payload):
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, channel, payload))
+            self._cond.notify_all()
+            waiters = list(self._waiters)
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        return self._seq
+
+    def since(self, channels, after):
+        """
+        Events on `channels` with seq > after, oldest first.
+        Returns None if the client is too far behind (or ahead, after a
+        restart) for the buffer to replay — it must resync.
+        """
+        with self._cond:
+            return self._since(channels, after)
+
+    def _since(self, channels, after):
+        if after > self._seq or (self._events and after < self._events[0][0] - 1):
+            return None
+        return [(seq, payload) for seq, channel, payload in self._events
+                if seq > after and channel in channels]
+
+    def wait(self, channels, after, timeout):
+        """Blocks until there are events after `after` (or timeout). Same result as since()."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._since(channels, after) != [], timeout)
+            return self._since(channels, after)
+
+    async def wait_async(self, channels, after, timeout):
+        """Async wait() — parks a future instead of a thread."""
+        loop   = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            events = self._since(channels, after)
+            if events != []:
+                return events
+            self._waiters.add((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._waiters.discard((loop, future))
+        return self.since(channels, after)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    path = getattr(settings, 'LEAVEMS_EVENT_BROKER', 'leaves.events.InProcessBroker')
+    return import_string(path)()
+
+
+@receiver(setting_changed)
+def _reset_broker(setting, **kwargs):
+    if setting == 'LEAVEMS_EVENT_BROKER':
+        get_broker.cache_clear()
+
+
+# ── publishing ───────────────────────────────────────────────
+def leave_channel(role, department):
+    """Queue a leave belongs to: employee leaves by department, manager leaves to admins."""
+    return 'managers' if role == 'manager' else f'dept:{department}'
+
+
+def live_queue_enabled(request):
+    return isinstance(request, ASGIRequest) or getattr(settings, 'LEAVEMS_LIVE_QUEUE', False)
+
+
+def live_queue(request):
+    """Context processor: queue pages include shared/live_queue.html only if the feed is served."""
+    return {'live_queue': live_queue_enabled(request)}
+
+
+def subscriber_channels(user):
+    if user.role == 'admin':
+        return {'managers'}
+    if user.role == 'manager':
+        return {f'dept:{user.department}'}
+    return set()
+
+
+def publish_leave_event(kind, leave):
+    """Publishes after the surrounding transaction commits (immediately if there is none)."""
+    channel = leave_channel(leave.applicant_role, leave.applicant_department)
+    payload = {
+        'type':       kind,
+        'leave_id':   leave.leave_id,
+        'status':     leave.status,
+        'applicant':  leave.applicant.get_full_name() or leave.applicant.username,
+        'leave_type': leave.leave_type,
+        'start_date': leave.start_date.isoformat(),
+        'end_date':   leave.end_date.isoformat(),
+        'total_days': leave.total_days,
+    }
+    transaction.on_commit(lambda: get_broker().publish(channel, payload))
+
+
+# ── SSE ──────────────────────────────────────────────────────
+def _format(events):
+    if events is None:
+        return f"event: reset\ndata: {{}}\n\n"
+    return ''.join(f"id: {seq}\nevent: leave\ndata: {json.dumps(payload)}\n\n" for seq, payload in events)
+
+
+def event_stream(channels, after, asynchronous=False):
+    """SSE body. `after` None = only events from now on."""
+    broker = get_broker()
+    after  = broker.last_seq if after is None else after
+    if asynchronous:
+        return _async_stream(broker, channels, after)
+    return _sync_stream(broker, channels, after)
+
+
+def _sync_stream(broker, channels, after):
+    yield f"retry: {RETRY_MS}\n\n"
+    deadline = time.monotonic() + STREAM_SECONDS
+    while time.monotonic() < deadline:
+        events = broker.wait(channels, after, KEEPALIVE)
+        if events is None:
+            yield _format(None)
+            return
+        yield _format(events) if events else ": keepalive\n\n"
+        after = events[-1][0] if events else after
+
+
+async def _async_stream(broker, channels, after):
+    yield f"retry: {RETRY_MS}\n\n"
+    deadline = time.monotonic() + STREAM_SECONDS
+    while time.monotonic() < deadline:
+        events = await broker.wait_async(channels, after, KEEPALIVE)
+        if events is None:
+            yield _format(None)
+            return
+        yield _format(events) if events else ": keepalive\n\n"
+        after = events[-1][0] if events else after
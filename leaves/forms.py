@@ -23,6 +23,10 @@ class LeaveApplicationForm(forms.ModelForm):
             }),
         }
 
+    def __init__(self, *args, applicant=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.applicant = applicant
+
     def clean(self):
         cd = super().clean()
         s  = cd.get('start_date')
@@ -34,6 +38,14 @@ class LeaveApplicationForm(forms.ModelForm):
                 raise forms.ValidationError("End date must be on or after start date.")
             if (e - s).days > 30:
                 raise forms.ValidationError("A single application cannot exceed 30 days.")
+            if self.applicant is not None:
+                clash = (LeaveApplication.objects.filter(applicant=self.applicant)
+                         .active().overlapping(s, e).order_by('start_date').first())
+                if clash:
+                    raise forms.ValidationError(
+                        f"These dates overlap LEAVE-{clash.leave_id} "
+                        f"({clash.start_date:%d %b %Y} – {clash.end_date:%d %b %Y}, {clash.get_status_display()})."
+                    )
         return cd
 
 
@@ -56,3 +68,23 @@ class ReviewForm(forms.Form):
             'placeholder': 'Add a comment for the applicant...'
         })
     )
+
+
+class BulkReviewForm(ReviewForm):
+    """One decision applied to many leave IDs from the pending queues."""
+    MAX_ITEMS = 1000
+
+    leave_ids = forms.Field(widget=forms.MultipleHiddenInput)
+
+    def clean_leave_ids(self):
+        raw = self.cleaned_data['leave_ids']
+        # A str or dict would be iterated as digits / keys — only lists are IDs
+        if not isinstance(raw, (list, tuple)) or any(isinstance(v, bool) for v in raw):
+            raise forms.ValidationError("Leave IDs must be a list of integers.")
+        try:
+            ids = sorted({int(v) for v in raw})
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Leave IDs must be integers.")
+        if len(ids) > self.MAX_ITEMS:
+            raise forms.ValidationError(f"At most {self.MAX_ITEMS} leaves can be reviewed at once.")
+        return ids
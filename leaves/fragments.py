@@ -0,0 +1,102 @@
+"""
+Generation counters for dashboard fragment caching.
+
+    version('dept:IT')      → "<global gen>.<dept gen>"  for cache keys / {% cache %}
+    bump('dept:IT')         → after the transaction commits, old keys stop matching
+    cached_value(name, v, fn) → fn() cached under (name, v)
+
+Channels are the review queues from events.py: `dept:<department>` for
+employee leaves, `managers` for manager leaves. The global generation is
+bumped on any user change (names, roles, department moves), which is rare
+and touches every fragment.
+
+Nothing is ever deleted: a bump makes new keys and the stale ones expire
+after FRAGMENT_TIMEOUT. Generations start from the clock, so a counter lost
+to cache eviction or a restart cannot roll back onto an old key.
+
+Requests reading from the replica use cached fragments but never fill them
+(fill_timeout() is 0): a lagging replica would otherwise store pre-write
+data under the post-write generation until FRAGMENT_TIMEOUT.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from leave_system.replica import reading_from_replica
+
+from .events import leave_channel
+
+
+FRAGMENT_TIMEOUT = 10 * 60
+GLOBAL           = 'all'
+
+
+def _gen_key(channel):
+    return f'leavems:gen:{channel}'
+
+
+def version(channel=None):
+    """Current version string for a channel (None → global generation only)."""
+    channels = [GLOBAL] + ([channel] if channel else [])
+    keys     = [_gen_key(c) for c in channels]
+    found    = cache.get_many(keys)
+    missing  = {k: time.time_ns() // 1000 for k in keys if k not in found}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, None)
+        found = cache.get_many(keys)
+    return '.'.join(str(found.get(k, 0)) for k in keys)
+
+
+def _bump_now(channels):
+    for channel in channels:
+        key = _gen_key(channel)
+        try:
+            cache.incr(key)
+        except ValueError:                 # never read yet (or evicted)
+            cache.set(key, time.time_ns() // 1000, None)
+
+
+def bump(*channels):
+    """Invalidates the channels' fragments once the current transaction commits."""
+    transaction.on_commit(lambda: _bump_now(channels))
+
+
+def bump_for(leaves):
+    """bump() for the queues the given leaves belong to."""
+    bump(*{leave_channel(l.applicant_role, l.applicant_department) for l in leaves})
+
+
+def fill_timeout(timeout=FRAGMENT_TIMEOUT):
+    """Timeout for filling a fragment now — 0 (don't store) on replica reads."""
+    return 0 if reading_from_replica() else timeout
+
+
+def cached_value(name, version_str, compute, timeout=FRAGMENT_TIMEOUT):
+    key   = f'leavems:frag:{name}:{version_str}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if fill_timeout(timeout):
+            cache.set(key, value, timeout)
+    return value
+
+
+# ── invalidation on ORM writes ───────────────────────────────
+# Creates/cancels go through save()/delete(); reviews use queryset UPDATEs,
+# so the review helpers in views.py call bump_for() themselves.
+
+@receiver([post_save, post_delete], sender='leaves.LeaveApplication')
+def _leave_changed(sender, instance, **kwargs):
+    bump_for([instance])
+
+
+@receiver([post_save, post_delete], sender='accounts.User')
+def _user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return                              # every login saves last_login — not shown anywhere
+    bump(GLOBAL)
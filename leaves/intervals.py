@@ -0,0 +1,72 @@
+"""
+In-memory interval index for "who is out on these dates?" questions.
+
+    index = IntervalIndex((l.start_date, l.end_date, l) for l in leaves)
+    index.overlapping(date(2026, 3, 2), date(2026, 3, 6))   → [(start, end, leave), …]
+
+Static augmented interval tree: items sorted by start, laid out as an
+implicit balanced BST over the sorted array, each node storing the max end
+of its subtree. Build O(n log n), query O(log n + k).
+
+find_overlaps() is the single-pass sweep used to reconcile existing data.
+"""
+
+
+class IntervalIndex:
+
+    def __init__(self, items):
+        self._items   = sorted(items, key=lambda item: (item[0], item[1]))
+        self._max_end = [None] * len(self._items)
+        if self._items:
+            self._build(0, len(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def _build(self, lo, hi):
+        mid = (lo + hi) // 2
+        top = self._items[mid][1]
+        if lo < mid:
+            top = max(top, self._build(lo, mid))
+        if mid + 1 < hi:
+            top = max(top, self._build(mid + 1, hi))
+        self._max_end[mid] = top
+        return top
+
+    def overlapping(self, start, end):
+        """All items with item.start <= end and item.end >= start, ordered by start."""
+        found, stack = [], [(0, len(self._items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] < start:
+                continue                     # nothing in this subtree reaches `start`
+            stack.append((lo, mid))
+            item = self._items[mid]
+            if item[0] <= end:               # right subtree starts later — only if mid does
+                if item[1] >= start:
+                    found.append(item)
+                stack.append((mid + 1, hi))
+        found.sort(key=lambda item: (item[0], item[1]))
+        return found
+
+
+def find_overlaps(rows):
+    """
+    rows: iterable of (applicant_id, start, end, leave_id).
+    Returns [(earlier_leave_id, leave_id), …] in ONE sort + sweep instead of
+    comparing every pair: each leave that overlaps an earlier leave of the
+    same applicant is reported once, paired with the earlier leave that
+    reaches furthest.
+    """
+    pairs = []
+    last  = {}          # applicant_id → (max end so far, leave_id holding it)
+    for applicant_id, start, end, leave_id in sorted(rows, key=lambda r: (r[0], r[1], r[3])):
+        prev = last.get(applicant_id)
+        if prev and prev[0] >= start:
+            pairs.append((prev[1], leave_id))
+        if not prev or end > prev[0]:
+            last[applicant_id] = (end, leave_id)
+    return pairs
@@ -0,0 +1,168 @@
+"""
+Concurrent-write benchmark: default SQLite setup vs the production profile.
+
+    python manage.py bench_concurrent_writes [--writers 8] [--readers 4] [--ops 200] [--json]
+
+Each profile runs in a child process of this command, on a scratch SQLite
+file (LEAVEMS_SQLITE_PATH — the real database is not touched) and with the
+connection settings LEAVEMS_DB_PROFILE gives it in settings.py. Writer threads run approval-shaped transactions — a conditional balance
+deduction plus an outbox INSERT — while reader threads run dashboard-style
+counts. After every transaction a thread does what Django does at the end
+of a request (close_if_unusable_or_obsolete), so:
+
+    baseline     LEAVEMS_DB_PROFILE=dev: rollback journal, 5s busy handler,
+                 new connection per request
+    production   LEAVEMS_DB_PROFILE=production: WAL + PRODUCTION_PRAGMAS,
+                 persistent connections + health checks
+
+Reports writes/s, reads/s, latency percentiles and "database is locked" errors.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from accounts.models import User
+from leave_system.instrumentation import percentile
+from leaves.models import EmailOutbox, LeaveBalance
+
+
+PROFILES = {
+    #             LEAVEMS_DB_PROFILE
+    'baseline':   'dev',
+    'production': 'production',
+}
+
+
+class Command(BaseCommand):
+    help = "Compare write throughput of the default and production SQLite profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--ops', type=int, default=200, help='Transactions per writer')
+        parser.add_argument('--json', action='store_true')
+        parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark compares SQLite profiles; the default database is not SQLite.")
+        if options['child']:
+            if not os.environ.get('LEAVEMS_SQLITE_PATH'):
+                raise CommandError("--child runs only on a scratch database (LEAVEMS_SQLITE_PATH).")
+            self.stdout.write(json.dumps(self._run(options)))
+            return
+
+        scratch = tempfile.mkdtemp(prefix='leavems-bench-')
+        results = {}
+        try:
+            for profile in PROFILES:
+                results[profile] = self._spawn(profile, scratch, options)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        base, prod = results['baseline'], results['production']
+        results['speedup'] = round(prod['writes_per_s'] / base['writes_per_s'], 2) if base['writes_per_s'] else None
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'profile':12} {'writes/s':>9} {'reads/s':>9} {'w p50':>8} {'w p95':>8} {'locked':>7}")
+        for profile in PROFILES:
+            r = results[profile]
+            self.stdout.write(f"{profile:12} {r['writes_per_s']:9.1f} {r['reads_per_s']:9.1f} "
+                              f"{r['write_p50_ms']:7.1f}ms {r['write_p95_ms']:7.1f}ms {r['locked_errors']:7}")
+        self.stdout.write(self.style.SUCCESS(f"Write throughput ×{results['speedup']} with the production profile."))
+
+    def _spawn(self, profile, scratch, options):
+        """Runs one profile in a fresh interpreter configured by settings.py alone."""
+        env = dict(os.environ, LEAVEMS_SQLITE_PATH=os.path.join(scratch, f'{profile}.sqlite3'),
+                   LEAVEMS_DB_PROFILE=PROFILES[profile])
+        for flag in ('LEAVEMS_DB', 'LEAVEMS_REPLICA_DB', 'LEAVEMS_CONN_MAX_AGE'):
+            env.pop(flag, None)
+        cmd  = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'bench_concurrent_writes', '--child',
+                '--writers', str(options['writers']), '--readers', str(options['readers']), '--ops', str(options['ops'])]
+        proc = subprocess.run(cmd, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"{profile} run failed:\n{proc.stderr[-2000:]}")
+        return json.loads(proc.stdout.splitlines()[-1])
+
+    def _run(self, options):
+        """The benchmark itself, on the default database (the child process)."""
+        call_command('migrate', verbosity=0)
+        year  = datetime.now().year
+        users = User.objects.bulk_create([User(username=f'bench{i}', password='!') for i in range(options['writers'])])
+        LeaveBalance.objects.bulk_create([LeaveBalance(user=u, year=year, casual_leave=10 ** 6) for u in users])
+
+        stats = {'write_times': [], 'reads': 0, 'locked': 0}
+        lock  = threading.Lock()
+        stop  = threading.Event()
+
+        def write(user_id):
+            times = []
+            for _ in range(options['ops']):
+                start = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        LeaveBalance.objects.deduct(user_id, year, 'casual', 1)
+                        EmailOutbox.objects.create(
+                            subject='bench', body='', from_email='bench@leavems.com', recipient='bench@example.com')
+                    times.append(time.perf_counter() - start)
+                except OperationalError:
+                    with lock:
+                        stats['locked'] += 1
+                connection.close_if_unusable_or_obsolete()      # end of "request"
+            connection.close()
+            with lock:
+                stats['write_times'].extend(times)
+
+        def read():
+            done = 0
+            while not stop.is_set():
+                try:
+                    EmailOutbox.objects.filter(status='pending').count()
+                    list(LeaveBalance.objects.filter(year=year).values_list('casual_leave', flat=True))
+                    done += 1
+                except OperationalError:
+                    with lock:
+                        stats['locked'] += 1
+                connection.close_if_unusable_or_obsolete()
+            connection.close()
+            with lock:
+                stats['reads'] += done
+
+        writers = [threading.Thread(target=write, args=(u.id,)) for u in users]
+        readers = [threading.Thread(target=read) for _ in range(options['readers'])]
+        started = time.perf_counter()
+        for t in readers + writers:
+            t.start()
+        for t in writers:
+            t.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for t in readers:
+            t.join()
+        connection.close()
+
+        times = sorted(t * 1000 for t in stats['write_times']) or [0]
+        return {
+            'writes':        len(stats['write_times']),
+            'writes_per_s':  round(len(stats['write_times']) / elapsed, 1),
+            'reads_per_s':   round(stats['reads'] / elapsed, 1),
+            'write_p50_ms':  round(percentile(times, 50), 2),
+            'write_p95_ms':  round(percentile(times, 95), 2),
+            'write_p99_ms':  round(percentile(times, 99), 2),
+            'locked_errors': stats['locked'],
+            'seconds':       round(elapsed, 2),
+        }
@@ -0,0 +1,123 @@
+"""
+Render time per template: default loaders vs the production template mode.
+
+    python manage.py seed_synthetic
+    python manage.py bench_templates [--iterations 200] [--only manager_team_leaves] [--json]
+
+Every page from run_benchmarks' ROUTES (plus the login page) is requested
+once through the test client to capture the template it renders and its
+context. That template is then loaded + rendered --iterations times with
+the captured context on two engines built from the project's settings:
+
+    uncached     filesystem/app-directory loaders without caching, template
+                 debug on — read and parsed from disk on every render
+    production   LEAVEMS_TEMPLATE_MODE=production: cached loaders, debug off
+
+"compile" is the one-off parse time of the page template itself — what
+precompile() pays at startup instead of the page's first visitor.
+"""
+
+import json
+import time
+
+from django.template import Engine, engines
+from django.template.backends.django import Template as DjangoTemplate
+from django.template.context import make_context
+from django.test import Client
+from django.urls import reverse
+
+from leave_system.instrumentation import percentile
+
+from .run_benchmarks import Command as RunBenchmarksCommand, ROUTES
+
+
+LOADERS = ['django.template.loaders.filesystem.Loader',
+           'django.template.loaders.app_directories.Loader']
+ENGINES = {
+    #              loaders                                          debug
+    'uncached':   (LOADERS,                                         True),
+    'production': ([('django.template.loaders.cached.Loader', LOADERS)], False),
+}
+
+
+class Command(RunBenchmarksCommand):
+    help = "Time loading + rendering of every page template, uncached vs production mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--only', nargs='*', help='Only these URL names')
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        self.actors = self._actors()
+        captured    = self._capture(options['only'])
+        results     = {}
+        for url_name, (template_name, context, request) in captured.items():
+            row = {'template': template_name, 'compile_ms': round(self._compile_ms(template_name), 2)}
+            for mode in ENGINES:
+                engine = self._engine(mode)
+                times  = sorted(self._render_ms(engine, template_name, context, request)
+                                for _ in range(options['iterations']))
+                row[f'{mode}_p50_ms'] = round(percentile(times, 50), 3)
+                row[f'{mode}_p95_ms'] = round(percentile(times, 95), 3)
+            row['speedup'] = round(row['uncached_p50_ms'] / row['production_p50_ms'], 2)
+            results[url_name] = row
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'page':22} {'template':30} {'compile':>9} {'uncached':>10} {'production':>11} {'×':>6}")
+        for url_name, r in results.items():
+            self.stdout.write(f"{url_name:22} {r['template']:30} {r['compile_ms']:7.2f}ms "
+                              f"{r['uncached_p50_ms']:8.3f}ms {r['production_p50_ms']:9.3f}ms {r['speedup']:6.2f}")
+
+    # ── capture ───────────────────────────────────────────────
+    def _capture(self, only):
+        """url name → (template name, context dict, request) of the page's top-level render."""
+        pages = {'login': (None, reverse('login'))}
+        for name, (role, _, _) in ROUTES.items():
+            if name == 'payroll_export' or name.startswith('api_'):     # CSV / JSON, no template
+                continue
+            path = self._path(name)
+            if path is not None:
+                pages[name] = (role, path)
+        if only:
+            pages = {n: p for n, p in pages.items() if n in only}
+
+        captured, original = {}, DjangoTemplate.render
+
+        def render(template, context=None, request=None):
+            captured.setdefault(current, (template.template.origin.template_name, context or {}, request))
+            return original(template, context, request)
+
+        DjangoTemplate.render = render
+        try:
+            for current, (role, path) in pages.items():
+                client = Client()
+                if role:
+                    client.force_login(self.actors[role])
+                client.get(path)
+        finally:
+            DjangoTemplate.render = original
+        return captured
+
+    # ── timing ────────────────────────────────────────────────
+    def _engine(self, mode):
+        loaders, debug = ENGINES[mode]
+        base = engines['django'].engine
+        return Engine(
+            dirs=base.dirs, context_processors=base.context_processors, debug=debug,
+            loaders=loaders, string_if_invalid=base.string_if_invalid,
+            libraries=base.libraries, builtins=base.builtins[len(Engine.default_builtins):],
+        )
+
+    def _compile_ms(self, template_name):
+        engine = self._engine('uncached')
+        start  = time.perf_counter()
+        engine.get_template(template_name)
+        return (time.perf_counter() - start) * 1000
+
+    def _render_ms(self, engine, template_name, context, request):
+        start = time.perf_counter()
+        engine.get_template(template_name).render(make_context(context, request, autoescape=engine.autoescape))
+        return (time.perf_counter() - start) * 1000
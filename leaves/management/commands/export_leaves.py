@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from leaves.exports import EXPORT_CHUNK_SIZE, approved_leaves, export_rows, month_range, write_csv
+
+
+class Command(BaseCommand):
+    help = "Stream approved leaves to CSV for payroll (constant memory)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='YYYY-MM (alternative to --start/--end)')
+        parser.add_argument('--start', type=date.fromisoformat, help='YYYY-MM-DD')
+        parser.add_argument('--end', type=date.fromisoformat, help='YYYY-MM-DD')
+        parser.add_argument('--department')
+        parser.add_argument('--output', help='File path (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                start, end = month_range(options['month'])
+            except ValueError:
+                raise CommandError("--month must look like 2026-01.")
+        elif options['start'] and options['end']:
+            start, end = options['start'], options['end']
+        else:
+            raise CommandError("Pass --month, or both --start and --end.")
+        if start > end:
+            raise CommandError("--start must be on or before --end.")
+
+        rows = export_rows(approved_leaves(start, end, options['department']), options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as fh:
+                count = write_csv(rows, fh)
+            self.stderr.write(self.style.SUCCESS(f"Exported {count} leave(s) to {options['output']}."))
+        else:
+            count = write_csv(rows, self.stdout)
+            self.stderr.write(f"Exported {count} leave(s).")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from leaves.intervals import find_overlaps
+from leaves.models import LeaveApplication
+
+
+class Command(BaseCommand):
+    help = "Report pending/approved leaves that overlap another leave of the same applicant."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help='Only check this department')
+
+    def handle(self, *args, **options):
+        leaves = LeaveApplication.objects.active()
+        if options['department']:
+            leaves = leaves.filter(applicant_department=options['department'])
+
+        rows  = leaves.values_list('applicant_id', 'start_date', 'end_date', 'leave_id').iterator(chunk_size=5000)
+        pairs = find_overlaps(rows)
+        for earlier, later in pairs:
+            self.stdout.write(f"LEAVE-{later} overlaps LEAVE-{earlier}")
+        self.stdout.write(self.style.SUCCESS(f"{len(pairs)} overlap(s) found."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from leaves.absence import rebuild_absences
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized team-absence calendar from approved employee leaves."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help='Only rebuild this department')
+
+    def handle(self, *args, **options):
+        departments = [options['department']] if options['department'] else None
+        written     = rebuild_absences(departments)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} department-day row(s)."))
@@ -0,0 +1,79 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from leaves.absence import rebuild_absences
+from leaves.balances import forget_balances, review_year
+from leaves.fragments import GLOBAL, bump
+from leaves.models import LeaveApplication, LeaveBalance
+from leaves.workdays import holiday_calendar
+
+
+class Command(BaseCommand):
+    help = ("Recompute LeaveApplication.total_days against the holiday calendar, in bulk. "
+            "Approved leaves that change get the difference refunded to (or charged from) "
+            "the balance they were deducted from, and their departments' absence calendar "
+            "is recounted — all in one transaction with the new totals.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', choices=[s for s, _ in LeaveApplication.STATUS_CHOICES],
+                            help='Only recompute leaves with this status (default: all)')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        calendar = holiday_calendar()
+        leaves   = LeaveApplication.objects.order_by('leave_id')
+        if options['status']:
+            leaves = leaves.filter(status=options['status'])
+
+        refunds     = Counter()     # (user_id, year, balance field) → days back to the balance
+        departments = set()         # absence calendar rows to recount
+        size, last_id, scanned, changed = options['batch_size'], 0, 0, 0
+        with transaction.atomic():
+            while True:
+                rows = list(leaves.filter(leave_id__gt=last_id).values_list(
+                    'leave_id', 'start_date', 'end_date', 'total_days', 'status', 'applicant_id',
+                    'applicant_role', 'applicant_department', 'leave_type', 'review_date')[:size])
+                if not rows:
+                    break
+                totals  = calendar.working_days_many([(r[1], r[2]) for r in rows])
+                updates = []
+                for (lid, start, _, old, status, user_id, role, dept, leave_type, reviewed), new in zip(rows, totals):
+                    new = max(new, 1)
+                    if new == old:
+                        continue
+                    updates.append(LeaveApplication(leave_id=lid, total_days=new))
+                    if status == 'approved':
+                        # Refund to the balance the review deducted from
+                        year = review_year(reviewed) if reviewed else start.year
+                        refunds[(user_id, year, LeaveBalance.BALANCE_FIELDS[leave_type])] += old - new
+                        if role == 'employee':
+                            departments.add(dept)
+                if updates and not options['dry_run']:
+                    LeaveApplication.objects.bulk_update(updates, ['total_days'], batch_size=500)
+                scanned += len(rows)
+                changed += len(updates)
+                last_id  = rows[-1][0]
+
+            if not options['dry_run']:
+                for (user_id, year, field), days in refunds.items():
+                    if days:
+                        LeaveBalance.objects.filter(user_id=user_id, year=year).update(**{field: F(field) + days})
+                if departments:
+                    rebuild_absences(sorted(departments))
+                if refunds:
+                    user_years = {(user_id, year) for user_id, year, _ in refunds}
+                    transaction.on_commit(lambda: forget_balances(user_years))
+                if changed:
+                    bump(GLOBAL)        # bulk_update sends no signals — refresh cached dashboards
+
+        dry = options['dry_run']
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} leave(s); {'would change' if dry else 'updated'} {changed}. "
+            f"Approved leaves: {len({k[0] for k in refunds})} user balance(s) "
+            f"{'to adjust' if dry else 'adjusted'}, {len(departments)} department calendar(s) "
+            f"{'to recount' if dry else 'recounted'}."
+        ))
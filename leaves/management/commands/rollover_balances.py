@@ -0,0 +1,97 @@
+"""
+Year rollover: create next year's LeaveBalance rows ahead of time.
+
+    python manage.py rollover_balances [--to-year 2027] [--carry-max 15] [--chunk-size 5000]
+
+For each chunk of users (keyset on user id) ONE query reads the users together
+with their unused earned leave for the previous year, and ONE bulk_create
+(ignore_conflicts) writes the new rows. Rows that already exist (created by an
+approval or a registration in the new year) get the carry-forward too: one
+UPDATE per carry value swaps their old carried_forward for the new one, so
+days already taken are kept and re-running is harmless. --start-after resumes
+from the last id printed.
+"""
+
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+
+from accounts.models import User
+from leaves.balances import forget_balances
+from leaves.models import LeaveBalance
+
+
+CARRY_FORWARD_MAX = 15      # max unused earned-leave days carried into the new year
+
+
+def _default(field):
+    return LeaveBalance._meta.get_field(field).default
+
+
+class Command(BaseCommand):
+    help = "Bulk-create next year's leave balances with earned-leave carry-forward."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to-year', type=int, help='Year to create (default: next year)')
+        parser.add_argument('--carry-max', type=int, default=CARRY_FORWARD_MAX)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--start-after', type=int, default=0, help='Resume after this user id')
+
+    def handle(self, *args, **options):
+        to_year, carry_max = options['to_year'] or datetime.now().year + 1, options['carry_max']
+        previous = LeaveBalance.objects.filter(user=OuterRef('pk'), year=to_year - 1)
+        users    = (User.objects.filter(is_active=True).order_by('id')
+                    .annotate(prev_earned=Subquery(previous.values('earned_leave')[:1])))
+
+        last_id, created, updated, scanned = options['start_after'], 0, 0, 0
+        started = time.perf_counter()
+        while True:
+            chunk = list(users.filter(id__gt=last_id).values_list('id', 'prev_earned')[:options['chunk_size']])
+            if not chunk:
+                break
+            carry = {user_id: min(max(prev_earned or 0, 0), carry_max) for user_id, prev_earned in chunk}
+            with transaction.atomic():
+                existing = set(LeaveBalance.objects.filter(year=to_year, user_id__in=carry)
+                               .values_list('user_id', flat=True))
+                LeaveBalance.objects.bulk_create([
+                    LeaveBalance(
+                        user_id=user_id,
+                        year=to_year,
+                        casual_leave=_default('casual_leave'),
+                        sick_leave=_default('sick_leave'),
+                        earned_leave=_default('earned_leave') + days,
+                        carried_forward=days,
+                    )
+                    for user_id, days in carry.items() if user_id not in existing
+                ], ignore_conflicts=True)
+                changed = self._update_existing(to_year, {u: carry[u] for u in existing})
+                transaction.on_commit(lambda ids=changed: forget_balances((u, to_year) for u in ids))
+            created += len(carry) - len(existing)
+            updated += len(changed)
+            scanned += len(chunk)
+            last_id  = chunk[-1][0]
+            self.stdout.write(f"… up to user id {last_id}: {scanned} scanned, {created} created, {updated} updated")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rollover to {to_year}: {created} balance(s) created, {updated} existing updated, "
+            f"{scanned - created - updated} already up to date ({elapsed:.1f}s)."
+        ))
+
+    def _update_existing(self, to_year, carry):
+        """
+        Sets the carry-forward of existing rows: earned_leave moves by the
+        difference to what was carried before. Returns the user ids changed.
+        """
+        by_days = {}
+        for user_id, days in carry.items():
+            by_days.setdefault(days, []).append(user_id)
+        changed = []
+        for days, user_ids in by_days.items():
+            rows = LeaveBalance.objects.filter(year=to_year, user_id__in=user_ids).exclude(carried_forward=days)
+            changed += rows.values_list('user_id', flat=True)
+            rows.update(earned_leave=F('earned_leave') - F('carried_forward') + days, carried_forward=days)
+        return changed
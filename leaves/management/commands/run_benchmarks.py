@@ -0,0 +1,533 @@
+"""
+Benchmark every page in leaves/urls.py through the Django test client.
+
+    python manage.py seed_synthetic
+    python manage.py run_benchmarks [--iterations 30] [--concurrency 4] [--output run.json]
+    python manage.py run_benchmarks --compare before.json        → p95 / query deltas
+    python manage.py run_benchmarks --scenario deep_pages [--page 10000]
+    python manage.py run_benchmarks --explain [--drop-indexes]   → + query plans, without the indexes
+
+Each URL is requested as a user of the right role (picked from the data, so
+run seed_synthetic first): a few warm-up hits, then --iterations timed hits,
+spread over --concurrency threads (one logged-in client per thread). The
+result is JSON — latency p50/p95/p99 and query counts per URL name — so runs
+can be kept and diffed. Only GETs are benchmarked; POST-only views are
+listed under "skipped". The JSON API (/api/v1/) is covered too, and
+"api_vs_html" compares its throughput with the matching HTML page.
+
+--explain adds the plan of every distinct SELECT a page runs (EXPLAIN QUERY
+PLAN on SQLite, EXPLAIN elsewhere). --drop-indexes removes the Meta indexes
+of LeaveApplication and User for the run and re-creates them afterwards, so
+the same dataset gives the before/after of the composite indexes:
+
+    python manage.py seed_synthetic --departments 4 --employees 2500 --leaves 100   # 1M leaves
+    python manage.py run_benchmarks --explain --drop-indexes --output before.json
+    python manage.py run_benchmarks --explain --compare before.json
+
+--scenario runs named scale checks instead of the URL sweep:
+
+    deep_pages   page 1 vs page --page of every keyset listing, next to the
+                 LIMIT/OFFSET lookup the same page would need
+    overlaps     on the manager's department (seed ≥100k leaves into it): the
+                 form's per-applicant overlap query, "who is out" per week from
+                 one IntervalIndex vs one query per week, and the find_overlaps
+                 reconciliation sweep
+    export       peak RSS of the payroll CSV export in a fresh process: this
+                 month vs every approved leave (seed ≥5M of them)
+    bulk_review  approving --bulk-size pending team leaves with one bulk POST
+                 vs one review POST per leave; both runs are rolled back
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from leave_system.instrumentation import percentile
+from leaves import api_urls, urls as leave_urls
+from leaves.api import _scope
+from leaves.balances import balance_cache_key
+from leaves.exports import month_range
+from leaves.intervals import find_overlaps
+from leaves.models import LeaveApplication, LeaveBalance
+from leaves.pagination import PER_PAGE, encode_cursor
+
+
+# url name → (acting user, leave picked for the <leave_id> argument, query string)
+ROUTES = {
+    'dashboard':           ('employee', None,            ''),
+    'employee_dashboard':  ('employee', None,            ''),
+    'employee_apply':      ('employee', None,            ''),
+    'employee_my_leaves':  ('employee', None,            ''),
+    'employee_cancel':     ('employee', 'own_pending',   ''),
+    'manager_dashboard':   ('manager',  None,            ''),
+    'manager_pending':     ('manager',  None,            ''),
+    'manager_review':      ('manager',  'team_pending',  ''),
+    'manager_team_leaves': ('manager',  None,            ''),
+    'manager_calendar':    ('manager',  None,            ''),
+    'manager_apply':       ('manager',  None,            ''),
+    'manager_my_leaves':   ('manager',  None,            ''),
+    'manager_cancel':      ('manager',  'own_pending',   ''),
+    'admin_dashboard':     ('admin',    None,            ''),
+    'admin_pending':       ('admin',    None,            ''),
+    'admin_review':        ('admin',    'managers_pending', ''),
+    'admin_all_leaves':    ('admin',    None,            ''),
+    'payroll_export':      ('staff',    None,            '?month={month}'),
+    'leave_detail':        ('employee', 'own_any',       ''),
+    'api_leaves':          ('employee', None,            ''),
+    'api_leave':           ('employee', 'own_any',       ''),
+    'api_balances':        ('employee', None,            ''),
+}
+SKIPPED = {
+    'manager_bulk_review': 'POST-only, changes data',
+    'admin_bulk_review':   'POST-only, changes data',
+    'leave_events':        'long-lived event stream',
+    'api_review':          'POST-only, changes data',
+}
+# JSON endpoint → HTML page serving the same data to the same user
+API_PAIRS = {
+    'api_leaves': 'employee_my_leaves',
+    'api_leave':  'leave_detail',
+}
+# Models whose Meta indexes --drop-indexes removes for a baseline run
+INDEXED_MODELS = (LeaveApplication, User)
+# --scenario names → Command._scenario_<name>
+SCENARIOS = ('deep_pages', 'overlaps', 'export', 'bulk_review')
+# Keyset listings for deep_pages: url name → (acting user, api._scope name)
+DEEP_PAGES = {
+    'employee_my_leaves':  ('employee', 'mine'),
+    'manager_my_leaves':   ('manager',  'mine'),
+    'manager_team_leaves': ('manager',  'team'),
+    'admin_all_leaves':    ('admin',    'team'),
+}
+
+# export scenario: one export to /dev/null, peak RSS before / after it
+EXPORT_PROBE = r"""
+import json, os, resource, sys, time
+from datetime import date
+import django
+django.setup()
+from leaves.exports import approved_leaves, export_rows, write_csv
+start, end = (date.fromisoformat(d) for d in sys.argv[1:3])
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0     = time.perf_counter()
+with open(os.devnull, 'w', newline='') as fh:
+    rows = write_csv(export_rows(approved_leaves(start, end)), fh)
+print(json.dumps({'rows': rows, 'seconds': time.perf_counter() - t0,
+                  'rss_before': before, 'rss_peak': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Time every leaves URL (p50/p95/p99 + query counts) and print JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations',  type=int, default=30)
+        parser.add_argument('--warmup',      type=int, default=3)
+        parser.add_argument('--concurrency', type=int, default=1, help='Client threads')
+        parser.add_argument('--only', nargs='*', help='Benchmark only these URL names')
+        parser.add_argument('--output', help='Write JSON here instead of stdout')
+        parser.add_argument('--compare', help='Earlier JSON run to print deltas against')
+        parser.add_argument('--explain', action='store_true', help='Record the plan of every SELECT per URL')
+        parser.add_argument('--drop-indexes', action='store_true',
+                            help='Run without the LeaveApplication/User Meta indexes (re-created afterwards)')
+        parser.add_argument('--scenario', nargs='+', choices=SCENARIOS, help='Scale checks instead of the URL sweep')
+        parser.add_argument('--page', type=int, default=10000, help='Deep page for the deep_pages scenario')
+        parser.add_argument('--bulk-size', type=int, default=1000, help='Leaves for the bulk_review scenario')
+
+    def handle(self, *args, **options):
+        names = [p.name for p in [*leave_urls.urlpatterns, *api_urls.urlpatterns] if p.name]
+        unknown = [n for n in names if n not in ROUTES and n not in SKIPPED]
+        if unknown:
+            raise CommandError(f"No benchmark route for: {', '.join(unknown)} — add them to ROUTES or SKIPPED.")
+        if options['only']:
+            names = [n for n in names if n in options['only']]
+
+        self.actors = self._actors()
+        self.local  = threading.local()
+        if options['scenario']:
+            scenarios = {name: getattr(self, f'_scenario_{name}')(options) for name in options['scenario']}
+            self._write({'meta': self._meta(options), 'scenarios': scenarios}, options)
+            return
+
+        results, skipped = {}, dict(SKIPPED)
+        dropped = self._drop_indexes() if options['drop_indexes'] else []
+        try:
+            for name in names:
+                if name in SKIPPED:
+                    continue
+                path = self._path(name)
+                if path is None:
+                    skipped[name] = 'no suitable user/leave in the data'
+                    continue
+                results[name] = self._run(name, path, options)
+                if options['explain']:
+                    results[name]['plans'] = self._explain(ROUTES[name][0], path)
+                if options['output'] or options['compare']:
+                    r = results[name]
+                    self.stderr.write(f"{name:22} p50 {r['p50_ms']:7.2f}ms  p95 {r['p95_ms']:7.2f}ms  q={r['queries_max']}")
+        finally:
+            self._restore_indexes(dropped)
+
+        report = {
+            'meta':    dict(self._meta(options), indexes='dropped' if dropped else 'model'),
+            'results': results,
+            'skipped': skipped,
+            'api_vs_html': {
+                api: {'html': html, 'rps_ratio': round(results[api]['rps'] / results[html]['rps'], 2)}
+                for api, html in API_PAIRS.items() if api in results and html in results
+            },
+        }
+        self._write(report, options)
+        if options['compare']:
+            self._compare(options['compare'], results)
+
+    def _meta(self, options):
+        return {
+            'at':          timezone.now().isoformat(),
+            'commit':      _git_commit(),
+            'database':    connection.vendor,
+            'iterations':  options['iterations'],
+            'concurrency': options['concurrency'],
+            'users':       User.objects.count(),
+            'leaves':      LeaveApplication.objects.count(),
+        }
+
+    def _write(self, report, options):
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote the report to {options['output']}."))
+        elif not options['compare']:
+            self.stdout.write(output)
+
+    # ── setup ─────────────────────────────────────────────────
+    def _actors(self):
+        """One user per role: an employee with a pending leave and their department's manager."""
+        employee = (User.objects.filter(role='employee', submitted_leaves__status='pending')
+                    .order_by('id').first())
+        manager  = None
+        if employee:
+            manager = User.objects.filter(role='manager', department=employee.department).order_by('id').first()
+        return {
+            'employee': employee,
+            'manager':  manager or User.objects.filter(role='manager').order_by('id').first(),
+            'admin':    User.objects.filter(role='admin').order_by('id').first(),
+            'staff':    User.objects.filter(is_staff=True, is_active=True).order_by('id').first(),
+        }
+
+    def _path(self, name):
+        role, pick, query = ROUTES[name]
+        user = self.actors[role]
+        if user is None:
+            return None
+        args = ()
+        if pick:
+            leaves = {
+                'own_pending':      LeaveApplication.objects.filter(applicant=user, status='pending'),
+                'own_any':          LeaveApplication.objects.filter(applicant=user),
+                'team_pending':     LeaveApplication.objects.filter(
+                    applicant_role='employee', applicant_department=user.department, status='pending'),
+                'managers_pending': LeaveApplication.objects.filter(applicant_role='manager', status='pending'),
+            }[pick]
+            leave_id = leaves.order_by('-applied_date', '-leave_id').values_list('leave_id', flat=True).first()
+            if leave_id is None:
+                return None
+            args = (leave_id,)
+        return reverse(name, args=args) + query.format(month=timezone.localdate().strftime('%Y-%m'))
+
+    # ── timing ────────────────────────────────────────────────
+    def _client(self, role):
+        clients = getattr(self.local, 'clients', None)
+        if clients is None:
+            clients = self.local.clients = {}
+        if role not in clients:
+            clients[role] = Client()
+            clients[role].force_login(self.actors[role])
+        return clients[role]
+
+    def _hit(self, role, path):
+        client = self._client(role)
+        with CaptureQueriesContext(connection) as ctx:
+            start    = time.perf_counter()
+            response = client.get(path)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed  = time.perf_counter() - start
+        return elapsed, len(ctx), response.status_code
+
+    def _run(self, name, path, options):
+        role = ROUTES[name][0]
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(lambda _: self._hit(role, path), range(options['warmup'] * options['concurrency'])))
+            start   = time.perf_counter()
+            samples = list(pool.map(lambda _: self._hit(role, path), range(options['iterations'])))
+            wall    = time.perf_counter() - start
+
+        times   = sorted(s[0] * 1000 for s in samples)
+        queries = sorted(s[1] for s in samples)
+        return {
+            'path':        path,
+            'status':      sorted({s[2] for s in samples}),
+            'n':           len(samples),
+            'mean_ms':     round(sum(times) / len(times), 2),
+            'rps':         round(len(samples) / wall, 1),
+            'p50_ms':      round(percentile(times, 50), 2),
+            'p95_ms':      round(percentile(times, 95), 2),
+            'p99_ms':      round(percentile(times, 99), 2),
+            'queries_p50': percentile(queries, 50),
+            'queries_max': queries[-1],
+        }
+
+    # ── query plans ───────────────────────────────────────────
+    def _explain(self, role, path):
+        """[{sql, plan}] for each distinct SELECT of one request to `path`."""
+        with CaptureQueriesContext(connection) as ctx:
+            self._hit(role, path)
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        plans  = []
+        for sql in dict.fromkeys(q['sql'] for q in ctx.captured_queries):
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql)
+                rows = cursor.fetchall()
+            plans.append({'sql': sql, 'plan': [str(row[-1]) for row in rows]})
+        return plans
+
+    def _drop_indexes(self):
+        """Remove the Meta indexes of INDEXED_MODELS; returns what _restore_indexes re-creates."""
+        dropped = [(model, index) for model in INDEXED_MODELS for index in model._meta.indexes]
+        with connection.schema_editor() as editor:
+            for model, index in dropped:
+                editor.remove_index(model, index)
+        self.stderr.write(f"Dropped {len(dropped)} index(es) for this run.")
+        return dropped
+
+    def _restore_indexes(self, dropped):
+        if not dropped:
+            return
+        with connection.schema_editor() as editor:
+            for model, index in dropped:
+                editor.add_index(model, index)
+        self.stderr.write(f"Re-created {len(dropped)} index(es).")
+
+    # ── scenarios ─────────────────────────────────────────────
+    def _scenario_deep_pages(self, options):
+        """Page 1 vs page --page (or the last page) of each keyset listing."""
+        report = {}
+        for name, (role, scope) in DEEP_PAGES.items():
+            user = self.actors[role]
+            if user is None:
+                continue
+            listing = _scope(user, scope).order_by('-applied_date', '-leave_id')
+            total   = listing.count()
+            page    = min(options['page'], max(-(-total // PER_PAGE), 1))
+            path    = reverse(name)
+            row     = {'rows': total, 'page': page, 'first': self._run(name, path, options)}
+            if page > 1:
+                # The row before the page: its cursor is what "next" links carry.
+                # Fetching it by OFFSET is what LIMIT/OFFSET pagination pays per page.
+                start = time.perf_counter()
+                last  = listing.values('applied_date', 'leave_id')[(page - 1) * PER_PAGE - 1]
+                row['offset_lookup_ms'] = round((time.perf_counter() - start) * 1000, 2)
+                row['deep']             = self._run(name, f"{path}?cursor={encode_cursor(last, 'n')}", options)
+                row['p50_ratio']        = round(row['deep']['p50_ms'] / row['first']['p50_ms'], 2)
+            report[name] = row
+            deep = row.get('deep', row['first'])
+            self.stderr.write(f"{name:22} {total:>9} rows  page 1 p50 {row['first']['p50_ms']:7.2f}ms  "
+                              f"page {page} p50 {deep['p50_ms']:7.2f}ms")
+        return report
+
+    def _scenario_overlaps(self, options):
+        """Overlap check at submission and "who is out" for one department."""
+        dept   = self.actors['manager'].department
+        leaves = LeaveApplication.objects.filter(applicant_role='employee', applicant_department=dept).active()
+        rng    = random.Random(42)
+        year   = timezone.localdate().year
+        people = list(User.objects.filter(role='employee', department=dept).values_list('id', flat=True))
+
+        # LeaveApplicationForm.clean: one indexed query per submission
+        def check():
+            start = date(year, 1, 1) + timedelta(days=rng.randrange(360))
+            qs    = (LeaveApplication.objects.filter(applicant_id=rng.choice(people))
+                     .active().overlapping(start, start + timedelta(days=2)).order_by('start_date'))
+            return _timed(qs.first)[0]
+        checks = sorted(check() for _ in range(options['iterations']))
+        plan   = (LeaveApplication.objects.filter(applicant_id=people[0]).active()
+                  .overlapping(date(year, 6, 1), date(year, 6, 3)).order_by('start_date').explain())
+
+        # "Who is out?" for every week of the year
+        weeks        = [(date(year, 1, 1) + timedelta(weeks=w), date(year, 1, 5) + timedelta(weeks=w))
+                        for w in range(52)]
+        build, index = _timed(lambda: leaves.interval_index('leave_id', 'applicant_id'))
+        from_index   = [_timed(lambda w=w: index.overlapping(*w)) for w in weeks]
+        from_db      = [_timed(lambda w=w: list(leaves.overlapping(*w).values_list('leave_id', flat=True)))
+                        for w in weeks]
+        same = all(sorted(item[2][0] for item in i) == sorted(d)
+                   for (_, i), (_, d) in zip(from_index, from_db))
+
+        rows         = leaves.values_list('applicant_id', 'start_date', 'end_date', 'leave_id')
+        sweep, pairs = _timed(lambda: find_overlaps(rows.iterator(chunk_size=5000)))
+        report = {
+            'department':          dept,
+            'leaves':              LeaveApplication.objects.filter(applicant_role='employee',
+                                                                   applicant_department=dept).count(),
+            'active':              len(index),
+            'submit_check_p50_ms': round(percentile(checks, 50), 3),
+            'submit_check_p95_ms': round(percentile(checks, 95), 3),
+            'submit_check_plan':   plan,
+            'index_build_ms':      round(build, 1),
+            'index_week_p50_ms':   round(percentile(sorted(t for t, _ in from_index), 50), 3),
+            'query_week_p50_ms':   round(percentile(sorted(t for t, _ in from_db), 50), 3),
+            'index_52_weeks_ms':   round(build + sum(t for t, _ in from_index), 1),
+            'query_52_weeks_ms':   round(sum(t for t, _ in from_db), 1),
+            'same_answers':        same,
+            'reconcile_sweep_ms':  round(sweep, 1),
+            'overlaps_found':      len(pairs),
+        }
+        self.stderr.write(f"{dept}: {report['leaves']} leaves, submit check p95 {report['submit_check_p95_ms']}ms, "
+                          f"52 weeks {report['index_52_weeks_ms']}ms (index) vs {report['query_52_weeks_ms']}ms (queries)")
+        return report
+
+    def _scenario_export(self, options):
+        """Peak RSS of the payroll export: this month vs every approved leave."""
+        span   = (LeaveApplication.objects.filter(status='approved')
+                  .aggregate(first=Min('start_date'), last=Max('end_date')))
+        ranges = {'month': month_range(timezone.localdate().strftime('%Y-%m'))}
+        if span['first']:
+            ranges['everything'] = (span['first'], span['last'])
+        report = {}
+        for label, (start, end) in ranges.items():
+            report[label] = self._export_probe(start, end)
+            r = report[label]
+            self.stderr.write(f"{label:10} {r['rows']:>9} rows in {r['seconds']:7.1f}s  "
+                              f"peak RSS {r['rss_peak_mb']:6.1f}MB (+{r['rss_growth_mb']}MB during the export)")
+        return report
+
+    def _export_probe(self, start, end):
+        path = os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get('PYTHONPATH')]))
+        proc = subprocess.run([sys.executable, '-c', EXPORT_PROBE, str(start), str(end)], cwd=settings.BASE_DIR,
+                              env=dict(os.environ, PYTHONPATH=path), capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"Export probe failed:\n{proc.stderr[-2000:]}")
+        r     = json.loads(proc.stdout.splitlines()[-1])
+        scale = 1 if sys.platform == 'darwin' else 1024     # ru_maxrss: bytes on macOS, KiB on Linux
+        return {
+            'start':         str(start),
+            'end':           str(end),
+            'rows':          r['rows'],
+            'seconds':       round(r['seconds'], 1),
+            'rows_per_s':    round(r['rows'] / r['seconds']) if r['seconds'] else None,
+            'rss_peak_mb':   round(r['rss_peak'] * scale / 2**20, 1),
+            'rss_growth_mb': round((r['rss_peak'] - r['rss_before']) * scale / 2**20, 1),
+        }
+
+    def _scenario_bulk_review(self, options):
+        """The same pending team leaves approved in bulk and one by one (rolled back)."""
+        manager = self.actors['manager']
+        year    = timezone.localdate().year
+        picked  = {}                                # one leave per applicant
+        for lid, uid in (_scope(manager, 'team').filter(status='pending').order_by('leave_id')
+                         .values_list('leave_id', 'applicant_id').iterator()):
+            picked.setdefault(uid, lid)
+            if len(picked) == options['bulk_size']:
+                break
+        ids, applicants = list(picked.values()), list(picked)
+        if not ids:
+            return {'skipped': 'no pending team leaves'}
+        client = self._client('manager')
+        form   = {'decision': 'approve', 'comment': 'Benchmark.'}
+
+        def post(path, data):
+            response = client.post(path, data)
+            # A browser shows the flash message on the next page; without that
+            # the messages cookie grows with every request and skews the timing
+            client.cookies.pop('messages', None)
+            return response
+
+        modes  = {
+            'per_item': lambda: [post(reverse('manager_review', args=[lid]), form) for lid in ids],
+            'bulk':     lambda: [post(reverse('manager_bulk_review'), dict(form, leave_ids=ids))],
+        }
+        report = {'leaves': len(ids)}
+        for mode, run in modes.items():
+            queries = [0]
+
+            def count(execute, sql, params, many, context):
+                queries[0] += 1
+                return execute(sql, params, many, context)
+
+            with transaction.atomic():
+                # Seeded balances are spent for the year: top them up so every
+                # approval does the full work (rolled back with the rest)
+                LeaveBalance.objects.filter(user_id__in=applicants, year=year).update(
+                    casual_leave=365, sick_leave=365, earned_leave=365)
+                with connection.execute_wrapper(count):
+                    seconds, responses = _timed(run)
+                approved = LeaveApplication.objects.filter(leave_id__in=ids, status='approved').count()
+                transaction.set_rollback(True)
+            # store_balance/warm_balances cached rows that were just rolled back
+            cache.delete_many([balance_cache_key(uid, year) for uid in applicants])
+            report[mode] = {
+                'requests': len(responses),
+                'status':   sorted({r.status_code for r in responses}),
+                'approved': approved,
+                'ms':       round(seconds, 1),
+                'queries':  queries[0],
+            }
+            self.stderr.write(f"{mode:9} {len(responses):>5} request(s) {seconds:9.1f}ms  "
+                              f"{queries[0]:>6} queries  {approved} approved")
+        report['speedup'] = round(report['per_item']['ms'] / report['bulk']['ms'], 1)
+        return report
+
+    def _compare(self, baseline_path, results):
+        try:
+            with open(baseline_path) as fh:
+                baseline = json.load(fh)['results']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read baseline {baseline_path}: {exc}")
+        self.stdout.write(f"{'url name':22} {'p95 before':>11} {'p95 now':>9} {'Δ%':>7} {'queries':>9}")
+        for name, now in results.items():
+            before = baseline.get(name)
+            if not before:
+                self.stdout.write(f"{name:22} {'—':>11} {now['p95_ms']:9.2f}")
+                continue
+            change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+            self.stdout.write(
+                f"{name:22} {before['p95_ms']:11.2f} {now['p95_ms']:9.2f} {change:+6.1f}% "
+                f"{before['queries_max']:>4}→{now['queries_max']:<4}"
+            )
+
+
+def _timed(fn):
+    """(milliseconds, result) of one call."""
+    start  = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
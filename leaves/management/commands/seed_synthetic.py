@@ -0,0 +1,167 @@
+"""
+Synthetic data for benchmarks and load tests.
+
+    python manage.py seed_synthetic [--departments 5] [--employees 50] [--managers 2]
+                                    [--admins 2] [--leaves 12] [--seed 42]
+
+Creates, per department, the given number of employees and managers, plus
+global admins; every user gets a LeaveBalance and every non-admin K
+non-overlapping leaves spread over the year:
+past leaves are mostly approved (some rejected), upcoming ones mostly pending.
+Everything is written with bulk_create, so 100k leaves take seconds. The same
+--seed always produces the same data. Users are named `<prefix>_…` and
+--flush removes a previous run first. Admins get is_staff so the payroll
+export can be benchmarked too.
+"""
+
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from leaves.fragments import GLOBAL, bump
+from leaves.models import LeaveApplication, LeaveBalance
+from leaves.workdays import holiday_calendar
+
+
+DEPARTMENTS = ['Engineering', 'Finance', 'HR', 'IT', 'Marketing', 'Operations', 'Sales', 'Support']
+LEAVE_TYPES = [('casual', 5), ('sick', 3), ('earned', 2)]     # (type, weight)
+REASONS     = ['Family function', 'Medical appointment', 'Personal work', 'Travel', 'Not feeling well']
+PASSWORD    = 'benchmark123'
+
+
+class Command(BaseCommand):
+    help = "Generate departments, users and leaves with realistic distributions (bulk_create)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=5)
+        parser.add_argument('--employees',   type=int, default=50, help='Employees per department')
+        parser.add_argument('--managers',    type=int, default=2,  help='Managers per department')
+        parser.add_argument('--admins',      type=int, default=2)
+        parser.add_argument('--leaves',      type=int, default=12, help='Leaves per user')
+        parser.add_argument('--year',        type=int, help='Year of the balances and leaves (default: this year)')
+        parser.add_argument('--seed',        type=int, default=42)
+        parser.add_argument('--prefix',      default='synth')
+        parser.add_argument('--flush', action='store_true', help='Delete users from a previous run first')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if options['flush']:
+            deleted, _ = User.objects.filter(username__startswith=f'{prefix}_').delete()
+            self.stdout.write(f"Flushed {deleted} row(s) from a previous run.")
+        elif User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f"Users named '{prefix}_…' already exist — pass --flush or another --prefix.")
+
+        options['year'] = options['year'] or datetime.now().year
+        self.rng      = random.Random(options['seed'])
+        self.calendar = holiday_calendar()
+        self.today    = timezone.localdate()
+        started       = time.perf_counter()
+
+        departments = [DEPARTMENTS[i % len(DEPARTMENTS)] + (f'-{i // len(DEPARTMENTS) + 1}' if i >= len(DEPARTMENTS) else '')
+                       for i in range(options['departments'])]
+        password    = make_password(PASSWORD)       # hashed once, shared by every synthetic user
+
+        with transaction.atomic():
+            users = self._create_users(prefix, departments, options, password)
+            created = self._create_leaves(users, options)
+            bump(GLOBAL)                            # bulk_create sends no signals
+
+        call_command('rebuild_absence_calendar', stdout=self.stdout)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(departments)} department(s), {len(users)} user(s), "
+            f"{created} leave(s) in {elapsed:.1f}s. Password: {PASSWORD}"
+        ))
+
+    # ── users + balances ──────────────────────────────────────
+    def _create_users(self, prefix, departments, options, password):
+        users = []
+        for dept in departments:
+            slug = dept.lower()
+            for role, count in (('manager', options['managers']), ('employee', options['employees'])):
+                for i in range(1, count + 1):
+                    users.append(User(
+                        username=f'{prefix}_{slug}_{role}{i}', email=f'{prefix}.{slug}.{role}{i}@example.com',
+                        first_name=role.title(), last_name=f'{dept} {i}',
+                        role=role, department=dept, password=password,
+                    ))
+        for i in range(1, options['admins'] + 1):
+            users.append(User(
+                username=f'{prefix}_admin{i}', email=f'{prefix}.admin{i}@example.com',
+                first_name='Admin', last_name=str(i), role='admin', password=password,
+                is_staff=True,          # payroll export is staff-only
+            ))
+        User.objects.bulk_create(users, batch_size=1000)
+
+        users = list(User.objects.filter(username__startswith=f'{prefix}_')
+                     .order_by('id').only('id', 'role', 'department'))
+        LeaveBalance.objects.bulk_create(
+            [LeaveBalance(user_id=u.id, year=options['year']) for u in users],
+            batch_size=1000, ignore_conflicts=True,
+        )
+        return users
+
+    # ── leaves ────────────────────────────────────────────────
+    def _create_leaves(self, users, options):
+        rng       = self.rng
+        reviewers = defaultdict(list)           # who reviews whom: dept managers / admins
+        for u in users:
+            if u.role == 'manager':
+                reviewers[('employee', u.department)].append(u.id)
+            elif u.role == 'admin':
+                reviewers['manager'].append(u.id)
+
+        types, weights = zip(*LEAVE_TYPES)
+        year_start     = date(options['year'], 1, 1)
+        slot           = max(365 // max(options['leaves'], 1), 2)   # one leave per slot → never overlaps
+        used           = defaultdict(lambda: defaultdict(int))      # user_id → {balance field: days}
+        leaves         = []
+
+        for u in users:
+            if u.role == 'admin':
+                continue
+            pool = reviewers[('employee', u.department)] if u.role == 'employee' else reviewers['manager']
+            for k in range(options['leaves']):
+                start = year_start + timedelta(days=k * slot + rng.randrange(max(slot - 5, 1)))
+                end   = start + timedelta(days=min(rng.choice((0, 0, 0, 1, 1, 2, 4)), slot - 2))
+                leave = LeaveApplication(
+                    applicant_id=u.id, applicant_role=u.role, applicant_department=u.department,
+                    leave_type=rng.choices(types, weights)[0],
+                    start_date=start, end_date=end,
+                    total_days=max(self.calendar.working_days(start, end), 1),
+                    reason=rng.choice(REASONS),
+                    status=self._status(start),
+                )
+                if leave.status != 'pending' and pool:
+                    leave.reviewed_by_id = rng.choice(pool)
+                    leave.review_date    = timezone.make_aware(datetime.combine(start - timedelta(days=2), datetime.min.time()))
+                    leave.review_comment = 'Approved.' if leave.status == 'approved' else 'Team capacity.'
+                if leave.status == 'approved':
+                    used[u.id][LeaveBalance.BALANCE_FIELDS[leave.leave_type]] += leave.total_days
+                leaves.append(leave)
+
+        LeaveApplication.objects.bulk_create(leaves, batch_size=2000)
+
+        # Approved days come off the balances (floored at 0, like a real year)
+        balances = list(LeaveBalance.objects.filter(user_id__in=list(used), year=options['year']))
+        for balance in balances:
+            for field, days in used[balance.user_id].items():
+                setattr(balance, field, max(getattr(balance, field) - days, 0))
+        LeaveBalance.objects.bulk_update(balances, list(LeaveBalance.BALANCE_FIELDS.values()), batch_size=1000)
+        return len(leaves)
+
+    def _status(self, start):
+        roll = self.rng.random()
+        if start < self.today:                  # past: decided
+            return 'approved' if roll < 0.85 else 'rejected'
+        if (start - self.today).days > 45:      # far future: mostly still waiting
+            return 'pending' if roll < 0.8 else 'approved'
+        return 'pending' if roll < 0.4 else ('approved' if roll < 0.9 else 'rejected')
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from leaves.outbox import MAX_ATTEMPTS, deliver_batch, outbox_summary
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification emails from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting when drained')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+        parser.add_argument('--stats', action='store_true', help='Print backlog stats and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for key, value in outbox_summary().items():
+                self.stdout.write(f"{key:20} {value}")
+            return
+
+        while True:
+            stats = deliver_batch(options['batch_size'], options['max_attempts'])
+            if stats['sent'] or stats['retried'] or stats['failed']:
+                self.stdout.write(
+                    f"sent={stats['sent']} retried={stats['retried']} failed={stats['failed']} "
+                    f"lag_p50={_secs(stats['lag_p50'])} lag_max={_secs(stats['lag_max'])}"
+                )
+            # A full batch means more may be due right now — go again without sleeping
+            if stats['sent'] + stats['retried'] + stats['failed'] >= options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+
+def _secs(value):
+    return '-' if value is None else f"{value:.1f}s"
@@ -0,0 +1,115 @@
+"""
+Cold-start profile of a WSGI entry point (what a serverless instance pays).
+
+    python manage.py startup_profile [--entry leave_system.wsgi]
+                                     [--compare OTHER_WSGI_MODULE]
+                                     [--runs 5] [--top 15] [--json]
+
+Every run is a fresh interpreter that imports the entry module and sends two
+GETs to --path through it, with this process's environment — so e.g.
+LEAVEMS_TEMPLATE_MODE=production profiles the production template mode:
+
+    import     module import (django.setup, app loading, any warm-up)
+    first      first request — lazy imports, URL resolver, template compile
+    second     steady state, for reference
+    cold       import + first — what the first visitor of a new instance waits
+
+Medians over --runs. One extra run under `python -X importtime` gives the
+top-level packages by self import time (the -X importtime overhead is not
+counted in the timings above).
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+PROBE = r"""
+import importlib, json, os, sys, time
+from io import BytesIO
+t0  = time.perf_counter()
+app = importlib.import_module(sys.argv[1]).application
+t1  = time.perf_counter()
+
+def get(path):
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+               'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+               'wsgi.input': BytesIO(), 'wsgi.url_scheme': 'http'}
+    status = []
+    start  = time.perf_counter()
+    b''.join(app(environ, lambda s, h, e=None: status.append(s)))
+    return status[0], (time.perf_counter() - start) * 1000
+
+status, first = get(sys.argv[2])
+_, second     = get(sys.argv[2])
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_ms': first, 'second_ms': second, 'status': status}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Measure cold-start time (import + first request) of a WSGI entry point."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry', default='leave_system.wsgi', help='WSGI module to profile')
+        parser.add_argument('--compare', default=None, help='Second WSGI module to profile against --entry')
+        parser.add_argument('--path', default='/accounts/login/', help='URL requested after import')
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15, help='Packages to list from -X importtime')
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        entries = [options['entry']] + ([options['compare']] if options['compare'] else [])
+        results = {entry: self._profile(entry, options) for entry in entries}
+
+        if len(entries) == 2:
+            before, after = (results[e]['cold_ms'] for e in entries)
+            results['cold_saving_pct'] = round((before - after) / before * 100, 1) if before else None
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for entry in entries:
+            r = results[entry]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{entry}  ({options['runs']} runs, median)"))
+            self.stdout.write(f"  import {r['import_ms']:7.1f}ms   first {r['first_ms']:7.1f}ms   "
+                              f"second {r['second_ms']:6.1f}ms   cold {r['cold_ms']:7.1f}ms")
+            self.stdout.write(f"  top packages by self import time ({r['modules']} modules):")
+            for package, ms in r['packages']:
+                self.stdout.write(f"    {ms:7.1f}ms  {package}")
+        if len(entries) == 2:
+            self.stdout.write(self.style.SUCCESS(
+                f"Cold start {results['cold_saving_pct']}% faster with {entries[1]}."))
+
+    def _profile(self, entry, options):
+        runs = [self._probe(entry, options['path']) for _ in range(options['runs'])]
+        med  = {key: round(statistics.median(r[key] for r in runs), 1)
+                for key in ('import_ms', 'first_ms', 'second_ms')}
+        med['cold_ms'] = round(statistics.median(r['import_ms'] + r['first_ms'] for r in runs), 1)
+
+        stderr   = self._probe(entry, options['path'], importtime=True)
+        packages = Counter()
+        modules  = 0
+        for line in stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _, name = line.split(':', 1)[1].split('|')
+            packages[name.strip().split('.')[0]] += int(self_us)
+            modules += 1
+        med['modules']  = modules
+        med['packages'] = [(p, round(us / 1000, 1)) for p, us in packages.most_common(options['top'])]
+        return med
+
+    def _probe(self, entry, path, importtime=False):
+        env = dict(os.environ, PYTHONPATH=str(settings.BASE_DIR))
+        cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', PROBE, entry, path]
+        proc = subprocess.run(cmd, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"{entry} failed to start:\n{proc.stderr[-2000:]}")
+        return proc.stderr if importtime else json.loads(proc.stdout.splitlines()[-1])
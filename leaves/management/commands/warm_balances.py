@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from leaves.balances import cache_is_shared, warm_balances
+
+
+class Command(BaseCommand):
+    help = ("Preload the leave-balance cache for every user in a department. "
+            "Needs a shared cache backend (LEAVEMS_REDIS_URL): locmem dies with this process.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help='Department to warm (default: all users)')
+        parser.add_argument('--year', type=int, help='Default: the current year')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not cache_is_shared():
+            raise CommandError(
+                "The default cache is per-process (locmem); warmed keys would be lost when this "
+                "command exits. Set LEAVEMS_REDIS_URL so the web workers share the cache.")
+
+        year  = options['year'] or datetime.now().year
+        users = User.objects.filter(is_active=True).order_by('id')
+        if options['department']:
+            users = users.filter(department=options['department'])
+
+        size, last_id, total = options['batch_size'], 0, 0
+        while True:
+            batch = list(users.filter(id__gt=last_id).values_list('id', flat=True)[:size])
+            if not batch:
+                break
+            total  += warm_balances(batch, year)
+            last_id = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Cached {total} balance(s) for {year}."))
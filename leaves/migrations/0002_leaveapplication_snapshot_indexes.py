@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:25
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_applicant_snapshot(apps, schema_editor):
+    LeaveApplication = apps.get_model('leaves', 'LeaveApplication')
+    User = apps.get_model('accounts', 'User')
+    applicant = User.objects.filter(pk=OuterRef('applicant_id'))
+    LeaveApplication.objects.update(
+        applicant_role=Subquery(applicant.values('role')[:1]),
+        applicant_department=Subquery(applicant.values('department')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_user_role_dept_idx'),
+        ('leaves', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaveapplication',
+            name='applicant_department',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='leaveapplication',
+            name='applicant_role',
+            field=models.CharField(blank=True, editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill_applicant_snapshot, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='leaveapplication',
+            index=models.Index(fields=['applicant', '-applied_date'], name='leave_applicant_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveapplication',
+            index=models.Index(fields=['applicant', 'status'], name='leave_applicant_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveapplication',
+            index=models.Index(fields=['applicant_role', 'applicant_department', '-applied_date'], name='leave_role_dept_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveapplication',
+            index=models.Index(fields=['applicant_role', 'applicant_department', 'status', '-applied_date'], name='leave_role_dept_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveapplication',
+            index=models.Index(fields=['applicant_role', 'status', '-applied_date'], name='leave_role_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveapplication',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['applicant_role', 'applicant_department', '-applied_date'], name='leave_pending_queue_idx'),
+        ),
+    ]
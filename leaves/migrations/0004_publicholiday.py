@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0003_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicHoliday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Public Holiday',
+                'ordering': ['date'],
+            },
+        ),
+    ]
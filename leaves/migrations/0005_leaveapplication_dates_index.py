@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0004_publicholiday'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaveapplication',
+            index=models.Index(fields=['applicant', 'start_date', 'end_date'], name='leave_applicant_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0005_leaveapplication_dates_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentAbsence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('absent', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Department Absence',
+                'unique_together': {('department', 'day')},
+            },
+        ),
+    ]
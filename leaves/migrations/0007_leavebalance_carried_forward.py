@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0006_departmentabsence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leavebalance',
+            name='carried_forward',
+            field=models.IntegerField(default=0),
+        ),
+    ]
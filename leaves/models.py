@@ -1,6 +1,35 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.conf import settings
-from datetime import datetime, timedelta
+from django.utils import timezone
+from datetime import datetime
+
+from .intervals import IntervalIndex
+from .workdays import working_days
+
+
+class LeaveBalanceQuerySet(models.QuerySet):
+
+    def deduct(self, user_id, year, leave_type, days):
+        """
+        Race-free deduction in ONE conditional UPDATE:
+            SET casual_leave = casual_leave - n WHERE casual_leave >= n
+        Returns False (nothing changed) when the balance is insufficient.
+        """
+        return self.deduct_many(user_id, year, {leave_type: days})
+
+    def deduct_many(self, user_id, year, days_by_type):
+        """
+        Same as deduct() for several leave types at once, e.g.
+        {'casual': 3, 'sick': 1} → one UPDATE, all-or-nothing.
+        """
+        guards, changes = {}, {}
+        for leave_type, days in days_by_type.items():
+            field = LeaveBalance.BALANCE_FIELDS[leave_type]
+            guards[f'{field}__gte'] = days
+            changes[field]          = models.F(field) - days
+        return self.filter(user_id=user_id, year=year, **guards).update(**changes) == 1
 
 
 class LeaveBalance(models.Model):
@@ -18,6 +47,17 @@ class LeaveBalance(models.Model):
     casual_leave = models.IntegerField(default=12)
     sick_leave   = models.IntegerField(default=12)
     earned_leave = models.IntegerField(default=15)
+    # Part of earned_leave carried over from last year (rollover_balances)
+    carried_forward = models.IntegerField(default=0)
+
+    objects      = LeaveBalanceQuerySet.as_manager()
+
+    # leave_type → balance column
+    BALANCE_FIELDS = {
+        'casual': 'casual_leave',
+        'sick':   'sick_leave',
+        'earned': 'earned_leave',
+    }
 
     class Meta:
         unique_together = ['user', 'year']
@@ -30,11 +70,93 @@ class LeaveBalance(models.Model):
         return self.casual_leave + self.sick_leave + self.earned_leave
 
     def get_balance(self, leave_type):
-        return {
-            'casual': self.casual_leave,
-            'sick':   self.sick_leave,
-            'earned': self.earned_leave,
-        }.get(leave_type, 0)
+        field = self.BALANCE_FIELDS.get(leave_type)
+        return getattr(self, field) if field else 0
+
+
+class PublicHoliday(models.Model):
+    """
+    Company-wide public holiday. Weekday holidays are excluded from
+    LeaveApplication.total_days (see workdays.py).
+    """
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering     = ['date']
+        verbose_name = 'Public Holiday'
+
+    def __str__(self):
+        return f"{self.date} — {self.name}"
+
+
+class LeaveApplicationQuerySet(models.QuerySet):
+    """Reusable query helpers shared by every dashboard and history view."""
+
+    def status_summary(self):
+        """
+        Per-status counts in ONE conditional-aggregate query:
+            {'total': n, 'pending': n, 'approved': n, 'rejected': n}
+        """
+        aggregates = {'total': models.Count('pk')}
+        for status, _ in LeaveApplication.STATUS_CHOICES:
+            aggregates[status] = models.Count('pk', filter=models.Q(status=status))
+        return self.order_by().aggregate(**aggregates)
+
+    def active(self):
+        """Leaves that still occupy their dates (pending or approved)."""
+        return self.filter(status__in=('pending', 'approved'))
+
+    def overlapping(self, start, end):
+        """Closed-interval overlap: start_date <= end AND end_date >= start."""
+        return self.filter(start_date__lte=end, end_date__gte=start)
+
+    def interval_index(self, *fields):
+        """
+        One query → IntervalIndex of (start_date, end_date, leave), e.g.
+            dept.active().overlapping(s, e).interval_index().overlapping(day, day)
+        answers "who is out?" for many windows without further queries.
+        With `fields` the payload is the values_list tuple of those fields
+        instead of a model instance — for whole departments, where building
+        the instances costs several times the query itself.
+        """
+        if fields:
+            return IntervalIndex((row[0], row[1], row[2:])
+                                 for row in self.values_list('start_date', 'end_date', *fields))
+        return IntervalIndex((l.start_date, l.end_date, l) for l in self)
+
+    def mark_reviewed(self, leave_id, status, reviewer, comment, review_date):
+        """
+        Conditional pending → approved/rejected flip. Returns False when the
+        leave was no longer pending (double submit / concurrent reviewer).
+        """
+        return self.filter(leave_id=leave_id, status='pending').update(
+            status=status,
+            reviewed_by=reviewer,
+            review_comment=comment,
+            review_date=review_date,
+        ) == 1
+
+    def sync_applicant_snapshot(self, user):
+        """
+        Re-copy the user's current role/department onto their leaves, and
+        recount the absence calendar of the departments their approved days
+        leave and join, in the same transaction. A recount rather than a
+        -1/+1 move: rows touched outside the review paths (admin status
+        edits) may never have been counted.
+        """
+        from .absence import rebuild_absences
+
+        with transaction.atomic():
+            moved   = set(self.filter(applicant=user, status='approved')
+                          .values_list('applicant_department', flat=True))
+            updated = self.filter(applicant=user).update(
+                applicant_role=user.role,
+                applicant_department=user.department,
+            )
+            if moved:
+                rebuild_absences(sorted(moved | {user.department}))
+        return updated
 
 
 class LeaveApplication(models.Model):
@@ -76,6 +198,11 @@ class LeaveApplication(models.Model):
         related_name='submitted_leaves'
     )
 
+    # Applicant snapshot (copied on submit) — lets the manager/admin queues
+    # filter on role + department without joining accounts_user
+    applicant_role       = models.CharField(max_length=10, blank=True, editable=False)
+    applicant_department = models.CharField(max_length=100, blank=True, editable=False)
+
     # Leave details
     leave_type       = models.CharField(max_length=10, choices=LEAVE_TYPE_CHOICES)
     start_date       = models.DateField()
@@ -97,30 +224,71 @@ class LeaveApplication(models.Model):
     review_comment   = models.TextField(blank=True, null=True)
     review_date      = models.DateTimeField(blank=True, null=True)
 
+    objects          = LeaveApplicationQuerySet.as_manager()
+
     class Meta:
         ordering    = ['-applied_date']
         verbose_name = 'Leave Application'
+        indexes     = [
+            # Own history: applicant=… ORDER BY -applied_date
+            models.Index(fields=['applicant', '-applied_date'], name='leave_applicant_applied_idx'),
+            # Own history counters / ?status= filter
+            models.Index(fields=['applicant', 'status'], name='leave_applicant_status_idx'),
+            # Overlap check on submit: applicant=… AND start_date <= e AND end_date >= s
+            models.Index(fields=['applicant', 'start_date', 'end_date'], name='leave_applicant_dates_idx'),
+            # Manager dashboard / team list: role + dept ORDER BY -applied_date
+            models.Index(fields=['applicant_role', 'applicant_department', '-applied_date'], name='leave_role_dept_applied_idx'),
+            # Team list with ?status= filter
+            models.Index(fields=['applicant_role', 'applicant_department', 'status', '-applied_date'], name='leave_role_dept_status_idx'),
+            # Admin dashboard / all-leaves: role (+ status) ORDER BY -applied_date
+            models.Index(fields=['applicant_role', 'status', '-applied_date'], name='leave_role_status_idx'),
+            # Pending queues only (partial index where the backend supports it)
+            models.Index(
+                fields=['applicant_role', 'applicant_department', '-applied_date'],
+                condition=models.Q(status='pending'),
+                name='leave_pending_queue_idx',
+            ),
+        ]
 
     def __str__(self):
         return (f"[LEAVE-{self.leave_id}] {self.applicant.username} "
                 f"— {self.get_leave_type_display()} [{self.get_status_display()}]")
 
     def calculate_working_days(self):
-        """Count Mon–Fri days between start_date and end_date."""
+        """Count Mon–Fri days between start_date and end_date, minus public holidays."""
         if not self.start_date or not self.end_date:
             return 0
-        count   = 0
-        current = self.start_date
-        while current <= self.end_date:
-            if current.weekday() < 5:   # 0=Mon … 4=Fri
-                count += 1
-            current += timedelta(days=1)
-        return max(count, 1)
+        return max(working_days(self.start_date, self.end_date), 1)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        leave = super().from_db(db, field_names, values)
+        leave._loaded_applicant_id = leave.__dict__.get('applicant_id')
+        return leave
 
     def save(self, *args, **kwargs):
+        loaded     = getattr(self, '_loaded_applicant_id', None)
+        reassigned = loaded is not None and loaded != self.applicant_id
+        previous   = (self.applicant_role, self.applicant_department)
+        if self.applicant_id and (reassigned or not self.applicant_role):
+            self.applicant_role       = self.applicant.role
+            self.applicant_department = self.applicant.department
         if not self.total_days:
             self.total_days = self.calculate_working_days()
-        super().save(*args, **kwargs)
+
+        if not reassigned:
+            super().save(*args, **kwargs)
+        else:
+            # Admin reassignment: the leave leaves one queue and calendar for another
+            from .absence import rebuild_absences
+            from .events import leave_channel
+            from .fragments import bump
+
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                rebuild_absences(sorted({previous[1], self.applicant_department}))
+            bump(leave_channel(*previous))
+        self._loaded_applicant_id = self.applicant_id
 
     # ── Status helpers ─────────────────────────────────────────
     def is_pending(self):   return self.status == 'pending'
@@ -134,5 +302,67 @@ class LeaveApplication(models.Model):
             'rejected': 'danger',
         }.get(self.status, 'secondary')
 
-    def applicant_role(self):
-        return self.applicant.role
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='leavems_applicant_snapshot')
+def _sync_snapshot_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    """Any role/department change (admin, profile form, shell, scripts) re-snapshots the user's leaves."""
+    if created or (update_fields and not {'role', 'department'} & set(update_fields)):
+        return
+    stale = (LeaveApplication.objects.filter(applicant=instance)
+             .exclude(applicant_role=instance.role, applicant_department=instance.department))
+    if stale.exists():
+        LeaveApplication.objects.sync_applicant_snapshot(instance)
+
+
+class EmailOutbox(models.Model):
+    """
+    Transactional outbox for notification emails.
+    A row is written in the SAME transaction as the review that triggers it,
+    and `python manage.py send_outbox` delivers it later (see outbox.py),
+    so a slow SMTP server never adds latency to an approval.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent',    'Sent'),
+        ('failed',  'Failed'),
+    )
+
+    subject       = models.CharField(max_length=255)
+    body          = models.TextField()
+    from_email    = models.CharField(max_length=254)
+    recipient     = models.EmailField()
+
+    status        = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts      = models.PositiveSmallIntegerField(default=0)
+    last_error    = models.TextField(blank=True)
+    created_at    = models.DateTimeField(auto_now_add=True)
+    next_attempt  = models.DateTimeField(default=timezone.now)
+    sent_at       = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Email Outbox'
+        indexes      = [
+            # Worker poll: status='pending' AND next_attempt <= now
+            models.Index(fields=['status', 'next_attempt'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"[OUTBOX-{self.id}] {self.recipient} — {self.get_status_display()}"
+
+
+class DepartmentAbsence(models.Model):
+    """
+    Materialized team-absence calendar: how many EMPLOYEES of a department
+    are on approved leave on each working day. Maintained incrementally by
+    the approve paths (absence.py); rebuild with `manage.py rebuild_absence_calendar`.
+    """
+    department = models.CharField(max_length=100)
+    day        = models.DateField()
+    absent     = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['department', 'day']
+        verbose_name    = 'Department Absence'
+
+    def __str__(self):
+        return f"{self.department} — {self.day}: {self.absent} out"
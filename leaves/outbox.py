@@ -0,0 +1,119 @@
+"""
+Notification outbox.
+
+    enqueue_email(...)   → call INSIDE the review transaction (row commits
+    enqueue_many(...)      or rolls back together with the decision)
+    deliver_batch(...)   → used by `manage.py send_outbox`; drains due rows
+                           over ONE backend connection (get_connection()),
+                           retries failures with exponential backoff
+
+Works with any EMAIL_BACKEND, including console and locmem.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FROM   = 'noreply@leavems.com'
+MAX_ATTEMPTS   = 5
+BACKOFF_BASE   = 30             # seconds; 30s, 60s, 120s, 240s …
+BACKOFF_MAX    = 60 * 60
+
+
+def enqueue_email(subject, body, recipient, from_email=DEFAULT_FROM):
+    """Adds one email to the outbox. Returns None when there is no recipient."""
+    if not recipient:
+        return None
+    return EmailOutbox.objects.create(
+        subject=subject, body=body, recipient=recipient, from_email=from_email,
+    )
+
+
+def enqueue_many(emails):
+    """Bulk version of enqueue_email() — one INSERT for a list of dicts."""
+    rows = [EmailOutbox(from_email=DEFAULT_FROM, **e) for e in emails if e.get('recipient')]
+    return EmailOutbox.objects.bulk_create(rows)
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def deliver_batch(batch_size=100, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Sends up to `batch_size` due emails. Returns a stats dict:
+        {'sent', 'retried', 'failed', 'lag_p50', 'lag_max'}   (lag in seconds)
+    Single-worker design: run one `send_outbox` process at a time.
+    """
+    now   = timezone.now()
+    batch = list(
+        EmailOutbox.objects.filter(status='pending', next_attempt__lte=now)
+        .order_by('next_attempt', 'id')[:batch_size]
+    )
+    stats = {'sent': 0, 'retried': 0, 'failed': 0, 'lag_p50': None, 'lag_max': None}
+    if not batch:
+        return stats
+
+    connection = connection or get_connection()
+    sent_ids   = []
+    try:
+        connection.open()
+    except Exception as exc:                # server down — the whole batch retries later
+        for row in batch:
+            _record_failure(row, exc, max_attempts, stats)
+        return stats
+    try:
+        for row in batch:
+            msg = EmailMessage(row.subject, row.body, row.from_email, [row.recipient], connection=connection)
+            try:
+                connection.send_messages([msg])
+            except Exception as exc:        # any backend error → retry with backoff
+                _record_failure(row, exc, max_attempts, stats)
+            else:
+                sent_ids.append(row.id)
+    finally:
+        connection.close()
+
+    if sent_ids:
+        sent_at = timezone.now()
+        EmailOutbox.objects.filter(id__in=sent_ids).update(status='sent', sent_at=sent_at)
+        sent = set(sent_ids)
+        lags = sorted((sent_at - row.created_at).total_seconds() for row in batch if row.id in sent)
+        stats['sent']    = len(sent_ids)
+        stats['lag_p50'] = lags[len(lags) // 2]
+        stats['lag_max'] = lags[-1]
+    return stats
+
+
+def _record_failure(row, exc, max_attempts, stats):
+    row.attempts  += 1
+    row.last_error = f"{type(exc).__name__}: {exc}"
+    if row.attempts >= max_attempts:
+        row.status = 'failed'
+        stats['failed'] += 1
+        logger.error("Outbox email %s to %s failed permanently: %s", row.id, row.recipient, row.last_error)
+    else:
+        row.next_attempt = timezone.now() + backoff(row.attempts)
+        stats['retried'] += 1
+        logger.warning("Outbox email %s to %s failed (attempt %s): %s",
+                       row.id, row.recipient, row.attempts, row.last_error)
+    row.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt'])
+
+
+def outbox_summary():
+    """Backlog health: counts per status and age of the oldest pending row."""
+    counts = dict.fromkeys((s for s, _ in EmailOutbox.STATUS_CHOICES), 0)
+    for status, n in EmailOutbox.objects.values_list('status').annotate(n=Count('id')).order_by():
+        counts[status] = n
+    oldest = (EmailOutbox.objects.filter(status='pending')
+              .order_by('created_at').values_list('created_at', flat=True).first())
+    counts['oldest_pending_age'] = (timezone.now() - oldest).total_seconds() if oldest else 0
+    return counts
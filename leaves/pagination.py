@@ -0,0 +1,100 @@
+"""
+Keyset (cursor) pagination for the leave listings.
+
+Pages are keyed on (applied_date, leave_id) — newest first — so page N
+costs one indexed range scan of `per_page` rows no matter how deep N is.
+Tokens are opaque, URL-safe and stable across inserts:
+
+    ?cursor=<token>   → next page  (rows older than the token)
+                      → prev page  (rows newer than the token)
+"""
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+PER_PAGE = 25
+
+
+class KeysetPage:
+    """One page of rows plus the tokens for the neighbouring pages."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items       = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):     return self.next_cursor is not None
+    @property
+    def has_previous(self): return self.prev_cursor is not None
+
+    def __iter__(self):  return iter(self.items)
+    def __len__(self):   return len(self.items)
+    def __bool__(self):  return bool(self.items)
+
+
+def encode_cursor(leave, direction):
+    """`leave` is a LeaveApplication or a .values() row (the JSON API)."""
+    if isinstance(leave, dict):
+        applied, leave_id = leave['applied_date'], leave['leave_id']
+    else:
+        applied, leave_id = leave.applied_date, leave.leave_id
+    raw = f"{direction}|{applied.isoformat()}|{leave_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Returns (direction, applied_date, leave_id) or None for a bad token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        direction, applied, leave_id = raw.split('|')
+        if direction not in ('n', 'p'):
+            return None
+        return direction, datetime.fromisoformat(applied), int(leave_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def paginate_keyset(queryset, cursor=None, per_page=PER_PAGE):
+    """
+    Slice `queryset` (any filters already applied) into a KeysetPage.
+    An empty or invalid cursor returns the first page.
+    """
+    decoded = decode_cursor(cursor) if cursor else None
+
+    if decoded is None:
+        rows = list(queryset.order_by('-applied_date', '-leave_id')[:per_page + 1])
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], 'n') if more else None,
+        )
+
+    # (a < A) OR (a = A AND id < I), written as a <= A AND (a < A OR id < I):
+    # same rows, but the planner can seek the index to A instead of
+    # scanning every entry of the listing before it.
+    direction, applied, leave_id = decoded
+    if direction == 'n':
+        older = Q(applied_date__lte=applied) & (Q(applied_date__lt=applied) | Q(leave_id__lt=leave_id))
+        rows  = list(queryset.filter(older).order_by('-applied_date', '-leave_id')[:per_page + 1])
+        more  = len(rows) > per_page
+        rows  = rows[:per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], 'n') if more else None,
+            prev_cursor=encode_cursor(rows[0], 'p') if rows else None,
+        )
+
+    newer = Q(applied_date__gte=applied) & (Q(applied_date__gt=applied) | Q(leave_id__gt=leave_id))
+    rows  = list(queryset.filter(newer).order_by('applied_date', 'leave_id')[:per_page + 1])
+    more  = len(rows) > per_page
+    rows  = rows[:per_page][::-1]
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], 'n') if rows else None,
+        prev_cursor=encode_cursor(rows[0], 'p') if more else None,
+    )
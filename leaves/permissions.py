@@ -0,0 +1,79 @@
+"""
+Who may see / review / cancel one leave — decided once per request.
+
+    access = leave_access(request, leave_id)
+    if access.view_denied:   → (level, message, redirect url name)
+    if access.review_denied: → same shape
+    access.can_review / access.review_url   (for templates)
+    access.can_cancel / access.cancel_url
+
+The leave is loaded with its applicant and reviewer in ONE query and the
+result is memoized on the request, so views and templates share it.
+
+staff_required guards the staff-only pages (payroll export, metrics).
+"""
+
+from django.contrib.auth.decorators import user_passes_test
+from django.shortcuts import get_object_or_404
+
+from .models import LeaveApplication
+
+
+# Like admin's staff_member_required, but sends non-staff to the app login
+# rather than the admin one.
+staff_required = user_passes_test(lambda u: u.is_active and u.is_staff)
+
+
+class LeaveAccess:
+
+    def __init__(self, user, leave):
+        self.user          = user
+        self.leave         = leave
+        self.view_denied   = self._view_denied()
+        self.review_denied = self._review_denied()
+        self.can_review    = self.review_denied is None
+        self.review_url    = {'manager': 'manager_review', 'admin': 'admin_review'}.get(user.role)
+        self.can_cancel    = leave.applicant_id == user.id and leave.status == 'pending' and user.role != 'admin'
+        self.cancel_url    = {'employee': 'employee_cancel', 'manager': 'manager_cancel'}.get(user.role)
+
+    def _view_denied(self):
+        user, leave = self.user, self.leave
+        # Employee: only own leaves
+        if user.role == 'employee' and leave.applicant_id != user.id:
+            return ('error', "You can only view your own leave applications.", 'employee_my_leaves')
+        # Manager: only employee leaves from their department
+        if user.role == 'manager' and (leave.applicant_role != 'employee'
+                                       or leave.applicant_department != user.department):
+            return ('error', "You can only view employee leaves from your department.", 'manager_dashboard')
+        # Admin: only manager leaves
+        if user.role == 'admin' and leave.applicant_role != 'manager':
+            return ('error', "Admin can only view manager leave applications.", 'admin_dashboard')
+        return None
+
+    def _review_denied(self):
+        user, leave = self.user, self.leave
+        if user.role == 'manager':
+            if leave.applicant_role != 'employee':
+                return ('error', "You can only review employee leave applications.", 'manager_dashboard')
+            if leave.applicant_department != user.department:
+                return ('error', "You can only review leaves from your own department.", 'manager_dashboard')
+            queue = 'manager_pending'
+        elif user.role == 'admin':
+            if leave.applicant_role != 'manager':
+                return ('error', "Admin can only review manager leave applications.", 'admin_dashboard')
+            queue = 'admin_pending'
+        else:
+            return ('error', "You do not have permission to access that page.", 'dashboard')
+        if leave.status != 'pending':
+            return ('warning', f"LEAVE-{leave.leave_id} has already been {leave.status}.", queue)
+        return None
+
+
+def leave_access(request, leave_id):
+    """LeaveAccess for request.user, memoized per request (404 if the leave does not exist)."""
+    memo = request.__dict__.setdefault('_leave_access', {})
+    if leave_id not in memo:
+        leave = get_object_or_404(
+            LeaveApplication.objects.select_related('applicant', 'reviewed_by'), leave_id=leave_id)
+        memo[leave_id] = LeaveAccess(request.user, leave)
+    return memo[leave_id]
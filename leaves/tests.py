@@ -0,0 +1,1282 @@
+import csv
+import json
+import os
+import random
+import tempfile
+import threading
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import get_connection
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.models import Sum
+from django.template import Engine
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from leave_system.db import PRODUCTION_PRAGMAS
+from leave_system.instrumentation import STATS, RollingStats, percentile
+from leave_system.replica import REPLICA_ALIAS, STICKY_COOKIE
+from leave_system.templating import precompile
+from . import api
+from .balances import get_balance, warm_balances
+from .events import get_broker
+from .forms import BulkReviewForm, LeaveApplicationForm
+from .intervals import IntervalIndex
+from .models import DepartmentAbsence, EmailOutbox, LeaveApplication, LeaveBalance, PublicHoliday
+from .outbox import MAX_ATTEMPTS, backoff, deliver_batch, enqueue_email
+from .pagination import paginate_keyset
+from .permissions import LeaveAccess
+from .views import _apply_review, _cancel_pending
+from .workdays import HolidayCalendar, weekdays_between, working_days
+
+
+class LeaveFixtures:
+    """IT employee + IT manager + admin, each with this year's balance row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = User.objects.create_user('emp', 'emp@example.com', 'pw', role='employee', department='IT')
+        cls.manager  = User.objects.create_user('mgr', 'mgr@example.com', 'pw', role='manager',  department='IT')
+        cls.admin    = User.objects.create_user('adm', 'adm@example.com', 'pw', role='admin')
+        year = timezone.localdate().year
+        for user in (cls.employee, cls.manager, cls.admin):
+            LeaveBalance.objects.create(user=user, year=year)
+
+    def setUp(self):
+        cache.clear()       # balance + fragment caches are process-wide locmem
+
+    def add_leaves(self, user, count, status='pending', first_week=2):
+        """`count` one-day leaves on Mondays, one week apart, from `first_week` weeks out."""
+        start = timezone.localdate() + timedelta(weeks=first_week)
+        start -= timedelta(days=start.weekday())
+        return [
+            LeaveApplication.objects.create(
+                applicant=user, leave_type='casual', reason='test', status=status,
+                start_date=start + timedelta(weeks=i), end_date=start + timedelta(weeks=i),
+            )
+            for i in range(count)
+        ]
+
+    def login(self, user):
+        self.client.force_login(user)
+
+
+# ═══════════════════════════════════════════════════════════
+# Status counters: one aggregate query per page
+# ═══════════════════════════════════════════════════════════
+
+class StatusSummaryQueryTests(LeaveFixtures, TestCase):
+
+    # url name → (user attribute, queries for a cold request incl. session + user)
+    PAGES = {
+        'employee_dashboard': ('employee', 5),
+        'employee_my_leaves': ('employee', 6),     # + the conditional-GET validator
+        'manager_dashboard':  ('manager',  4),
+        'manager_my_leaves':  ('manager',  5),
+        'admin_dashboard':    ('admin',    5),
+    }
+
+    def test_status_summary_is_one_query(self):
+        self.add_leaves(self.employee, 2, 'pending')
+        self.add_leaves(self.employee, 1, 'approved', first_week=10)
+        with self.assertNumQueries(1):
+            summary = LeaveApplication.objects.filter(applicant=self.employee).status_summary()
+        self.assertEqual(summary, {'total': 3, 'pending': 2, 'approved': 1, 'rejected': 0})
+
+    def test_page_query_counts(self):
+        for name, (who, expected) in self.PAGES.items():
+            with self.subTest(name):
+                cache.clear()
+                self.login(getattr(self, who))
+                with self.assertNumQueries(expected):
+                    response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+    def test_query_counts_do_not_grow_with_leaves(self):
+        for status, week in (('pending', 2), ('approved', 30), ('rejected', 60)):
+            self.add_leaves(self.employee, 10, status, first_week=week)
+            self.add_leaves(self.manager, 10, status, first_week=week)
+        self.test_page_query_counts()
+
+
+# ═══════════════════════════════════════════════════════════
+# Keyset pagination
+# ═══════════════════════════════════════════════════════════
+
+class KeysetPaginationTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        leaves = self.add_leaves(self.employee, 12)
+        # Ties on applied_date: leave_id has to break them
+        tied = timezone.now() - timedelta(days=1)
+        LeaveApplication.objects.filter(leave_id__in=[l.leave_id for l in leaves[3:9]]).update(applied_date=tied)
+        self.listing  = LeaveApplication.objects.filter(applicant=self.employee)
+        self.expected = list(self.listing.order_by('-applied_date', '-leave_id').values_list('leave_id', flat=True))
+
+    def walk(self, per_page):
+        pages, page = [], paginate_keyset(self.listing, per_page=per_page)
+        while True:
+            pages.append([l.leave_id for l in page])
+            if not page.has_next:
+                return pages, page
+            page = paginate_keyset(self.listing, page.next_cursor, per_page=per_page)
+
+    def test_next_pages_cover_every_row_once(self):
+        for per_page in (1, 4, 5, 12, 50):
+            with self.subTest(per_page=per_page):
+                pages, _ = self.walk(per_page)
+                self.assertEqual(sum(pages, []), self.expected)
+
+    def test_previous_pages_walk_back(self):
+        pages, page = self.walk(5)
+        back = [[l.leave_id for l in page]]
+        while page.has_previous:
+            page = paginate_keyset(self.listing, page.prev_cursor, per_page=5)
+            back.append([l.leave_id for l in page])
+        self.assertEqual(back[::-1], pages)
+
+
+# ═══════════════════════════════════════════════════════════
+# Overlap rejection + interval index
+# ═══════════════════════════════════════════════════════════
+
+class OverlapTests(LeaveFixtures, TestCase):
+
+    def form(self, start, end, applicant=None):
+        return LeaveApplicationForm(
+            {'leave_type': 'casual', 'start_date': start, 'end_date': end, 'reason': 'test'},
+            applicant=applicant or self.employee,
+        )
+
+    def test_form_rejects_overlap_with_active_leave(self):
+        leave = self.add_leaves(self.employee, 1)[0]
+        day   = leave.start_date
+        self.assertFalse(self.form(day - timedelta(days=1), day).is_valid())
+        self.assertTrue(self.form(day + timedelta(days=1), day + timedelta(days=2)).is_valid())
+        self.assertTrue(self.form(day, day, applicant=self.manager).is_valid())     # someone else's leave
+
+    def test_form_ignores_rejected_leave(self):
+        leave = self.add_leaves(self.employee, 1, 'rejected')[0]
+        self.assertTrue(self.form(leave.start_date, leave.end_date).is_valid())
+
+    def test_interval_index_matches_brute_force(self):
+        rng   = random.Random(7)
+        base  = date(2026, 1, 1)
+        items = []
+        for i in range(300):
+            start = base + timedelta(days=rng.randrange(365))
+            items.append((start, start + timedelta(days=rng.randrange(10)), i))
+        index = IntervalIndex(items)
+        for _ in range(200):
+            start = base + timedelta(days=rng.randrange(-5, 370))
+            end   = start + timedelta(days=rng.randrange(15))
+            brute = sorted(i for s, e, i in items if s <= end and e >= start)
+            self.assertEqual(sorted(i for _, _, i in index.overlapping(start, end)), brute)
+
+    def test_interval_index_with_fields_builds_no_instances(self):
+        leaves = self.add_leaves(self.employee, 3)
+        with self.assertNumQueries(1):
+            index = LeaveApplication.objects.active().interval_index('leave_id', 'applicant_id')
+        day = leaves[1].start_date
+        self.assertEqual([item[2] for item in index.overlapping(day, day)],
+                         [(leaves[1].leave_id, self.employee.id)])
+
+
+# ═══════════════════════════════════════════════════════════
+# Payroll export
+# ═══════════════════════════════════════════════════════════
+
+class PayrollExportTests(LeaveFixtures, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.staff = User.objects.create_user('pay', 'pay@example.com', 'pw', role='admin', is_staff=True)
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.staff)
+
+    def export(self, **params):
+        return self.client.get(reverse('payroll_export'), params)
+
+    def test_streams_approved_leaves_of_the_range(self):
+        approved = self.add_leaves(self.employee, 2, 'approved')
+        self.add_leaves(self.employee, 1, 'pending', first_week=3)
+        day      = approved[0].start_date
+        response = self.export(start=day.isoformat(), end=(day + timedelta(weeks=5)).isoformat())
+        lines    = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)                                 # header + 2 approved
+        self.assertIn(str(approved[0].leave_id), lines[1])
+
+    def test_formula_cells_are_escaped(self):
+        user = User.objects.create_user('x', 'x@example.com', 'pw', role='employee', department='+Ops',
+                                        first_name='=HYPERLINK("http://evil")', last_name='@SUM(A1)')
+        leave = self.add_leaves(user, 1, 'approved')[0]
+        day   = leave.start_date.isoformat()
+        lines = b''.join(self.export(start=day, end=day).streaming_content).decode().splitlines()
+        row   = next(csv.DictReader(lines))
+        self.assertEqual((row['First Name'], row['Last Name'], row['Department']),
+                         ('\'=HYPERLINK("http://evil")', "'@SUM(A1)", "'+Ops"))
+        self.assertEqual((row['Leave ID'], row['Start Date']), (str(leave.leave_id), day))   # untouched
+
+    def test_start_after_end_is_rejected(self):
+        self.assertEqual(self.export(start='2026-02-01', end='2026-01-31').status_code, 400)
+
+    def test_department_is_slugified_in_filename(self):
+        response = self.export(month='2026-01', department='R&D "East"\r\nX-Evil: 1')
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename="approved-leaves-2026-01-01-2026-01-31-rd-east-x-evil-1.csv"')
+
+    def test_staff_only(self):
+        self.login(self.admin)
+        self.assertEqual(self.export(month='2026-01').status_code, 302)
+
+
+# ═══════════════════════════════════════════════════════════
+# Balance cache invalidation
+# ═══════════════════════════════════════════════════════════
+
+class BalanceCacheTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.year = timezone.localdate().year
+        self.row  = LeaveBalance.objects.get(user=self.employee, year=self.year)
+
+    def test_cached_read_skips_the_database(self):
+        get_balance(self.employee, self.year)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_balance(self.employee, self.year).casual_leave, self.row.casual_leave)
+
+    def test_save_drops_the_cached_row(self):
+        get_balance(self.employee, self.year)
+        self.row.casual_leave = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            self.row.save()
+        self.assertEqual(get_balance(self.employee, self.year).casual_leave, 3)
+
+    def test_delete_drops_the_cached_row(self):
+        get_balance(self.employee, self.year)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.row.delete()
+        self.assertFalse(LeaveBalance.objects.filter(pk=self.row.pk).exists())
+        get_balance(self.employee, self.year)                   # recreated with defaults
+        self.assertTrue(LeaveBalance.objects.filter(user=self.employee, year=self.year).exists())
+
+    def test_admin_edit_drops_the_cached_row(self):
+        get_balance(self.employee, self.year)
+        superuser = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.login(superuser)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('admin:leaves_leavebalance_change', args=[self.row.pk]),
+                {'user': self.employee.pk, 'year': self.year,
+                 'casual_leave': 1, 'sick_leave': 2, 'earned_leave': 3},
+            )
+        self.assertEqual(response.status_code, 302)
+        lb = get_balance(self.employee, self.year)
+        self.assertEqual((lb.casual_leave, lb.sick_leave, lb.earned_leave), (1, 2, 3))
+
+    def test_warmed_rows_are_read_without_queries(self):
+        LeaveBalance.objects.filter(user=self.manager).delete()            # warming creates missing rows
+        self.assertEqual(warm_balances([self.employee.pk, self.manager.pk], self.year), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_balance(self.employee, self.year).casual_leave, self.row.casual_leave)
+            self.assertEqual(get_balance(self.manager, self.year).year, self.year)
+
+    def test_warm_command_refuses_a_per_process_cache(self):
+        with self.assertRaisesMessage(CommandError, 'per-process'):
+            call_command('warm_balances', stdout=StringIO())
+
+    def test_warm_command_fills_a_shared_cache(self):
+        with mock.patch('leaves.management.commands.warm_balances.cache_is_shared', return_value=True):
+            call_command('warm_balances', '--department', 'IT', stdout=StringIO())
+        with self.assertNumQueries(0):
+            get_balance(self.employee, self.year)
+            get_balance(self.manager, self.year)
+
+
+# ═══════════════════════════════════════════════════════════
+# Concurrent approval (file database, WAL)
+# ═══════════════════════════════════════════════════════════
+
+@override_settings(LEAVEMS_SQLITE_PRAGMAS=PRODUCTION_PRAGMAS)
+class ConcurrentApprovalTests(LeaveFixtures, TransactionTestCase):
+    """Reviewers racing over the same queue: every day is deducted exactly once."""
+
+    THREADS  = 8
+    LEAVES   = 8
+    BALANCE  = 5            # casual days — not enough for every leave
+
+    def setUp(self):
+        super().setUp()
+        self.setUpTestData()
+        LeaveBalance.objects.filter(user=self.employee).update(casual_leave=self.BALANCE)
+        self.leave_ids = [l.leave_id for l in self.add_leaves(self.employee, self.LEAVES)]
+
+    def review_all(self, decision):
+        start, results, errors, lock = threading.Barrier(self.THREADS), [], [], threading.Lock()
+
+        def reviewer(seed):
+            try:
+                order = self.leave_ids[:]
+                random.Random(seed).shuffle(order)
+                leaves = [LeaveApplication.objects.select_related('applicant').get(leave_id=lid) for lid in order]
+                start.wait()
+                for leave in leaves:
+                    result = _apply_review(leave, self.manager, decision, '')
+                    with lock:
+                        results.append(result)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reviewer, args=(seed,)) for seed in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        return [r for r in results if r is None]
+
+    def test_new_connections_get_the_pragmas(self):
+        connection.close()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], PRODUCTION_PRAGMAS['busy_timeout'])
+
+    def test_parallel_approvals_deduct_each_day_once(self):
+        succeeded = self.review_all('approve')
+        approved  = LeaveApplication.objects.filter(status='approved').count()
+        balance   = LeaveBalance.objects.get(user=self.employee, year=datetime.now().year)
+        self.assertEqual(len(succeeded), self.BALANCE)
+        self.assertEqual(approved, self.BALANCE)
+        self.assertEqual(balance.casual_leave, 0)
+        self.assertEqual(EmailOutbox.objects.count(), approved)
+        self.assertEqual(DepartmentAbsence.objects.aggregate(n=Sum('absent'))['n'], approved)
+        self.assertEqual(get_balance(self.employee).casual_leave, 0)          # cache agrees
+
+    def test_parallel_rejections_flip_each_leave_once(self):
+        succeeded = self.review_all('reject')
+        self.assertEqual(len(succeeded), self.LEAVES)
+        self.assertEqual(LeaveApplication.objects.filter(status='rejected').count(), self.LEAVES)
+        self.assertEqual(LeaveBalance.objects.get(user=self.employee, year=datetime.now().year).casual_leave,
+                         self.BALANCE)
+
+
+# ═══════════════════════════════════════════════════════════
+# Bulk review
+# ═══════════════════════════════════════════════════════════
+
+class BulkReviewTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.manager)
+
+    def bulk(self, decision, leave_ids, **headers):
+        return self.client.post(reverse('manager_bulk_review'),
+                                {'decision': decision, 'comment': '', 'leave_ids': leave_ids}, **headers)
+
+    def test_approves_each_leave_the_balance_covers(self):
+        LeaveBalance.objects.filter(user=self.employee).update(casual_leave=2)
+        leaves   = self.add_leaves(self.employee, 3)
+        response = self.bulk('approve', [l.leave_id for l in leaves], HTTP_ACCEPT='application/json')
+        results  = {r['leave_id']: r['result'] for r in response.json()['results']}
+        self.assertEqual([results[l.leave_id] for l in leaves[:2]], ['approved', 'approved'])
+        self.assertIn('Insufficient', results[leaves[2].leave_id])
+        self.assertEqual(LeaveBalance.objects.get(user=self.employee).casual_leave, 0)
+        self.assertEqual(LeaveApplication.objects.get(pk=leaves[2].pk).status, 'pending')
+
+    def test_success_message_uses_past_tense(self):
+        leaves   = self.add_leaves(self.employee, 2)
+        response = self.bulk('reject', [l.leave_id for l in leaves], follow=True)
+        self.assertIn("2 leave(s) rejected.", [str(m) for m in response.context['messages']])
+
+    def test_accepts_the_maximum_batch(self):
+        ids      = list(range(1, BulkReviewForm.MAX_ITEMS + 1))
+        response = self.bulk('reject', ids, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), BulkReviewForm.MAX_ITEMS)
+
+
+# ═══════════════════════════════════════════════════════════
+# Email outbox: delivery, backoff, give-up, due rows, lag
+# ═══════════════════════════════════════════════════════════
+
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.row = enqueue_email('Leave approved', 'Enjoy.', 'emp@example.com')
+
+    def failing_connection(self):
+        connection = get_connection()
+        connection.send_messages = mock.Mock(side_effect=OSError('connection refused'))
+        return connection
+
+    def test_delivers_through_the_email_backend(self):
+        stats = deliver_batch()
+        self.assertEqual(stats['sent'], 1)
+        self.assertEqual([(m.subject, m.to) for m in mail.outbox], [('Leave approved', ['emp@example.com'])])
+        self.row.refresh_from_db()
+        self.assertEqual(self.row.status, 'sent')
+        self.assertIsNotNone(self.row.sent_at)
+
+    def test_failure_backs_off_exponentially(self):
+        for attempt in range(1, MAX_ATTEMPTS):
+            EmailOutbox.objects.filter(pk=self.row.pk).update(next_attempt=timezone.now())   # due again
+            before = timezone.now()
+            with self.assertLogs('leaves.outbox', 'WARNING'):
+                self.assertEqual(deliver_batch(connection=self.failing_connection())['retried'], 1)
+            self.row.refresh_from_db()
+            self.assertEqual((self.row.status, self.row.attempts), ('pending', attempt))
+            self.assertIn('connection refused', self.row.last_error)
+            delay = (self.row.next_attempt - before).total_seconds()
+            self.assertAlmostEqual(delay, 30 * 2 ** (attempt - 1), delta=2)
+        self.assertEqual(mail.outbox, [])
+
+    def test_backoff_is_capped_at_an_hour(self):
+        self.assertEqual([backoff(n).total_seconds() for n in (1, 2, 3)], [30, 60, 120])
+        self.assertEqual(backoff(8).total_seconds(), 60 * 60)
+        self.assertEqual(backoff(20).total_seconds(), 60 * 60)
+
+    def test_gives_up_after_max_attempts(self):
+        EmailOutbox.objects.filter(pk=self.row.pk).update(attempts=MAX_ATTEMPTS - 1)
+        with self.assertLogs('leaves.outbox', 'ERROR'):
+            stats = deliver_batch(connection=self.failing_connection())
+        self.assertEqual((stats['failed'], stats['retried']), (1, 0))
+        self.row.refresh_from_db()
+        self.assertEqual((self.row.status, self.row.attempts), ('failed', MAX_ATTEMPTS))
+        self.assertEqual(deliver_batch()['sent'], 0)                  # never picked up again
+
+    def test_skips_rows_not_yet_due(self):
+        later = enqueue_email('Later', 'x', 'mgr@example.com')
+        EmailOutbox.objects.filter(pk=later.pk).update(next_attempt=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(deliver_batch()['sent'], 1)
+        self.assertEqual([m.subject for m in mail.outbox], ['Leave approved'])
+        self.assertEqual(EmailOutbox.objects.get(pk=later.pk).status, 'pending')
+
+    def test_reports_delivery_lag(self):
+        enqueue_email('Second', 'x', 'mgr@example.com')
+        enqueue_email('Third',  'x', 'adm@example.com')
+        now = timezone.now()
+        for ago, subject in ((10, 'Leave approved'), (20, 'Second'), (90, 'Third')):
+            EmailOutbox.objects.filter(subject=subject).update(created_at=now - timedelta(seconds=ago))
+        out = StringIO()
+        call_command('send_outbox', stdout=out)
+        self.assertRegex(out.getvalue(), r'sent=3 retried=0 failed=0 lag_p50=2\d\.\ds lag_max=9\d\.\ds')
+
+
+# ═══════════════════════════════════════════════════════════
+# recompute_total_days after a holiday change
+# ═══════════════════════════════════════════════════════════
+
+class RecomputeTotalDaysTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        monday = timezone.localdate() + timedelta(weeks=2)
+        monday -= timedelta(days=monday.weekday())
+        self.days  = [monday + timedelta(days=i) for i in range(3)]           # Mon–Wed
+        self.leave = LeaveApplication.objects.create(
+            applicant=self.employee, leave_type='casual', reason='test',
+            start_date=self.days[0], end_date=self.days[-1],
+        )
+        self.pending = self.add_leaves(self.employee, 1, first_week=4)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            _apply_review(self.leave, self.manager, 'approve', '')
+        self.casual = LeaveBalance.objects.get(user=self.employee, year=datetime.now().year).casual_leave
+
+    def recompute(self, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('recompute_total_days', *args, stdout=StringIO())
+
+    def add_holiday(self, day):
+        with self.captureOnCommitCallbacks(execute=True):          # the receiver drops the cached calendar
+            PublicHoliday.objects.create(date=day, name='New holiday')
+
+    def test_new_holiday_refunds_approved_leave_and_recounts_calendar(self):
+        self.add_holiday(self.days[1])
+        self.recompute()
+        self.leave.refresh_from_db()
+        self.assertEqual(self.leave.total_days, 2)
+        self.assertEqual(get_balance(self.employee).casual_leave, self.casual + 1)
+        absent = dict(DepartmentAbsence.objects.filter(department='IT').values_list('day', 'absent'))
+        self.assertEqual([absent.get(d, 0) for d in self.days], [1, 0, 1])
+
+    def test_dry_run_changes_nothing(self):
+        self.add_holiday(self.days[1])
+        self.recompute('--dry-run')
+        self.leave.refresh_from_db()
+        self.assertEqual(self.leave.total_days, 3)
+        self.assertEqual(get_balance(self.employee).casual_leave, self.casual)
+
+    def test_pending_leave_total_changes_without_balance(self):
+        self.add_holiday(self.pending.start_date)
+        self.recompute('--status', 'pending')
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.total_days, 1)                # floored at one day
+        self.assertEqual(get_balance(self.employee).casual_leave, self.casual)
+
+    def test_refund_goes_to_the_year_the_review_charged(self):
+        monday = self.days[0] + timedelta(weeks=6)
+        leave  = LeaveApplication.objects.create(
+            applicant=self.employee, leave_type='casual', reason='test',
+            start_date=monday, end_date=monday + timedelta(days=1),
+        )
+        # Reviewed on 31 Dec (local time) of last year: charged to last year's balance…
+        last   = timezone.localdate().year - 1
+        eve    = datetime(last, 12, 31, 12, 0, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=eve):
+            _apply_review(leave, self.manager, 'approve', '')
+        full = LeaveBalance().casual_leave
+        self.assertEqual(LeaveBalance.objects.get(user=self.employee, year=last).casual_leave, full - 2)
+        # …and refunded there too when a holiday shortens it
+        self.add_holiday(monday + timedelta(days=1))
+        self.recompute()
+        self.assertEqual(LeaveBalance.objects.get(user=self.employee, year=last).casual_leave, full - 1)
+        self.assertEqual(LeaveBalance.objects.get(user=self.employee, year=last + 1).casual_leave, self.casual)
+
+
+# ═══════════════════════════════════════════════════════════
+# Working-day calendar: closed form vs. a day-by-day count
+# ═══════════════════════════════════════════════════════════
+
+class WorkdaysTests(TestCase):
+
+    @staticmethod
+    def day_by_day(start, end, holidays=()):
+        days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+        return sum(1 for d in days if d.weekday() < 5 and d not in holidays)
+
+    def test_closed_form_matches_a_day_by_day_count(self):
+        holidays = {date(2025, 12, 25), date(2026, 1, 1), date(2026, 1, 26),
+                    date(2025, 12, 27), date(2026, 1, 4)}                  # the last two are Sat / Sun
+        calendar = HolidayCalendar(holidays)
+        first    = date(2025, 12, 20)                                    # a Saturday
+        for a in range(30):
+            for b in range(a, 45):                                       # crosses into 2026
+                start, end = first + timedelta(days=a), first + timedelta(days=b)
+                with self.subTest(start=start, end=end):
+                    self.assertEqual(weekdays_between(start, end), self.day_by_day(start, end))
+                    self.assertEqual(calendar.working_days(start, end), self.day_by_day(start, end, holidays))
+
+    def test_edge_ranges(self):
+        saturday, sunday, monday = date(2026, 1, 3), date(2026, 1, 4), date(2026, 1, 5)
+        calendar = HolidayCalendar([sunday])
+        self.assertEqual(weekdays_between(saturday, saturday), 0)          # start == end on a Saturday
+        self.assertEqual(weekdays_between(monday, monday), 1)              # one-day range
+        self.assertEqual(weekdays_between(saturday, date(2026, 1, 11)), 5) # weekends at both ends
+        self.assertEqual(weekdays_between(monday, saturday), 0)            # end before start
+        self.assertEqual(calendar.holidays_between(saturday, monday), 0)   # weekend holidays are not indexed
+
+    def test_holiday_changes_drop_the_cached_calendar(self):
+        monday = date(2026, 1, 5)
+        self.assertEqual(working_days(monday, monday), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            holiday = PublicHoliday.objects.create(date=monday, name='Holiday')
+        self.assertEqual(working_days(monday, monday), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            PublicHoliday.objects.filter(pk=holiday.pk).delete()           # queryset delete sends post_delete too
+        self.assertEqual(working_days(monday, monday), 1)
+
+
+# ═══════════════════════════════════════════════════════════
+# Team absence calendar: cancels, department moves, ?start bounds
+# ═══════════════════════════════════════════════════════════
+
+class AbsenceCalendarTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.approved = self.add_leaves(self.employee, 1, 'pending')[0]
+        _apply_review(self.approved, self.manager, 'approve', '')
+
+    def absent(self, department):
+        return DepartmentAbsence.objects.filter(department=department, day=self.approved.start_date) \
+            .values_list('absent', flat=True).first() or 0
+
+    def test_cancel_does_not_delete_a_leave_reviewed_meanwhile(self):
+        stale = LeaveApplication.objects.get(pk=self.approved.pk)
+        stale.status = 'pending'                    # what the cancel page loaded
+        self.assertFalse(_cancel_pending(stale))
+        self.assertTrue(LeaveApplication.objects.filter(pk=self.approved.pk).exists())
+        self.assertEqual(self.absent('IT'), 1)
+
+    def test_cancel_deletes_a_pending_leave(self):
+        pending = self.add_leaves(self.employee, 1, first_week=6)[0]
+        self.login(self.employee)
+        self.client.post(reverse('employee_cancel', args=[pending.leave_id]))
+        self.assertFalse(LeaveApplication.objects.filter(pk=pending.pk).exists())
+
+    def test_department_change_moves_absences(self):
+        self.employee.department = 'HR'
+        self.employee.save()                        # no explicit sync: the post_save receiver runs it
+        self.assertEqual((self.absent('IT'), self.absent('HR')), (0, 1))
+        self.assertEqual(LeaveApplication.objects.get(pk=self.approved.pk).applicant_department, 'HR')
+
+    def test_role_change_resnapshots_leaves(self):
+        self.employee.role = 'manager'
+        self.employee.save(update_fields=['role'])
+        self.assertEqual(LeaveApplication.objects.get(pk=self.approved.pk).applicant_role, 'manager')
+        self.assertEqual(self.absent('IT'), 0)      # manager leaves are not on the team calendar
+
+    def test_reassigned_leave_takes_the_new_applicants_snapshot(self):
+        other = User.objects.create_user('hr', 'hr@example.com', 'pw', role='employee', department='HR')
+        leave = LeaveApplication.objects.get(pk=self.approved.pk)      # as the admin change form loads it
+        leave.applicant = other
+        leave.save()
+        leave.refresh_from_db()
+        self.assertEqual((leave.applicant_role, leave.applicant_department), ('employee', 'HR'))
+        self.assertEqual((self.absent('IT'), self.absent('HR')), (0, 1))
+
+    def test_department_change_recounts_uncounted_approvals(self):
+        extra = self.add_leaves(self.employee, 1, first_week=8)[0]
+        LeaveApplication.objects.filter(pk=extra.pk).update(status='approved')     # as an admin edit would
+        self.employee.department = 'HR'
+        self.employee.save()
+        self.assertEqual(DepartmentAbsence.objects.get(department='HR', day=extra.start_date).absent, 1)
+
+    def test_extreme_start_is_clamped(self):
+        self.login(self.manager)
+        for start in ('0001-01-01', '9999-12-31'):
+            with self.subTest(start):
+                response = self.client.get(reverse('manager_calendar'), {'start': start})
+                self.assertEqual(response.status_code, 200)
+
+
+# ═══════════════════════════════════════════════════════════
+# bulk_import_employees: email case, concurrent inserts
+# ═══════════════════════════════════════════════════════════
+
+class BulkImportTests(LeaveFixtures, TestCase):
+
+    HEADER = 'username,email,department\n'
+
+    def run_import(self, rows):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as fh:
+            fh.write(self.HEADER + ''.join(f'{r}\n' for r in rows))
+        self.addCleanup(os.remove, path)
+        err = StringIO()
+        call_command('bulk_import_employees', path, '--workers', '1', stdout=StringIO(), stderr=err)
+        return err.getvalue()
+
+    def test_emails_compare_case_insensitively(self):
+        errors = self.run_import(['new1,EMP@Example.com,IT', 'new2,x@example.com,IT', 'new3,X@EXAMPLE.COM,IT'])
+        self.assertIn('line 2: email', errors)
+        self.assertIn('line 4: duplicate email', errors)
+        self.assertEqual(list(User.objects.filter(username__startswith='new').values_list('username', flat=True)),
+                         ['new2'])
+
+    def test_rows_taken_concurrently_are_reported(self):
+        from accounts.management.commands.bulk_import_employees import Command
+        with mock.patch.object(Command, '_drop_existing', lambda self, valid: valid):   # lose the race
+            errors = self.run_import(['emp,other@example.com,IT', 'new1,new1@example.com,IT'])
+        self.assertIn("line 2: username 'emp'", errors)
+        self.assertTrue(LeaveBalance.objects.filter(user__username='new1', year=datetime.now().year).exists())
+
+
+# ═══════════════════════════════════════════════════════════
+# rollover_balances: carry-forward into existing rows
+# ═══════════════════════════════════════════════════════════
+
+class RolloverBalancesTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.year = datetime.now().year
+        LeaveBalance.objects.filter(user=self.employee, year=self.year).update(earned_leave=10)
+        # Next year's row already exists (an approval in January), 2 earned days taken
+        LeaveBalance.objects.create(user=self.employee, year=self.year + 1, earned_leave=13)
+
+    def rollover(self, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rollover_balances', *args, stdout=StringIO())
+
+    def test_existing_row_gets_the_carry_forward_once(self):
+        self.assertEqual(get_balance(self.employee, self.year + 1).earned_leave, 13)     # now cached
+        self.rollover()
+        self.rollover()
+        self.assertEqual(get_balance(self.employee, self.year + 1).earned_leave, 23)
+        self.assertEqual(get_balance(self.manager, self.year + 1).earned_leave, 30)
+
+    def test_lower_carry_max_reduces_an_earlier_carry(self):
+        self.rollover()
+        self.rollover('--carry-max', '4')
+        self.assertEqual(get_balance(self.employee, self.year + 1).earned_leave, 17)
+
+
+# ═══════════════════════════════════════════════════════════
+# Queue change feed: served under ASGI or LEAVEMS_LIVE_QUEUE only
+# ═══════════════════════════════════════════════════════════
+
+class LiveQueueTests(LeaveFixtures, TestCase):
+
+    def test_wsgi_without_setting_has_no_feed(self):
+        self.login(self.manager)
+        self.assertEqual(self.client.get(reverse('leave_events')).status_code, 404)
+        self.assertNotContains(self.client.get(reverse('manager_pending')), 'EventSource')
+
+    @override_settings(LEAVEMS_LIVE_QUEUE=True)
+    def test_setting_enables_the_feed(self):
+        self.login(self.manager)
+        self.assertContains(self.client.get(reverse('manager_pending')), 'EventSource')
+
+    def test_cancel_publishes_once_after_commit(self):
+        broker  = get_broker()
+        before  = broker.last_seq
+        pending = self.add_leaves(self.employee, 1)[0]
+        stale   = self.add_leaves(self.employee, 1, first_week=6)[0]
+        LeaveApplication.objects.filter(pk=stale.pk).update(status='approved')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(_cancel_pending(pending))
+            self.assertFalse(_cancel_pending(stale))
+            self.assertEqual(broker.last_seq, before)       # nothing before the commit
+        events = broker.since({'dept:IT'}, before)
+        self.assertEqual([(e['type'], e['leave_id']) for _, e in events], [('cancelled', pending.leave_id)])
+
+
+# ═══════════════════════════════════════════════════════════
+# Dashboard fragments follow every write path
+# ═══════════════════════════════════════════════════════════
+
+class FragmentInvalidationTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.pending = self.add_leaves(self.employee, 2)
+        self.assertEqual(self.dashboard(), (2, 2, 0))          # warms summary + fragment
+
+    def dashboard(self, user=None, url='manager_dashboard'):
+        """(total, pending, approved) of the summary, checked against the recent-leaves fragment."""
+        self.login(user or self.manager)
+        response = self.client.get(reverse(url))
+        ctx      = response.context
+        self.assertEqual(response.content.decode().count('badge-secondary">LEAVE-'), ctx['total_count'])
+        return ctx['total_count'], ctx['pending_count'], ctx['approved_count']
+
+    def write(self, user, method, url, data=None):
+        self.login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, data or {})
+
+    def test_apply(self):
+        start = self.pending[-1].start_date + timedelta(weeks=4)
+        self.write(self.employee, 'post', reverse('employee_apply'), {
+            'leave_type': 'casual', 'start_date': start, 'end_date': start, 'reason': 'new'})
+        self.assertEqual(self.dashboard(), (3, 3, 0))
+
+    def test_review(self):
+        self.write(self.manager, 'post', reverse('manager_review', args=[self.pending[0].leave_id]),
+                   {'decision': 'approve', 'comment': ''})
+        self.assertEqual(self.dashboard(), (2, 1, 1))
+
+    def test_bulk_review(self):
+        self.write(self.manager, 'post', reverse('manager_bulk_review'),
+                   {'decision': 'approve', 'comment': '', 'leave_ids': [l.leave_id for l in self.pending]})
+        self.assertEqual(self.dashboard(), (2, 0, 2))
+
+    def test_cancel(self):
+        self.write(self.employee, 'post', reverse('employee_cancel', args=[self.pending[0].leave_id]))
+        self.assertEqual(self.dashboard(), (1, 1, 0))
+
+    def test_manager_leave_review_refreshes_admin_dashboard(self):
+        leave = self.add_leaves(self.manager, 1)[0]
+        self.assertEqual(self.dashboard(self.admin, 'admin_dashboard'), (1, 1, 0))
+        self.write(self.admin, 'post', reverse('admin_review', args=[leave.leave_id]),
+                   {'decision': 'reject', 'comment': 'busy'})
+        self.assertEqual(self.dashboard(self.admin, 'admin_dashboard')[:2], (1, 0))
+
+    def test_admin_edits(self):
+        superuser = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        leave     = self.pending[0]
+        self.write(superuser, 'post', reverse('admin:leaves_leaveapplication_change', args=[leave.pk]), {
+            'applicant': self.employee.pk, 'leave_type': 'casual', 'reason': 'edited', 'status': 'approved',
+            'start_date': leave.start_date, 'end_date': leave.end_date, 'review_comment': ''})
+        self.assertEqual(self.dashboard(), (2, 1, 1))
+
+        self.write(superuser, 'post', reverse('admin:accounts_user_change', args=[self.employee.pk]), {
+            'username': 'emp', 'email': 'emp@example.com', 'role': 'employee', 'department': 'HR',
+            'is_active': 'on', 'date_joined_0': '2026-01-01', 'date_joined_1': '00:00:00'})
+        self.assertEqual(self.dashboard(), (0, 0, 0))
+
+
+# ═══════════════════════════════════════════════════════════
+# Replica routing: a second SQLite file that lags, plus the sticky cookie
+# ═══════════════════════════════════════════════════════════
+
+@override_settings(
+    DATABASE_ROUTERS=['leave_system.replica.ReplicaRouter'],
+    MIDDLEWARE=settings.MIDDLEWARE + ['leave_system.replica.ReplicaRoutingMiddleware'],
+    LEAVEMS_REPLICA_STICKY_SECONDS=7,
+)
+class ReplicaRouterTests(TransactionTestCase):
+    """The replica alias exists only for this class (added after the test-database guards)."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA_ALIAS] = dict(
+            connections.settings['default'], NAME=os.path.join(cls.tmp.name, 'replica.sqlite3'))
+        call_command('migrate', database=REPLICA_ALIAS, verbosity=0, interactive=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def tearDown(self):
+        call_command('flush', database=REPLICA_ALIAS, verbosity=0, interactive=False)
+
+    def setUp(self):
+        cache.clear()
+        self.employee = User.objects.create_user('emp', 'emp@example.com', 'pw', role='employee', department='IT')
+        self.leave    = LeaveApplication.objects.create(
+            applicant=self.employee, leave_type='casual', reason='test',
+            start_date=date(2030, 1, 7), end_date=date(2030, 1, 7),
+        )
+        # "Replicated" so far: the same rows in the replica file
+        self.employee.save(using=REPLICA_ALIAS)
+        self.leave.save(using=REPLICA_ALIAS)
+        self.client.force_login(self.employee)
+
+    def listed(self):
+        return [r['leave_id'] for r in self.client.get(reverse('api_leaves')).json()['results']]
+
+    def test_write_sticks_to_the_primary_until_the_cookie_expires(self):
+        response = self.client.delete(reverse('api_leave', args=[self.leave.leave_id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.cookies[STICKY_COOKIE]['max-age'], 7)
+        self.assertEqual(self.listed(), [])                            # primary: the cancel is visible
+        del self.client.cookies[STICKY_COOKIE]                           # max-age passed
+        self.assertEqual(self.listed(), [self.leave.leave_id])         # replica: not replicated yet
+
+    def test_reads_without_the_cookie_use_the_replica(self):
+        LeaveApplication.objects.using(REPLICA_ALIAS).filter(pk=self.leave.pk).update(reason='replica copy')
+        response = self.client.get(reverse('api_leave', args=[self.leave.leave_id]), {'fields': 'reason'})
+        self.assertEqual(response.json()['reason'], 'replica copy')
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_users_are_read_from_the_primary(self):
+        manager = User.objects.create_user('mgr', 'mgr@example.com', 'pw', role='manager', department='IT')
+        self.client.force_login(manager)                                # not in the replica
+        self.assertEqual(self.client.get(reverse('api_leaves'), {'scope': 'team'}).status_code, 200)
+
+
+# ═══════════════════════════════════════════════════════════
+# Replica reads use fragments but never fill them
+# ═══════════════════════════════════════════════════════════
+
+class ReplicaFragmentTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.manager)
+
+    def dashboard_pending(self):
+        return self.client.get(reverse('manager_dashboard')).context['pending_count']
+
+    def test_replica_read_does_not_fill_the_cache(self):
+        leave = self.add_leaves(self.employee, 1)[0]
+        with mock.patch('leaves.fragments.reading_from_replica', return_value=True):
+            self.assertEqual(self.dashboard_pending(), 1)
+        # A write the generation does not see yet — a replica fill would now be stale
+        LeaveApplication.objects.filter(pk=leave.pk).update(status='approved')
+        self.assertEqual(self.dashboard_pending(), 0)
+
+    def test_replica_read_uses_a_filled_fragment(self):
+        self.add_leaves(self.employee, 1)
+        self.assertEqual(self.dashboard_pending(), 1)
+        with mock.patch('leaves.fragments.reading_from_replica', return_value=True), \
+                self.assertNumQueries(2):                       # session + user; the rest is cached
+            self.assertEqual(self.dashboard_pending(), 1)
+
+
+# ═══════════════════════════════════════════════════════════
+# LeaveAccess: every view / review branch, with its query count
+# ═══════════════════════════════════════════════════════════
+
+class LeaveAccessTests(LeaveFixtures, TestCase):
+
+    QUERIES = 3         # session + user + the leave with applicant and reviewer, on every branch
+
+    # (url name, actor, leave) → redirect target, or None for a 200
+    CASES = {
+        ('leave_detail',   'employee', 'own'):       None,
+        ('leave_detail',   'employee', 'outsider'):  'employee_my_leaves',
+        ('leave_detail',   'manager',  'own'):       None,
+        ('leave_detail',   'manager',  'outsider'):  'manager_dashboard',
+        ('leave_detail',   'manager',  'manager'):   'manager_dashboard',
+        ('leave_detail',   'admin',    'manager'):   None,
+        ('leave_detail',   'admin',    'own'):       'admin_dashboard',
+        ('manager_review', 'manager',  'own'):       None,
+        ('manager_review', 'manager',  'approved'):  'manager_pending',
+        ('manager_review', 'manager',  'outsider'):  'manager_dashboard',
+        ('manager_review', 'manager',  'manager'):   'manager_dashboard',
+        ('admin_review',   'admin',    'manager'):   None,
+        ('admin_review',   'admin',    'own'):       'admin_dashboard',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.outsider = User.objects.create_user('hr', 'hr@example.com', 'pw', role='employee', department='HR')
+
+    def setUp(self):
+        super().setUp()
+        self.leaves = {
+            'own':      self.add_leaves(self.employee, 1)[0],
+            'approved': self.add_leaves(self.employee, 1, 'approved', first_week=6)[0],
+            'outsider': self.add_leaves(self.outsider, 1)[0],
+            'manager':  self.add_leaves(self.manager, 1)[0],
+        }
+
+    def test_branches(self):
+        for (name, who, leave), target in self.CASES.items():
+            with self.subTest(name=name, who=who, leave=leave):
+                self.login(getattr(self, who))
+                with self.assertNumQueries(self.QUERIES):
+                    response = self.client.get(reverse(name, args=[self.leaves[leave].leave_id]))
+                if target:
+                    self.assertRedirects(response, reverse(target), fetch_redirect_response=False)
+                else:
+                    self.assertEqual(response.status_code, 200)
+
+    def test_decisions_need_no_further_queries(self):
+        leave = LeaveApplication.objects.select_related('applicant', 'reviewed_by').get(pk=self.leaves['own'].pk)
+        with self.assertNumQueries(0):
+            own     = LeaveAccess(self.employee, leave)
+            manager = LeaveAccess(self.manager, leave)
+        self.assertEqual(own.review_denied[2], 'dashboard')          # employees review nothing
+        self.assertTrue(own.can_cancel)
+        self.assertIsNone(manager.review_denied)
+        self.assertFalse(manager.can_cancel)
+
+
+# ═══════════════════════════════════════════════════════════
+# Request metrics: Server-Timing, rolling percentiles, N+1 warning
+# ═══════════════════════════════════════════════════════════
+
+@override_settings(MIDDLEWARE=['leave_system.instrumentation.RequestMetricsMiddleware'] + settings.MIDDLEWARE,
+                   LEAVEMS_QUERY_WARN_THRESHOLD=1000)
+class RequestMetricsTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        STATS.clear()
+        self.login(self.employee)
+
+    def test_server_timing_header(self):
+        timing = self.client.get(reverse('employee_dashboard'))['Server-Timing']
+        parts  = dict(p.split(';', 1) for p in timing.split(', '))
+        self.assertEqual(list(parts), ['db', 'tpl', 'total'])
+        self.assertRegex(parts['db'], r'^dur=\d+\.\d;desc="[1-9]\d* queries"$')
+        self.assertRegex(parts['tpl'], r'^dur=\d+\.\d;desc="templates"$')
+        self.assertRegex(parts['total'], r'^dur=\d+\.\d$')
+        self.assertEqual(STATS.summary()['employee_dashboard']['count'], 1)
+
+    def test_rolling_window_percentiles(self):
+        stats = RollingStats(size=100)
+        for i in range(1, 151):                         # the first 50 fall out of the window
+            stats.record('view', i / 1000, 0, 0, i)
+        summary = stats.summary()['view']
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['queries'], {'p50': 100, 'p95': 145, 'p99': 149})
+        self.assertEqual(summary['wall_ms'], {'p50': 100.0, 'p95': 145.0, 'p99': 149.0})
+        self.assertEqual([percentile([7], p) for p in (50, 99)], [7, 7])
+
+    def dashboard_with_threshold(self, threshold):
+        client = Client()                               # the middleware reads the threshold once, at load
+        client.force_login(self.employee)
+        with self.settings(LEAVEMS_QUERY_WARN_THRESHOLD=threshold):
+            client.get(reverse('employee_dashboard'))
+
+    def test_warns_above_the_query_threshold(self):
+        with self.assertLogs('leave_system.instrumentation', 'WARNING') as logs:
+            self.dashboard_with_threshold(1)
+        self.assertIn('employee_dashboard ran', logs.output[0])
+        with self.assertNoLogs('leave_system.instrumentation', 'WARNING'):
+            self.dashboard_with_threshold(50)
+
+    def test_metrics_page_is_staff_only(self):
+        self.client.get(reverse('employee_dashboard'))
+        self.assertEqual(self.client.get(reverse('metrics_summary')).status_code, 302)     # employee
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('metrics_summary')).status_code, 302)     # anonymous
+        self.login(User.objects.create_user('ops', 'ops@example.com', 'pw', role='admin', is_staff=True))
+        response = self.client.get(reverse('metrics_summary'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('employee_dashboard', response.json()['views'])
+
+
+# ═══════════════════════════════════════════════════════════
+# Conditional GET: every write path changes the ETag
+# ═══════════════════════════════════════════════════════════
+
+class ETagInvalidationTests(LeaveFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.pending  = self.add_leaves(self.employee, 2)
+        self.approved  = self.add_leaves(self.employee, 1, first_week=8)[0]
+        self.superuser = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        _apply_review(self.approved, self.manager, 'approve', '')
+
+    def etag(self, url, user):
+        """ETag of `url` for `user` — which must still be current right away."""
+        self.login(user)
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        return etag
+
+    def write(self, user, method, url, data=None, **extra):
+        """A write from another browser, so no flash message masks the next GET."""
+        writer = Client()
+        writer.force_login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(writer, method)(url, data or {}, **extra)
+        self.assertLess(response.status_code, 400)
+
+    def assertChanged(self, url, user, etag):
+        self.login(user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_my_leaves(self):
+        url   = reverse('employee_my_leaves')
+        start = self.approved.start_date + timedelta(weeks=4)
+        leave = self.pending[0]
+        writes = {
+            'apply':      (self.employee, 'post', reverse('employee_apply'),
+                           {'leave_type': 'sick', 'start_date': start, 'end_date': start, 'reason': 'x'}),
+            'api apply':  (self.employee, 'post', reverse('api_leaves'),
+                           f'{{"leave_type": "sick", "start_date": "{start + timedelta(weeks=1)}", '
+                           f'"end_date": "{start + timedelta(weeks=1)}", "reason": "x"}}',
+                           {'content_type': 'application/json'}),
+            'review':     (self.manager, 'post', reverse('manager_review', args=[leave.leave_id]),
+                           {'decision': 'approve', 'comment': ''}),
+            'bulk':       (self.manager, 'post', reverse('manager_bulk_review'),
+                           {'decision': 'reject', 'comment': 'no', 'leave_ids': [self.pending[1].leave_id]}),
+            'admin edit': (self.superuser, 'post', reverse('admin:leaves_leaveapplication_change', args=[leave.pk]),
+                           {'applicant': self.employee.pk, 'leave_type': 'casual', 'reason': 'edited',
+                            'status': 'approved', 'start_date': leave.start_date, 'end_date': leave.end_date,
+                            'review_comment': ''}),
+            'balance':    (self.superuser, 'post',
+                           reverse('admin:leaves_leavebalance_change',
+                                   args=[LeaveBalance.objects.get(user=self.employee).pk]),
+                           {'user': self.employee.pk, 'year': datetime.now().year,
+                            'casual_leave': 1, 'sick_leave': 2, 'earned_leave': 3}),
+        }
+        for name, (user, method, target, data, *extra) in writes.items():
+            with self.subTest(name):
+                etag = self.etag(url, self.employee)
+                self.write(user, method, target, data, **(extra[0] if extra else {}))
+                self.assertChanged(url, self.employee, etag)
+
+    def test_cancel(self):
+        url  = reverse('employee_my_leaves')
+        etag = self.etag(url, self.employee)
+        self.write(self.employee, 'post', reverse('employee_cancel', args=[self.pending[0].leave_id]))
+        self.assertChanged(url, self.employee, etag)
+
+    def test_api_cancel(self):
+        url  = reverse('employee_my_leaves')
+        etag = self.etag(url, self.employee)
+        self.write(self.employee, 'delete', reverse('api_leave', args=[self.pending[0].leave_id]))
+        self.assertChanged(url, self.employee, etag)
+
+    def test_recompute_total_days(self):
+        LeaveApplication.objects.filter(pk=self.approved.pk).update(total_days=2)      # 1 working day
+        urls  = [reverse('leave_detail', args=[self.approved.leave_id]), reverse('employee_my_leaves')]
+        etags = [self.etag(url, self.employee) for url in urls]
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('recompute_total_days', stdout=StringIO())
+        for url, etag in zip(urls, etags):
+            self.assertChanged(url, self.employee, etag)
+
+    def test_detail_after_admin_edit(self):
+        leave = self.pending[0]
+        url   = reverse('leave_detail', args=[leave.leave_id])
+        etag  = self.etag(url, self.employee)
+        self.write(self.superuser, 'post', reverse('admin:leaves_leaveapplication_change', args=[leave.pk]), {
+            'applicant': self.employee.pk, 'leave_type': 'casual', 'reason': 'edited', 'status': 'pending',
+            'start_date': leave.start_date, 'end_date': leave.end_date, 'review_comment': ''})
+        self.assertChanged(url, self.employee, etag)
+
+    def test_admin_all_leaves_after_review(self):
+        leave = self.add_leaves(self.manager, 1)[0]
+        url   = reverse('admin_all_leaves')
+        etag  = self.etag(url, self.admin)
+        self.write(self.admin, 'post', reverse('admin_review', args=[leave.leave_id]),
+                   {'decision': 'approve', 'comment': ''})
+        self.assertChanged(url, self.admin, etag)
+
+
+# ═══════════════════════════════════════════════════════════
+# Production template mode: broken templates stop the start-up
+# ═══════════════════════════════════════════════════════════
+
+class PrecompileTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        (self.dir / 'base.html').write_text('{% block body %}{% endblock %}')
+        (self.dir / 'page.html').write_text('{% extends "base.html" %}{% block body %}ok{% endblock %}')
+
+    def precompile(self):
+        engine = Engine(dirs=[str(self.dir)], loaders=[
+            ('django.template.loaders.cached.Loader', ['django.template.loaders.filesystem.Loader'])])
+        with mock.patch('leave_system.templating.template_dirs', return_value=[self.dir]):
+            return precompile(engine)
+
+    def test_compiles_valid_templates(self):
+        self.assertEqual(self.precompile(), 2)
+
+    def test_syntax_error_fails_fast(self):
+        (self.dir / 'broken.html').write_text('{% if %}unterminated')
+        with self.assertRaisesMessage(ImproperlyConfigured, 'broken.html: TemplateSyntaxError'):
+            self.precompile()
+
+    def test_missing_include_fails_fast(self):
+        (self.dir / 'orphan.html').write_text('{% include "gone.html" %}')
+        with self.assertRaisesMessage(ImproperlyConfigured, 'orphan.html: TemplateDoesNotExist'):
+            self.precompile()
+
+    def test_runs_at_start_up_in_production_mode_only(self):
+        config = django_apps.get_app_config('leaves')
+        for mode, calls in (('dev', 0), ('production', 1)):
+            with self.subTest(mode), self.settings(LEAVEMS_TEMPLATE_MODE=mode), \
+                    mock.patch('leave_system.templating.precompile') as precompile_mock:
+                config.ready()
+                self.assertEqual(precompile_mock.call_count, calls)
+
+
+# ═══════════════════════════════════════════════════════════
+# JSON API: read-only balances, race-free cancel
+# ═══════════════════════════════════════════════════════════
+
+class ApiTests(LeaveFixtures, TestCase):
+
+    def test_balance_of_a_year_without_a_row_is_404(self):
+        self.login(self.employee)
+        year = datetime.now().year
+        self.assertEqual(self.client.get(reverse('api_balances'), {'year': year}).json()['casual_leave'], 12)
+        self.assertEqual(self.client.get(reverse('api_balances'), {'year': year - 1}).status_code, 404)
+        self.assertFalse(LeaveBalance.objects.filter(user=self.employee, year=year - 1).exists())
+
+    def test_year_out_of_range_is_400(self):
+        self.login(self.manager)
+        for year in ('1', '99999', 'x'):
+            with self.subTest(year):
+                self.assertEqual(self.client.get(reverse('api_balances'), {'year': year}).status_code, 400)
+                self.assertEqual(self.client.get(reverse('api_balances'),
+                                                 {'year': year, 'scope': 'team'}).status_code, 400)
+
+    def test_cancel(self):
+        pending, approved = self.add_leaves(self.employee, 2)
+        LeaveApplication.objects.filter(pk=approved.pk).update(status='approved')
+        self.login(self.employee)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(reverse('api_leave', args=[pending.leave_id])).status_code, 204)
+            self.assertEqual(self.client.delete(reverse('api_leave', args=[approved.leave_id])).status_code, 409)
+        self.assertEqual(list(LeaveApplication.objects.values_list('pk', flat=True)), [approved.pk])
+
+    def test_cancel_losing_the_race_is_409(self):
+        leave = self.add_leaves(self.employee, 1)[0]
+        self.login(self.employee)
+        with mock.patch('leaves.api._cancel_pending', return_value=False):        # reviewed after the read
+            self.assertEqual(self.client.delete(reverse('api_leave', args=[leave.leave_id])).status_code, 409)
+
+    def post_json(self, name, data):
+        return self.client.post(reverse(name), json.dumps(data), content_type='application/json')
+
+    def test_sparse_fields(self):
+        self.add_leaves(self.employee, 2)
+        self.login(self.employee)
+        results = self.client.get(reverse('api_leaves'), {'fields': 'leave_id,status'}).json()['results']
+        self.assertEqual([set(r) for r in results], [{'leave_id', 'status'}] * 2)
+        self.assertEqual(self.client.get(reverse('api_leaves'), {'fields': 'leave_id,password'}).status_code, 400)
+
+    def test_cursor_pages_cover_every_leave_once(self):
+        ids = {l.leave_id for l in self.add_leaves(self.employee, 5)}
+        self.login(self.employee)
+        seen, params = [], {'limit': 2, 'fields': 'leave_id'}
+        while True:
+            page = self.client.get(reverse('api_leaves'), params).json()
+            seen += [r['leave_id'] for r in page['results']]
+            if not page['next']:
+                break
+            params['cursor'] = page['next']
+        self.assertEqual(sorted(seen), sorted(ids))
+        self.assertEqual(len(seen), len(ids))
+
+    def test_batch_apply(self):
+        start = timezone.localdate() + timedelta(weeks=3)
+        start -= timedelta(days=start.weekday())
+        item  = lambda day: {'leave_type': 'casual', 'start_date': str(day), 'end_date': str(day), 'reason': 'x'}
+        self.login(self.employee)
+        response = self.post_json('api_leaves', [item(start), item(start + timedelta(weeks=1)), {'leave_type': 'x'}])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['created'], 2)
+        self.assertIn('errors', body['results'][2])
+        self.assertEqual(self.post_json('api_leaves', item(start + timedelta(weeks=2))).status_code, 201)
+        too_many = [item(start)] * (api.MAX_BATCH + 1)
+        self.assertEqual(self.post_json('api_leaves', too_many).status_code, 400)
+        self.assertEqual(LeaveApplication.objects.filter(applicant=self.employee).count(), 3)
+
+    def test_role_denials(self):
+        self.assertEqual(self.client.get(reverse('api_leaves')).status_code, 401)
+        self.login(self.employee)
+        self.assertEqual(self.post_json('api_review', {'decision': 'approve', 'leave_ids': [1]}).status_code, 403)
+        self.assertEqual(self.client.get(reverse('api_balances'), {'scope': 'team'}).status_code, 403)
+        self.login(self.admin)
+        self.assertEqual(self.post_json('api_leaves', {}).status_code, 403)
+        leave = self.add_leaves(self.employee, 1)[0]
+        self.assertEqual(self.client.get(reverse('api_leave', args=[leave.leave_id])).status_code, 403)
+
+    def test_review(self):
+        leaves = self.add_leaves(self.employee, 2)
+        self.login(self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_json('api_review', {'decision': 'approve', 'comment': '',
+                                                     'leave_ids': [l.leave_id for l in leaves]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({r['result'] for r in response.json()['results']}, {'approved'})
+        self.assertEqual(LeaveApplication.objects.filter(status='approved').count(), 2)
+
+    def test_review_rejects_ids_that_are_not_a_list_of_ints(self):
+        self.add_leaves(self.employee, 3)
+        self.login(self.manager)
+        for ids in ('123', {'1': 1, '2': 2}, [True], ['1'], 7, None):
+            with self.subTest(ids=ids):
+                response = self.post_json('api_review', {'decision': 'approve', 'comment': '', 'leave_ids': ids})
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post_json('api_review', ['approve']).status_code, 400)
+        self.assertFalse(LeaveApplication.objects.exclude(status='pending').exists())
+        self.assertFalse(BulkReviewForm({'decision': 'approve', 'leave_ids': '123'}).is_valid())
+
+    def test_role_guard_keeps_view_metadata(self):
+        self.assertEqual(api.review.__name__, 'review')
+        self.assertIn('bulk review', api.review.__doc__)
@@ -17,7 +17,9 @@ urlpatterns = [
     path('manager/dashboard/',             views.manager_dashboard,  name='manager_dashboard'),
     path('manager/pending/',               views.manager_pending,    name='manager_pending'),
     path('manager/review/<int:leave_id>/', views.manager_review,     name='manager_review'),
+    path('manager/review/bulk/',           views.manager_bulk_review,name='manager_bulk_review'),
     path('manager/team-leaves/',           views.manager_team_leaves,name='manager_team_leaves'),
+    path('manager/calendar/',              views.manager_calendar,   name='manager_calendar'),
     # Manager's own leave (separate from dashboard)
     path('manager/my-apply/',              views.manager_apply,      name='manager_apply'),
     path('manager/my-leaves/',             views.manager_my_leaves,  name='manager_my_leaves'),
@@ -28,8 +30,13 @@ urlpatterns = [
     path('admin-panel/dashboard/',              views.admin_dashboard, name='admin_dashboard'),
     path('admin-panel/pending/',                views.admin_pending,   name='admin_pending'),
     path('admin-panel/review/<int:leave_id>/',  views.admin_review,    name='admin_review'),
+    path('admin-panel/review/bulk/',            views.admin_bulk_review, name='admin_bulk_review'),
     path('admin-panel/all-leaves/',             views.admin_all_leaves,name='admin_all_leaves'),
 
+    # ── PAYROLL (staff only) ──────────────────────────────────
+    path('payroll/export/',                views.payroll_export,     name='payroll_export'),
+
     # ── SHARED ────────────────────────────────────────────────
+    path('events/',                        views.leave_events,       name='leave_events'),
     path('leave/<int:leave_id>/',          views.leave_detail,       name='leave_detail'),
 ]
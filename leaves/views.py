@@ -27,12 +27,28 @@ KEY RULES:
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.http import HttpResponseForbidden
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from .models import LeaveApplication, LeaveBalance
-from .forms import LeaveApplicationForm, ReviewForm
+from .forms import LeaveApplicationForm, ReviewForm, BulkReviewForm
+from .pagination import paginate_keyset
+from .permissions import leave_access, staff_required
+from .conditional import conditional_page, detail_validator, manager_leaves_validator, my_leaves_validator
+from .balances import get_balance, review_year, store_balance, warm_balances
+from .outbox import enqueue_email, enqueue_many
+from .absence import absence_calendar, record_absences
+from .exports import approved_leaves, export_rows, month_range, stream_csv
+from .events import event_stream, live_queue_enabled, publish_leave_event, subscriber_channels
+from .fragments import bump_for, cached_value, fill_timeout, version
 from accounts.models import User
-from datetime import datetime
+from datetime import date, timedelta
+
+CALENDAR_DAYS  = 91    # 13 full weeks
+CALENDAR_RANGE = (date(1900, 1, 1), date(2999, 12, 31))    # ?start is clamped — prev/next must stay in date's range
 
 
 # ═══════════════════════════════════════════════════════════
@@ -84,17 +100,18 @@ def employee_dashboard(request):
     Shows:  Leave balance card + own leave history + stats
     No:     Approve buttons, manager leaves, admin controls
     """
-    user = request.user
-    lb, _ = LeaveBalance.objects.get_or_create(user=user, year=datetime.now().year)
+    user      = request.user
+    lb        = get_balance(user)
     my_leaves = LeaveApplication.objects.filter(applicant=user)
+    summary   = my_leaves.status_summary()
 
     context = {
         'lb':             lb,
         'recent_leaves':  my_leaves[:6],
-        'total':          my_leaves.count(),
-        'pending_count':  my_leaves.filter(status='pending').count(),
-        'approved_count': my_leaves.filter(status='approved').count(),
-        'rejected_count': my_leaves.filter(status='rejected').count(),
+        'total':          summary['total'],
+        'pending_count':  summary['pending'],
+        'approved_count': summary['approved'],
+        'rejected_count': summary['rejected'],
         'casual_pct':     min((lb.casual_leave / 12) * 100, 100),
         'sick_pct':       min((lb.sick_leave   / 12) * 100, 100),
         'earned_pct':     min((lb.earned_leave / 15) * 100, 100),
@@ -110,10 +127,10 @@ def employee_apply(request):
     Admin has NO access to this page.
     """
     user  = request.user
-    lb, _ = LeaveBalance.objects.get_or_create(user=user, year=datetime.now().year)
+    lb    = get_balance(user)
 
     if request.method == 'POST':
-        form = LeaveApplicationForm(request.POST)
+        form = LeaveApplicationForm(request.POST, applicant=user)
         if form.is_valid():
             leave            = form.save(commit=False)
             leave.applicant  = user
@@ -129,6 +146,7 @@ def employee_apply(request):
                 return render(request, 'employee/apply.html', {'form': form, 'lb': lb})
 
             leave.save()
+            publish_leave_event('created', leave)
             messages.success(request,
                 f"Leave application (LEAVE-{leave.leave_id}) submitted for "
                 f"{leave.total_days} day(s). Your manager will review it."
@@ -143,23 +161,28 @@ def employee_apply(request):
 
 
 @role_required('employee')
+@conditional_page(my_leaves_validator)
 def employee_my_leaves(request):
     """Employee views own complete leave history."""
-    user  = request.user
-    lb, _ = LeaveBalance.objects.get_or_create(user=user, year=datetime.now().year)
+    user   = request.user
+    lb     = get_balance(user)
     leaves = LeaveApplication.objects.filter(applicant=user)
     sf     = request.GET.get('status', '')
     if sf:
         leaves = leaves.filter(status=sf)
 
+    summary = LeaveApplication.objects.filter(applicant=user).status_summary()
+    page    = paginate_keyset(leaves, request.GET.get('cursor'))
+
     context = {
-        'leaves':         leaves,
+        'leaves':         page,
+        'page':           page,
         'lb':             lb,
         'status_filter':  sf,
-        'total':          LeaveApplication.objects.filter(applicant=user).count(),
-        'pending_count':  LeaveApplication.objects.filter(applicant=user, status='pending').count(),
-        'approved_count': LeaveApplication.objects.filter(applicant=user, status='approved').count(),
-        'rejected_count': LeaveApplication.objects.filter(applicant=user, status='rejected').count(),
+        'total':          summary['total'],
+        'pending_count':  summary['pending'],
+        'approved_count': summary['approved'],
+        'rejected_count': summary['rejected'],
     }
     return render(request, 'employee/my_leaves.html', context)
 
@@ -174,9 +197,10 @@ def employee_cancel(request, leave_id):
         return redirect('employee_my_leaves')
 
     if request.method == 'POST':
-        ref = leave.leave_id
-        leave.delete()
-        messages.success(request, f"Leave application LEAVE-{ref} cancelled successfully.")
+        if not _cancel_pending(leave):
+            messages.error(request, "This application was reviewed in the meantime and can no longer be cancelled.")
+        else:
+            messages.success(request, f"Leave application LEAVE-{leave.leave_id} cancelled successfully.")
         return redirect('employee_my_leaves')
 
     return render(request, 'employee/cancel.html', {'leave': leave})
@@ -198,18 +222,24 @@ def manager_dashboard(request):
     """
     dept       = request.user.department
     emp_leaves = LeaveApplication.objects.filter(
-        applicant__role='employee',
-        applicant__department=dept
+        applicant_role='employee',
+        applicant_department=dept
     ).select_related('applicant')
 
+    # Same for every manager of the department until a leave there changes
+    gen     = version(f'dept:{dept}')
+    summary = cached_value(f'mgr_summary:{dept}', gen, emp_leaves.status_summary)
+
     context = {
-        'recent_leaves':  emp_leaves[:8],
-        'pending_count':  emp_leaves.filter(status='pending').count(),
-        'approved_count': emp_leaves.filter(status='approved').count(),
-        'rejected_count': emp_leaves.filter(status='rejected').count(),
-        'total_count':    emp_leaves.count(),
+        'recent_leaves':  emp_leaves[:8],       # lazy — not queried when the fragment is cached
+        'pending_count':  summary['pending'],
+        'approved_count': summary['approved'],
+        'rejected_count': summary['rejected'],
+        'total_count':    summary['total'],
         'dept':           dept,
         'pending_list':   emp_leaves.filter(status='pending')[:5],
+        'gen':            gen,
+        'fragment_timeout': fill_timeout(),
     }
     return render(request, 'manager/dashboard.html', context)
 
@@ -221,8 +251,8 @@ def manager_pending(request):
     Manager CANNOT see or approve manager leaves here.
     """
     pending = LeaveApplication.objects.filter(
-        applicant__role='employee',
-        applicant__department=request.user.department,
+        applicant_role='employee',
+        applicant_department=request.user.department,
         status='pending'
     ).select_related('applicant').order_by('-applied_date')
 
@@ -236,22 +266,11 @@ def manager_review(request, leave_id):
     BLOCKED if: applicant is not an employee, or wrong department.
     Employee CANNOT access this view (role_required('manager') blocks it).
     """
-    leave = get_object_or_404(LeaveApplication, leave_id=leave_id)
-
-    # ── RULE 1: Only employee leaves ──────────────────────────
-    if leave.applicant.role != 'employee':
-        messages.error(request, "You can only review employee leave applications.")
-        return redirect('manager_dashboard')
-
-    # ── RULE 2: Only same department ──────────────────────────
-    if leave.applicant.department != request.user.department:
-        messages.error(request, "You can only review leaves from your own department.")
-        return redirect('manager_dashboard')
-
-    # ── RULE 3: Must be pending ────────────────────────────────
-    if leave.status != 'pending':
-        messages.warning(request, f"LEAVE-{leave.leave_id} has already been {leave.status}.")
-        return redirect('manager_pending')
+    # Employee leave, same department, still pending (leaves/permissions.py)
+    access = leave_access(request, leave_id)
+    if access.review_denied:
+        return _deny(request, access.review_denied)
+    leave = access.leave
 
     if request.method == 'POST':
         form = ReviewForm(request.POST)
@@ -259,35 +278,32 @@ def manager_review(request, leave_id):
             decision = form.cleaned_data['decision']
             comment  = form.cleaned_data['comment']
 
-            if decision == 'approve':
-                # Deduct balance
-                lb, _ = LeaveBalance.objects.get_or_create(
-                    user=leave.applicant, year=datetime.now().year
-                )
-                if leave.leave_type == 'casual':
-                    lb.casual_leave = max(0, lb.casual_leave - leave.total_days)
-                elif leave.leave_type == 'sick':
-                    lb.sick_leave   = max(0, lb.sick_leave - leave.total_days)
-                elif leave.leave_type == 'earned':
-                    lb.earned_leave = max(0, lb.earned_leave - leave.total_days)
-                lb.save()
-                leave.status = 'approved'
-                messages.success(request, f"LEAVE-{leave.leave_id} APPROVED for {leave.applicant.username}.")
-            else:
-                leave.status = 'rejected'
-                messages.success(request, f"LEAVE-{leave.leave_id} REJECTED for {leave.applicant.username}.")
-
-            leave.reviewed_by    = request.user
-            leave.review_comment = comment
-            leave.review_date    = datetime.now()
-            leave.save()
+            error = _apply_review(leave, request.user, decision, comment)
+            if error:
+                messages.error(request, error)
+                return redirect('manager_pending')
 
-            _send_email_notification(leave, request.user)
+            messages.success(request, f"LEAVE-{leave.leave_id} {leave.status.upper()} for {leave.applicant.username}.")
             return redirect('manager_pending')
     else:
         form = ReviewForm()
 
-    return render(request, 'manager/review.html', {'leave': leave, 'form': form})
+    return render(request, 'manager/review.html', {'leave': leave, 'form': form, 'access': access})
+
+
+@role_required('manager')
+@require_POST
+def manager_bulk_review(request):
+    """
+    Manager approves/rejects MANY employee leaves in one POST.
+    Same rules as manager_review, applied set-based:
+    only pending employee leaves from the manager's own department.
+    """
+    scope = LeaveApplication.objects.filter(
+        applicant_role='employee',
+        applicant_department=request.user.department,
+    )
+    return _bulk_review_response(request, scope, 'manager_pending')
 
 
 @role_required('manager')
@@ -295,15 +311,55 @@ def manager_team_leaves(request):
     """Manager views all employee leaves in their department with filters."""
     dept   = request.user.department
     leaves = LeaveApplication.objects.filter(
-        applicant__role='employee',
-        applicant__department=dept
+        applicant_role='employee',
+        applicant_department=dept
     ).select_related('applicant')
 
     sf = request.GET.get('status', '')
     if sf:
         leaves = leaves.filter(status=sf)
 
-    return render(request, 'manager/team_leaves.html', {'leaves': leaves, 'status_filter': sf, 'dept': dept})
+    page = paginate_keyset(leaves, request.GET.get('cursor'))
+    return render(request, 'manager/team_leaves.html', {'leaves': page, 'page': page, 'status_filter': sf, 'dept': dept})
+
+
+@role_required('manager')
+def manager_calendar(request):
+    """
+    Team absence heatmap: employees of the manager's department out per day.
+    Served from the materialized DepartmentAbsence table — ONE indexed read
+    for the whole window, no expansion of leave ranges per request.
+    """
+    dept = request.user.department
+    try:
+        start = date.fromisoformat(request.GET.get('start', ''))
+    except ValueError:
+        start = timezone.localdate()
+    start  = min(max(start, CALENDAR_RANGE[0]), CALENDAR_RANGE[1])
+    start -= timedelta(days=start.weekday())        # grid starts on a Monday
+
+    days      = absence_calendar(dept, start, CALENDAR_DAYS)
+    team_size = User.objects.filter(role='employee', department=dept).count()
+    weeks     = [
+        [{'day': d, 'absent': n, 'level': _heat_level(n, team_size)} for d, n in days[i:i + 7]]
+        for i in range(0, len(days), 7)
+    ]
+    context = {
+        'dept':       dept,
+        'weeks':      weeks,
+        'team_size':  team_size,
+        'prev_start': (start - timedelta(days=CALENDAR_DAYS)).isoformat(),
+        'next_start': (start + timedelta(days=CALENDAR_DAYS)).isoformat(),
+    }
+    return render(request, 'manager/calendar.html', context)
+
+
+def _heat_level(absent, team_size):
+    """0 (nobody out) … 4 (a quarter or more of the team out)."""
+    if not absent:
+        return 0
+    share = absent / team_size if team_size else 1
+    return 1 if share < 0.05 else 2 if share < 0.10 else 3 if share < 0.25 else 4
 
 
 @role_required('manager')
@@ -315,10 +371,10 @@ def manager_apply(request):
     This leave goes to ADMIN for approval.
     """
     user  = request.user
-    lb, _ = LeaveBalance.objects.get_or_create(user=user, year=datetime.now().year)
+    lb    = get_balance(user)
 
     if request.method == 'POST':
-        form = LeaveApplicationForm(request.POST)
+        form = LeaveApplicationForm(request.POST, applicant=user)
         if form.is_valid():
             leave            = form.save(commit=False)
             leave.applicant  = user
@@ -333,6 +389,7 @@ def manager_apply(request):
                 return render(request, 'manager/apply.html', {'form': form, 'lb': lb})
 
             leave.save()
+            publish_leave_event('created', leave)
             messages.success(request,
                 f"Leave application (LEAVE-{leave.leave_id}) submitted for "
                 f"{leave.total_days} day(s). Admin will review it."
@@ -349,21 +406,25 @@ def manager_apply(request):
 @role_required('manager')
 def manager_my_leaves(request):
     """Manager views only their own personal leave applications."""
-    user  = request.user
-    lb, _ = LeaveBalance.objects.get_or_create(user=user, year=datetime.now().year)
+    user   = request.user
+    lb     = get_balance(user)
     leaves = LeaveApplication.objects.filter(applicant=user)
     sf     = request.GET.get('status', '')
     if sf:
         leaves = leaves.filter(status=sf)
 
+    summary = LeaveApplication.objects.filter(applicant=user).status_summary()
+    page    = paginate_keyset(leaves, request.GET.get('cursor'))
+
     context = {
-        'leaves':         leaves,
+        'leaves':         page,
+        'page':           page,
         'lb':             lb,
         'status_filter':  sf,
-        'total':          LeaveApplication.objects.filter(applicant=user).count(),
-        'pending_count':  LeaveApplication.objects.filter(applicant=user, status='pending').count(),
-        'approved_count': LeaveApplication.objects.filter(applicant=user, status='approved').count(),
-        'rejected_count': LeaveApplication.objects.filter(applicant=user, status='rejected').count(),
+        'total':          summary['total'],
+        'pending_count':  summary['pending'],
+        'approved_count': summary['approved'],
+        'rejected_count': summary['rejected'],
     }
     return render(request, 'manager/my_leaves.html', context)
 
@@ -378,9 +439,10 @@ def manager_cancel(request, leave_id):
         return redirect('manager_my_leaves')
 
     if request.method == 'POST':
-        ref = leave.leave_id
-        leave.delete()
-        messages.success(request, f"Leave application LEAVE-{ref} cancelled.")
+        if not _cancel_pending(leave):
+            messages.error(request, "This application was reviewed in the meantime and can no longer be cancelled.")
+        else:
+            messages.success(request, f"Leave application LEAVE-{leave.leave_id} cancelled.")
         return redirect('manager_my_leaves')
 
     return render(request, 'manager/cancel.html', {'leave': leave})
@@ -401,20 +463,26 @@ def admin_dashboard(request):
     Admin CANNOT apply for leave through this system.
     """
     mgr_leaves = LeaveApplication.objects.filter(
-        applicant__role='manager'
+        applicant_role='manager'
     ).select_related('applicant')
 
     # All managers list for sidebar info
     managers = User.objects.filter(role='manager').order_by('department', 'username')
 
+    gen      = version('managers')
+    summary  = cached_value('admin_summary', gen, mgr_leaves.status_summary)
+
     context = {
         'recent_leaves':  mgr_leaves[:8],
-        'pending_count':  mgr_leaves.filter(status='pending').count(),
-        'approved_count': mgr_leaves.filter(status='approved').count(),
-        'rejected_count': mgr_leaves.filter(status='rejected').count(),
-        'total_count':    mgr_leaves.count(),
+        'pending_count':  summary['pending'],
+        'approved_count': summary['approved'],
+        'rejected_count': summary['rejected'],
+        'total_count':    summary['total'],
         'pending_list':   mgr_leaves.filter(status='pending')[:5],
         'managers':       managers,
+        'gen':            gen,
+        'users_gen':      version(),            # sidebar only changes with users
+        'fragment_timeout': fill_timeout(),
     }
     return render(request, 'admin/dashboard.html', context)
 
@@ -426,7 +494,7 @@ def admin_pending(request):
     Admin CANNOT see or approve employee leaves here.
     """
     pending = LeaveApplication.objects.filter(
-        applicant__role='manager',
+        applicant_role='manager',
         status='pending'
     ).select_related('applicant').order_by('-applied_date')
 
@@ -440,17 +508,11 @@ def admin_review(request, leave_id):
     BLOCKED if applicant is not a manager.
     Manager/Employee CANNOT access this view.
     """
-    leave = get_object_or_404(LeaveApplication, leave_id=leave_id)
-
-    # ── RULE: Only manager leaves ──────────────────────────────
-    if leave.applicant.role != 'manager':
-        messages.error(request, "Admin can only review manager leave applications.")
-        return redirect('admin_dashboard')
-
-    # ── RULE: Must be pending ──────────────────────────────────
-    if leave.status != 'pending':
-        messages.warning(request, f"LEAVE-{leave.leave_id} has already been {leave.status}.")
-        return redirect('admin_pending')
+    # Manager leave, still pending (leaves/permissions.py)
+    access = leave_access(request, leave_id)
+    if access.review_denied:
+        return _deny(request, access.review_denied)
+    leave = access.leave
 
     if request.method == 'POST':
         form = ReviewForm(request.POST)
@@ -458,49 +520,109 @@ def admin_review(request, leave_id):
             decision = form.cleaned_data['decision']
             comment  = form.cleaned_data['comment']
 
-            if decision == 'approve':
-                # Deduct manager's leave balance
-                lb, _ = LeaveBalance.objects.get_or_create(
-                    user=leave.applicant, year=datetime.now().year
-                )
-                if leave.leave_type == 'casual':
-                    lb.casual_leave = max(0, lb.casual_leave - leave.total_days)
-                elif leave.leave_type == 'sick':
-                    lb.sick_leave   = max(0, lb.sick_leave - leave.total_days)
-                elif leave.leave_type == 'earned':
-                    lb.earned_leave = max(0, lb.earned_leave - leave.total_days)
-                lb.save()
-                leave.status = 'approved'
-                messages.success(request, f"LEAVE-{leave.leave_id} APPROVED for manager {leave.applicant.username}.")
-            else:
-                leave.status = 'rejected'
-                messages.success(request, f"LEAVE-{leave.leave_id} REJECTED for manager {leave.applicant.username}.")
-
-            leave.reviewed_by    = request.user
-            leave.review_comment = comment
-            leave.review_date    = datetime.now()
-            leave.save()
+            error = _apply_review(leave, request.user, decision, comment)
+            if error:
+                messages.error(request, error)
+                return redirect('admin_pending')
 
-            _send_email_notification(leave, request.user)
+            messages.success(request, f"LEAVE-{leave.leave_id} {leave.status.upper()} for manager {leave.applicant.username}.")
             return redirect('admin_pending')
     else:
         form = ReviewForm()
 
-    return render(request, 'admin/review.html', {'leave': leave, 'form': form})
+    return render(request, 'admin/review.html', {'leave': leave, 'form': form, 'access': access})
+
+
+@role_required('admin')
+@require_POST
+def admin_bulk_review(request):
+    """
+    Admin approves/rejects MANY manager leaves in one POST.
+    Same rules as admin_review: only pending manager leaves.
+    """
+    scope = LeaveApplication.objects.filter(applicant_role='manager')
+    return _bulk_review_response(request, scope, 'admin_pending')
 
 
 @role_required('admin')
+@conditional_page(manager_leaves_validator)
 def admin_all_leaves(request):
     """Admin views all manager leave applications with filters."""
     leaves = LeaveApplication.objects.filter(
-        applicant__role='manager'
+        applicant_role='manager'
     ).select_related('applicant')
 
     sf = request.GET.get('status', '')
     if sf:
         leaves = leaves.filter(status=sf)
 
-    return render(request, 'admin/all_leaves.html', {'leaves': leaves, 'status_filter': sf})
+    page = paginate_keyset(leaves, request.GET.get('cursor'))
+    return render(request, 'admin/all_leaves.html', {'leaves': page, 'page': page, 'status_filter': sf})
+
+
+# ═══════════════════════════════════════════════════════════
+# PAYROLL: Streaming CSV export (staff only)
+# ═══════════════════════════════════════════════════════════
+
+@staff_required
+def payroll_export(request):
+    """
+    Approved leaves for payroll as a streamed CSV.
+      ?month=2026-01            or  ?start=2026-01-01&end=2026-01-31
+      &department=IT            (optional)
+    Rows are streamed from a values_list iterator — memory stays constant.
+    """
+    try:
+        if request.GET.get('month'):
+            start, end = month_range(request.GET['month'])
+        else:
+            start = date.fromisoformat(request.GET.get('start', ''))
+            end   = date.fromisoformat(request.GET.get('end', ''))
+    except ValueError:
+        return HttpResponseBadRequest("Pass ?month=YYYY-MM or ?start=YYYY-MM-DD&end=YYYY-MM-DD.")
+    if start > end:
+        return HttpResponseBadRequest("start must be on or before end.")
+
+    department = request.GET.get('department') or None
+    response   = StreamingHttpResponse(
+        stream_csv(export_rows(approved_leaves(start, end, department))),
+        content_type='text/csv',
+    )
+    # Department is free text: slugify it before it goes into a header
+    slug     = slugify(department or '')
+    filename = f"approved-leaves-{start}-{end}{'-' + slug if slug else ''}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ═══════════════════════════════════════════════════════════
+# SHARED: Queue change feed (Server-Sent Events)
+# ═══════════════════════════════════════════════════════════
+
+@role_required('manager', 'admin')
+def leave_events(request):
+    """
+    Pushes created / cancelled / reviewed events for the user's review queue
+    (manager → own department's employee leaves, admin → manager leaves).
+    Reconnects resume from Last-Event-ID (or ?after=<seq>). Not found under
+    WSGI unless LEAVEMS_LIVE_QUEUE is set (live_queue_enabled).
+    """
+    if not live_queue_enabled(request):
+        raise Http404("The live queue feed is not enabled on this server.")
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    try:
+        after = int(after) if after else None
+    except ValueError:
+        return HttpResponseBadRequest("Last-Event-ID must be an integer.")
+
+    response = StreamingHttpResponse(
+        event_stream(subscriber_channels(request.user), after,
+                     asynchronous=isinstance(request, ASGIRequest)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control']     = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'      # nginx: don't buffer the stream
+    return response
 
 
 # ═══════════════════════════════════════════════════════════
@@ -508,51 +630,236 @@ def admin_all_leaves(request):
 # ═══════════════════════════════════════════════════════════
 
 @login_required
+@conditional_page(detail_validator)
 def leave_detail(request, leave_id):
-    leave = get_object_or_404(LeaveApplication, leave_id=leave_id)
-    user  = request.user
+    # Employee: own · Manager: employee leaves of own dept · Admin: manager leaves
+    access = leave_access(request, leave_id)
+    if access.view_denied:
+        return _deny(request, access.view_denied)
 
-    # Employee: only own leaves
-    if user.role == 'employee' and leave.applicant != user:
-        messages.error(request, "You can only view your own leave applications.")
-        return redirect('employee_my_leaves')
+    return render(request, 'shared/leave_detail.html', {'leave': access.leave, 'access': access})
 
-    # Manager: only employee leaves from their department
-    if user.role == 'manager':
-        if leave.applicant.role != 'employee' or leave.applicant.department != user.department:
-            messages.error(request, "You can only view employee leaves from your department.")
-            return redirect('manager_dashboard')
 
-    # Admin: only manager leaves
-    if user.role == 'admin' and leave.applicant.role != 'manager':
-        messages.error(request, "Admin can only view manager leave applications.")
-        return redirect('admin_dashboard')
+# ═══════════════════════════════════════════════════════════
+# HELPER: Permission denial (LeaveAccess.view_denied / review_denied)
+# ═══════════════════════════════════════════════════════════
 
-    return render(request, 'shared/leave_detail.html', {'leave': leave})
+def _deny(request, denial):
+    level, message, redirect_to = denial
+    getattr(messages, level)(request, message)
+    return redirect(redirect_to)
 
 
 # ═══════════════════════════════════════════════════════════
-# HELPER: Email notification
+# HELPER: Cancel own pending leave (employee_cancel / manager_cancel)
 # ═══════════════════════════════════════════════════════════
 
-def _send_email_notification(leave, reviewer):
-    """Sends email to applicant. In dev mode prints to terminal."""
-    try:
-        send_mail(
-            subject=f'[LeaveMS] Leave Application {leave.status.upper()} — LEAVE-{leave.leave_id}',
-            message=(
-                f"Dear {leave.applicant.get_full_name() or leave.applicant.username},\n\n"
-                f"Your {leave.get_leave_type_display()} application (LEAVE-{leave.leave_id}) "
-                f"from {leave.start_date} to {leave.end_date} "
-                f"({leave.total_days} working day(s)) has been {leave.status.upper()}.\n\n"
-                f"Reviewed by : {reviewer.get_full_name() or reviewer.username} [{reviewer.get_role_display()}]\n"
-                f"Comment     : {leave.review_comment or 'No comment provided.'}\n"
-                f"Review Date : {leave.review_date.strftime('%d %b %Y, %I:%M %p') if leave.review_date else 'N/A'}\n\n"
-                f"Regards,\nLeave Management System"
-            ),
-            from_email='noreply@leavems.com',
-            recipient_list=[leave.applicant.email],
-            fail_silently=True,
-        )
-    except Exception:
-        pass
+def _cancel_pending(leave):
+    """
+    Deletes the leave only if it is still pending — one conditional DELETE,
+    so a review landing between the page load and the POST is never undone.
+    Returns True if it was cancelled; the event is published on commit.
+    """
+    with transaction.atomic():
+        deleted, _ = LeaveApplication.objects.filter(
+            leave_id=leave.leave_id, applicant_id=leave.applicant_id, status='pending').delete()
+        if deleted:
+            publish_leave_event('cancelled', leave)
+    return bool(deleted)
+
+
+# ═══════════════════════════════════════════════════════════
+# HELPER: Review decision (shared by manager_review / admin_review)
+# ═══════════════════════════════════════════════════════════
+
+def _apply_review(leave, reviewer, decision, comment):
+    """
+    Applies a review in one short transaction of conditional UPDATEs:
+      1. pending → approved/rejected only if still pending
+      2. balance deducted only if it covers total_days
+    Nothing is read-modify-written in Python, so concurrent reviewers and
+    double-submitted POSTs cannot lose a deduction or approve twice.
+    Returns an error message, or None on success (leave is updated in place).
+    """
+    status      = 'approved' if decision == 'approve' else 'rejected'
+    review_date = timezone.now()
+    year        = review_year(review_date)
+
+    if status == 'approved':
+        # Make sure the row exists — straight from the database: a cached
+        # copy says nothing about the row the UPDATE below must find
+        LeaveBalance.objects.get_or_create(user_id=leave.applicant_id, year=year)
+
+    with transaction.atomic():
+        if not LeaveApplication.objects.mark_reviewed(leave.leave_id, status, reviewer, comment, review_date):
+            return f"LEAVE-{leave.leave_id} has already been reviewed."
+        if status == 'approved' and not LeaveBalance.objects.deduct(
+                leave.applicant_id, year, leave.leave_type, leave.total_days):
+            transaction.set_rollback(True)
+            return (f"Insufficient {leave.get_leave_type_display()} for LEAVE-{leave.leave_id} "
+                    f"({leave.total_days} day(s) requested).")
+
+        leave.status         = status
+        leave.reviewed_by    = reviewer
+        leave.review_comment = comment
+        leave.review_date    = review_date
+        enqueue_email(**_notification_email(leave, reviewer))
+        publish_leave_event('reviewed', leave)
+        bump_for([leave])
+        if status == 'approved':
+            record_absences([leave])
+
+    if status == 'approved':
+        store_balance(LeaveBalance.objects.get(user_id=leave.applicant_id, year=year))
+    return None
+
+
+def _apply_bulk_review(scope, leave_ids, reviewer, decision, comment):
+    """
+    Set-based version of _apply_review for the bulk endpoints.
+      - ONE query loads the requested leaves inside `scope` (permission rules)
+      - per applicant, leaves are taken oldest first while the balance covers
+        them; the rest are skipped one by one with the reason, and ONE
+        conditional UPDATE deducts the days of those that fit
+      - ONE conditional UPDATE flips every surviving leave pending → status
+    All inside a single transaction. Returns {leave_id: result} where result
+    is 'approved' / 'rejected' or a reason the item was skipped.
+    """
+    status      = 'approved' if decision == 'approve' else 'rejected'
+    review_date = timezone.now()
+    year        = review_year(review_date)
+    results     = {lid: "Not found or not permitted." for lid in leave_ids}
+
+    rows = scope.filter(leave_id__in=leave_ids).order_by('leave_id').values_list(
+        'leave_id', 'applicant_id', 'leave_type', 'total_days', 'status'
+    )
+    by_applicant = {}
+    for lid, applicant_id, leave_type, days, current in rows:
+        if current != 'pending':
+            results[lid] = f"Already {current}."
+            continue
+        by_applicant.setdefault(applicant_id, []).append((lid, leave_type, days))
+
+    with transaction.atomic():
+        if status == 'approved' and by_applicant:
+            LeaveBalance.objects.bulk_create(
+                [LeaveBalance(user_id=uid, year=year) for uid in by_applicant],
+                ignore_conflicts=True,
+            )
+            balances = {lb.user_id: lb for lb in LeaveBalance.objects.filter(user_id__in=by_applicant, year=year)}
+            for applicant_id, items in list(by_applicant.items()):
+                fits = _fitting_leaves(items, balances[applicant_id], results)
+                days_by_type = {}
+                for _, leave_type, days in fits:
+                    days_by_type[leave_type] = days_by_type.get(leave_type, 0) + days
+                if fits and not LeaveBalance.objects.deduct_many(applicant_id, year, days_by_type):
+                    # Balance moved since it was read — one guarded UPDATE per leave instead
+                    kept = []
+                    for lid, leave_type, days in fits:
+                        if LeaveBalance.objects.deduct(applicant_id, year, leave_type, days):
+                            kept.append((lid, leave_type, days))
+                        else:
+                            results[lid] = _insufficient(leave_type, days)
+                    fits = kept
+                by_applicant[applicant_id] = fits
+
+        ok_ids = [lid for items in by_applicant.values() for lid, _, _ in items]
+        if ok_ids:
+            flipped = LeaveApplication.objects.filter(leave_id__in=ok_ids, status='pending').update(
+                status=status,
+                reviewed_by=reviewer,
+                review_comment=comment,
+                review_date=review_date,
+            )
+            if flipped != len(ok_ids):
+                # Someone reviewed part of the batch meanwhile — undo the deductions too
+                transaction.set_rollback(True)
+                for lid in ok_ids:
+                    results[lid] = "Changed by another reviewer, please retry."
+                return results
+            reviewed = list(LeaveApplication.objects.filter(leave_id__in=ok_ids).select_related('applicant'))
+            enqueue_many(_notification_email(leave, reviewer) for leave in reviewed)
+            for leave in reviewed:
+                publish_leave_event('reviewed', leave)
+            bump_for(reviewed)
+            if status == 'approved':
+                record_absences(reviewed)
+        for lid in ok_ids:
+            results[lid] = status
+
+    if status == 'approved' and by_applicant:
+        warm_balances(by_applicant, year)
+    return results
+
+
+def _fitting_leaves(items, balance, results):
+    """
+    Leaves of one applicant (oldest first) that `balance` covers together.
+    Each one that does not fit gets its reason in `results`.
+    """
+    left, fits = {}, []
+    for lid, leave_type, days in items:
+        left.setdefault(leave_type, balance.get_balance(leave_type))
+        if days <= left[leave_type]:
+            left[leave_type] -= days
+            fits.append((lid, leave_type, days))
+        else:
+            results[lid] = _insufficient(leave_type, days)
+    return fits
+
+
+def _insufficient(leave_type, days):
+    return f"Insufficient {dict(LeaveApplication.LEAVE_TYPE_CHOICES)[leave_type]} ({days} day(s) requested)."
+
+
+def _bulk_review_response(request, scope, redirect_to):
+    """Runs a bulk review and answers with JSON or messages + redirect."""
+    wants_json = request.headers.get('Accept', '').startswith('application/json')
+    form       = BulkReviewForm(request.POST)
+    if not form.is_valid():
+        if wants_json:
+            return JsonResponse({'errors': form.errors}, status=400)
+        messages.error(request, "Select at least one leave and a decision.")
+        return redirect(redirect_to)
+
+    decision = form.cleaned_data['decision']
+    results  = _apply_bulk_review(
+        scope, form.cleaned_data['leave_ids'], request.user, decision, form.cleaned_data['comment']
+    )
+
+    if wants_json:
+        return JsonResponse({
+            'decision': decision,
+            'results':  [{'leave_id': lid, 'result': r} for lid, r in results.items()],
+        })
+
+    done    = [lid for lid, r in results.items() if r in ('approved', 'rejected')]
+    skipped = [f"LEAVE-{lid}: {r}" for lid, r in results.items() if r not in ('approved', 'rejected')]
+    if done:
+        messages.success(request, f"{len(done)} leave(s) {'approved' if decision == 'approve' else 'rejected'}.")
+    if skipped:
+        messages.warning(request, f"{len(skipped)} skipped — " + "; ".join(skipped[:10])
+                         + (" …" if len(skipped) > 10 else ""))
+    return redirect(redirect_to)
+
+
+# ═══════════════════════════════════════════════════════════
+# HELPER: Email notification (transactional outbox)
+# ═══════════════════════════════════════════════════════════
+
+def _notification_email(leave, reviewer):
+    """Builds the decision email for the applicant (queued via outbox.py)."""
+    return {
+        'subject': f'[LeaveMS] Leave Application {leave.status.upper()} — LEAVE-{leave.leave_id}',
+        'body': (
+            f"Dear {leave.applicant.get_full_name() or leave.applicant.username},\n\n"
+            f"Your {leave.get_leave_type_display()} application (LEAVE-{leave.leave_id}) "
+            f"from {leave.start_date} to {leave.end_date} "
+            f"({leave.total_days} working day(s)) has been {leave.status.upper()}.\n\n"
+            f"Reviewed by : {reviewer.get_full_name() or reviewer.username} [{reviewer.get_role_display()}]\n"
+            f"Comment     : {leave.review_comment or 'No comment provided.'}\n"
+            f"Review Date : {timezone.localtime(leave.review_date).strftime('%d %b %Y, %I:%M %p') if leave.review_date else 'N/A'}\n\n"
+            f"Regards,\nLeave Management System"
+        ),
+        'recipient': leave.applicant.email,
+    }
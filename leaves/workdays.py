@@ -0,0 +1,85 @@
+"""
+Working-day calendar.
+
+    working_days(start, end)            → Mon–Fri count minus public holidays
+    working_days_many([(s, e), …])      → same for many ranges in one call
+
+Weekdays are counted in closed form (full weeks × 5 + the ≤6-day tail) and
+holidays are subtracted with two bisects on a sorted index, so a range costs
+O(log H) whatever its length.
+
+The cached index is dropped when a PublicHoliday's save() or delete()
+commits (queryset .delete() included). bulk_create(), queryset .update()
+and raw SQL send no signals: call clear_holiday_cache() after them.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+HOLIDAY_CACHE_KEY     = 'leavems:holidays'
+HOLIDAY_CACHE_TIMEOUT = 60 * 60
+
+
+def weekdays_between(start, end):
+    """Number of Mon–Fri days in [start, end] (0 if end < start)."""
+    if end < start:
+        return 0
+    weeks, tail = divmod((end - start).days + 1, 7)
+    first       = start.weekday()
+    # Tail days are first, first+1, … (mod 7); count those that fall Mon–Fri
+    return weeks * 5 + sum(1 for i in range(tail) if (first + i) % 7 < 5)
+
+
+class HolidayCalendar:
+    """Sorted index of the public holidays that fall on a weekday."""
+
+    def __init__(self, dates=()):
+        self.ordinals = sorted({d.toordinal() for d in dates if d.weekday() < 5})
+
+    def holidays_between(self, start, end):
+        return (bisect_right(self.ordinals, end.toordinal())
+                - bisect_left(self.ordinals, start.toordinal()))
+
+    def working_days(self, start, end):
+        if end < start:
+            return 0
+        return weekdays_between(start, end) - self.holidays_between(start, end)
+
+    def working_days_many(self, ranges):
+        """Batch form: list of (start, end) → list of counts, same order."""
+        return [self.working_days(s, e) for s, e in ranges]
+
+
+def holiday_calendar():
+    """The current HolidayCalendar, cached (cleared when a PublicHoliday changes)."""
+    ordinals = cache.get(HOLIDAY_CACHE_KEY)
+    if ordinals is None:
+        from .models import PublicHoliday
+        calendar = HolidayCalendar(PublicHoliday.objects.values_list('date', flat=True))
+        cache.set(HOLIDAY_CACHE_KEY, calendar.ordinals, HOLIDAY_CACHE_TIMEOUT)
+        return calendar
+    calendar = HolidayCalendar()
+    calendar.ordinals = ordinals
+    return calendar
+
+
+def clear_holiday_cache():
+    cache.delete(HOLIDAY_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender='leaves.PublicHoliday')
+def _holiday_changed(sender, **kwargs):
+    transaction.on_commit(clear_holiday_cache)
+
+
+def working_days(start, end):
+    return holiday_calendar().working_days(start, end)
+
+
+def working_days_many(ranges):
+    return holiday_calendar().working_days_many(ranges)